@@ -0,0 +1,44 @@
+from talon import Module, app, settings
+
+from .shared.instrumentation import CALLBACK_PROFILER
+
+mod = Module()
+
+mod.setting(
+    "callback_profiler_enabled",
+    type=bool,
+    default=False,
+    desc="Time every callback and action override registered by this config.",
+)
+
+
+@mod.action_class
+class Actions:
+    @staticmethod
+    def callback_profiler_enable(enabled: bool = True) -> None:
+        """Start or stop timing callbacks and action overrides."""
+        CALLBACK_PROFILER.enabled = bool(enabled)
+
+    @staticmethod
+    def callback_profiler_reset() -> None:
+        """Clear recorded callback timings."""
+        CALLBACK_PROFILER.reset()
+
+    @staticmethod
+    def callback_profiler_report() -> str:
+        """Return per-callback counts and times, highest total first."""
+        return "\n".join(CALLBACK_PROFILER.report_lines())
+
+    @staticmethod
+    def callback_profiler_log() -> None:
+        """Print per-callback counts and times, highest total first."""
+        for line in CALLBACK_PROFILER.report_lines():
+            print(f"callback_profiler {line}")
+
+
+def _on_ready() -> None:
+    if settings.get("user.callback_profiler_enabled"):
+        CALLBACK_PROFILER.enabled = True
+
+
+app.register("ready", _on_ready)
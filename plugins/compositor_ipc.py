@@ -0,0 +1,67 @@
+from talon import Module, app, cron, settings
+
+from .shared import resource_registry
+from .shared.compositor_ipc import COMPOSITOR, FOCUS, client_for_environment
+
+mod = Module()
+
+mod.setting(
+    "compositor_ipc_enabled",
+    type=bool,
+    default=False,
+    desc="Follow focus and outputs over the sway ($SWAYSOCK) or niri ($NIRI_SOCKET) IPC socket.",
+)
+
+_CLIENT_KEY = "compositor_ipc.client"
+_FOCUS_KEY = "compositor_ipc.focus"
+
+
+@mod.scope
+def scope():
+    focused = COMPOSITOR.focused
+    return {
+        "compositor": COMPOSITOR.compositor,
+        "compositor_app_id": "" if focused is None else focused.app_id,
+        "compositor_title": "" if focused is None else focused.title,
+    }
+
+
+@mod.action_class
+class Actions:
+    @staticmethod
+    def compositor_app_id() -> str:
+        """Return the app id of the window the compositor reports as focused."""
+        focused = COMPOSITOR.focused
+        return "" if focused is None else focused.app_id
+
+    @staticmethod
+    def compositor_status() -> str:
+        """Return the compositor IPC connection and cache status."""
+        return COMPOSITOR.status()
+
+
+def _on_focus() -> None:
+    # Runs on the IPC thread; update the scope on the main thread.
+    cron.after("0ms", scope.update)
+
+
+def _on_ready() -> None:
+    if not settings.get("user.compositor_ipc_enabled"):
+        resource_registry.unsubscribe(_FOCUS_KEY)
+        resource_registry.release(_CLIENT_KEY)
+        return
+    client = client_for_environment()
+    if client is None:
+        return
+    resource_registry.subscribe(_FOCUS_KEY, COMPOSITOR, FOCUS, _on_focus)
+    # A client kept from before a reload stays connected.
+    client = resource_registry.keep(
+        _CLIENT_KEY,
+        lambda: client,
+        lambda kept: kept.stop(),
+        reuse=lambda kept: kept.state is COMPOSITOR and kept.path == client.path,
+    )
+    client.start()
+
+
+app.register("ready", _on_ready)
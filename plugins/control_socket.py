@@ -0,0 +1,71 @@
+from talon import Module, actions, app, cron, settings
+
+from .shared import unix_server
+from .shared.async_log import LOG
+from .shared.control_commands import ControlCommand, parse_control_command
+from .shared.dotool_connection import connections
+from .shared.metrics import METRICS
+
+mod = Module()
+
+mod.setting(
+    "control_socket_path",
+    type=str,
+    default="",
+    desc="Accept control commands (speech, control1, hiss, overlay, stats) on this Unix socket.",
+)
+
+
+def _toggle_speech(state: bool | None) -> None:
+    if state is None:
+        actions.speech.toggle()
+    elif state:
+        actions.speech.enable()
+    else:
+        actions.speech.disable()
+
+
+_TOGGLES = {
+    "speech": _toggle_speech,
+    "control1": lambda state: actions.tracking.control1_toggle(state),
+    "hiss": lambda state: actions.user.hiss_mouse_toggle(state),
+    "overlay": lambda state: actions.user.control1_debug_overlay_toggle(state),
+}
+
+
+def _run(command: ControlCommand) -> None:
+    try:
+        _TOGGLES[command.name](command.state)
+    except Exception as exc:
+        LOG.error("control_socket", "command failed", command=command.name, error=exc)
+
+
+def _stats() -> str:
+    lines = [
+        connection.status()
+        for connection in sorted(connections(), key=lambda connection: connection.name)
+    ]
+    return "\n".join(lines) + "\n" + METRICS.render()
+
+
+def _handle(line: str) -> str:
+    # Runs on a server thread: answer queries here, queue toggles for the main thread.
+    try:
+        command = parse_control_command(line)
+    except ValueError as exc:
+        return f"error {exc}\n"
+    if command.name == "ping":
+        return "pong\n"
+    if command.name == "stats":
+        return _stats()
+    cron.after("0ms", lambda: _run(command))
+    return "ok\n"
+
+
+def _on_ready() -> None:
+    path = settings.get("user.control_socket_path")
+    if path:
+        unix_server.serve(path, _handle, "control_socket")
+
+
+app.register("ready", _on_ready)
@@ -0,0 +1,106 @@
+from talon import Context, Module, actions, app, settings, speech_system
+
+from .shared import resource_registry
+from .shared.async_log import LOG
+from .shared.dotool_connection import connections, set_session_lines
+from .shared.dotool_timing import (
+    DEFAULT_TIMING_PROFILE,
+    TIMING_PROFILES,
+    timing_profile_lines,
+)
+from .shared.instrumentation import CALLBACK_PROFILER, STARTUP_PROFILER
+from .shared.write_batch import PHRASE_BATCHER
+
+mod = Module()
+ctx = Context()
+
+mod.setting(
+    "dotool_timing_profile",
+    type=str,
+    default=DEFAULT_TIMING_PROFILE,
+    desc="dotool timing profile: " + ", ".join(TIMING_PROFILES) + ".",
+)
+mod.setting(
+    "dotool_motion_pipe",
+    type=str,
+    default="",
+    desc="dotoold pipe for gaze pointer motion, e.g. a second dotoold (empty: shared).",
+)
+mod.setting(
+    "dotool_phrase_batching",
+    type=bool,
+    default=False,
+    desc="Send all key and mouse lines from one spoken phrase as one write (delays their effect until the phrase ends).",
+)
+
+_active_profile = DEFAULT_TIMING_PROFILE
+
+
+def _apply_profile(name: str) -> bool:
+    global _active_profile
+    try:
+        lines = timing_profile_lines(name)
+    except KeyError:
+        LOG.warning("dotool_session", "unknown profile", profile=name)
+        return False
+    _active_profile = name
+    set_session_lines(lines)
+    return True
+
+
+@mod.action_class
+class Actions:
+    @staticmethod
+    def dotool_timing_profile_set(name: str) -> bool:
+        """Switch the dotool timing profile on all live connections."""
+        return _apply_profile(name)
+
+    @staticmethod
+    def dotool_timing_profile() -> str:
+        """Return the active dotool timing profile name."""
+        return _active_profile
+
+    @staticmethod
+    def dotool_connection_status() -> str:
+        """Return health and circuit state for every dotool connection."""
+        return "\n".join(connection.status() for connection in connections())
+
+    @staticmethod
+    def dotool_flush() -> bool:
+        """Write lines batched so far in this phrase before continuing."""
+        return PHRASE_BATCHER.flush()
+
+
+@ctx.action_class("main")
+@CALLBACK_PROFILER.profile_actions(__name__)
+class MainActions:
+    @staticmethod
+    def sleep(duration):
+        # Lines before a sleep must reach dotool before it, not after.
+        PHRASE_BATCHER.flush()
+        actions.next(duration)
+
+
+@CALLBACK_PROFILER.profile(__name__)
+def _on_pre_phrase(_phrase) -> None:
+    if settings.get("user.dotool_phrase_batching"):
+        PHRASE_BATCHER.begin()
+
+
+@CALLBACK_PROFILER.profile(__name__)
+def _on_post_phrase(_phrase) -> None:
+    PHRASE_BATCHER.end()
+
+
+@CALLBACK_PROFILER.profile(__name__)
+def _on_ready() -> None:
+    _apply_profile(settings.get("user.dotool_timing_profile"))
+
+
+resource_registry.subscribe(
+    "dotool_session.pre_phrase", speech_system, "pre:phrase", _on_pre_phrase
+)
+resource_registry.subscribe(
+    "dotool_session.post_phrase", speech_system, "post:phrase", _on_post_phrase
+)
+app.register("ready", STARTUP_PROFILER.profile_ready(__name__, _on_ready))
@@ -1,8 +1,12 @@
-import subprocess
-import sys
+import threading
+import time
 
 from talon import Context, Module, actions, app, settings
 
+from .shared.dotool_connection import shared_connection
+from .shared.instrumentation import CALLBACK_PROFILER, STARTUP_PROFILER, LatencyStats
+from .shared.metrics import METRICS
+from .shared.pop_click import DOUBLE, IGNORED, PENDING, PopClickCoalescer
 from .shared.pure_utils import resolve_toggle_state
 
 ctx = Context()
@@ -14,26 +18,91 @@ mod.setting(
     default=False,
     desc="Enable hiss mouse on Talon startup.",
 )
+mod.setting(
+    "hiss_mouse_pop_debounce",
+    type=float,
+    default=0.06,
+    desc="Seconds after a pop during which further pops are ignored.",
+)
+mod.setting(
+    "hiss_mouse_double_click_window",
+    type=float,
+    default=0.0,
+    desc="Seconds within which two pops become a double click. Off (0) by "
+    "default: a pop clicks at once. When set, a single pop waits for the "
+    "window to pass before clicking.",
+)
 
 _hiss_mouse_enabled = False
+_connection = shared_connection("hiss_mouse")
+_pops = PopClickCoalescer()
+_pops_lock = threading.Lock()
+_pending_timer: threading.Timer | None = None
+_pop_latency = LatencyStats()
+_pops_forwarded = METRICS.counter(
+    "talon_events_forwarded_total", "Talon actions forwarded to dotool.",
+    plugin="hiss_mouse", kind="pop",
+)
+METRICS.histogram(
+    "talon_pop_click_seconds",
+    "Time from pop to its click being written.",
+    _pop_latency,
+    plugin="hiss_mouse",
+)
+
 
+def _dotool_click_lines(button: str, count: int = 1) -> list[str]:
+    """Return dotool click lines for a mouse button name."""
+    return [f"click {button}"] * count
 
-def _dotool_click_payload(button: str) -> str:
-    """Return dotool click payload for a mouse button name."""
-    return f"click {button}\n"
 
+def _dispatch_clicks(count: int, popped_at: float) -> None:
+    """Queue a click batch without blocking the noise thread."""
 
-def _forward_left_click() -> None:
-    try:
-        subprocess.run(
-            ["dotoolc"],
-            input=_dotool_click_payload("left"),
-            text=True,
-            check=False,
-            timeout=0.5,
-        )
-    except Exception as exc:
-        print(f"dotool click error: {exc}", file=sys.stderr, flush=True)
+    def _record(ok: bool) -> None:
+        if ok:
+            _pop_latency.record((time.perf_counter() - popped_at) * 1000.0)
+
+    _pops_forwarded.inc()
+    _connection.send_lines_async(_dotool_click_lines("left", count), _record)
+
+
+def _fire_pending_click(popped_at: float) -> None:
+    with _pops_lock:
+        if not _pops.take_pending(popped_at):
+            return
+    _dispatch_clicks(1, popped_at)
+
+
+def _cancel_pending_timer() -> None:
+    global _pending_timer
+    if _pending_timer is not None:
+        _pending_timer.cancel()
+        _pending_timer = None
+
+
+def _handle_pop() -> None:
+    global _pending_timer
+    now = time.perf_counter()
+    with _pops_lock:
+        _pops.debounce = settings.get("user.hiss_mouse_pop_debounce")
+        _pops.double_click_window = settings.get("user.hiss_mouse_double_click_window")
+        expired = _pops.flush_expired(now)
+        result = _pops.pop(now)
+        if result in (PENDING, DOUBLE):
+            _cancel_pending_timer()
+        if result == PENDING:
+            _pending_timer = threading.Timer(
+                _pops.double_click_window, _fire_pending_click, (now,)
+            )
+            _pending_timer.daemon = True
+            _pending_timer.start()
+
+    if expired is not None:
+        _dispatch_clicks(1, expired)
+    if result in (IGNORED, PENDING):
+        return
+    _dispatch_clicks(2 if result == DOUBLE else 1, now)
 
 
 def _enable_hiss_mouse() -> None:
@@ -57,6 +126,7 @@ def _set_hiss_mouse_enabled(enabled: bool) -> None:
 
 
 @ctx.action_class("user")
+@CALLBACK_PROFILER.profile_actions(__name__)
 class UserActions:
     @staticmethod
     def noise_trigger_hiss(active: bool):
@@ -71,7 +141,7 @@ class UserActions:
     def noise_trigger_pop():
         if not _hiss_mouse_enabled:
             return
-        _forward_left_click()
+        _handle_pop()
 
 
 @mod.action_class
@@ -97,11 +167,18 @@ class Actions:
         """Return whether hiss mouse behavior is enabled."""
         return _hiss_mouse_enabled
 
+    @staticmethod
+    def hiss_mouse_stats() -> str:
+        """Return pop-to-click latency statistics."""
+        return f"hiss_mouse pop_to_click {_pop_latency.summary()}"
+
 
+@CALLBACK_PROFILER.profile(__name__)
 def _on_ready() -> None:
     if not settings.get("user.hiss_mouse_autostart"):
         return
+    _connection.warm_up()
     actions.user.hiss_mouse_enable()
 
 
-app.register("ready", _on_ready)
+app.register("ready", STARTUP_PROFILER.profile_ready(__name__, _on_ready))
@@ -5,6 +5,8 @@ Format:
 - Chord: modifiers joined by "-" plus a key name (e.g., "super-1").
 - Suffixes: ":down", ":up", or ":N" for repeats.
 - Output: dotool action lines like "key ctrl+f".
+- With a keycode table set, letters, digits and symbols are sent as "k:"
+  keycodes plus the modifiers for their shift level.
 """
 
 from __future__ import annotations
@@ -19,6 +21,7 @@ from .dotool_keymap import (
     MODIFIER_KEY_NAMES,
     SYMBOL_KEY_MAP,
 )
+from .xkb_keycodes import LEVEL_MODIFIERS, KeycodeTable
 
 KeySpec = str
 DotoolAction = str
@@ -28,6 +31,8 @@ LogUnknownKey = Callable[[str], None]
 _VALID_KEY_RE = re.compile(r"^[a-z0-9]$|^f\d+$|^kp\d+$")
 _KNOWN_KEYS = set(KEY_NAME_MAP.values())
 _UNKNOWN_KEYS_SEEN: set[str] = set()
+_KEYCODES: KeycodeTable | None = None
+_KEYCODES_VERSION = 0
 
 
 @dataclass(frozen=True)
@@ -62,6 +67,18 @@ def debug_translate(samples: list[KeySpec] | None = None) -> list[str]:
     return [f"{spec} -> {talon_key_to_dotool_actions(spec)}" for spec in samples]
 
 
+def set_keycode_table(table: KeycodeTable | None) -> None:
+    """Send keysyms found in table as k: keycodes; None restores x: names."""
+    global _KEYCODES, _KEYCODES_VERSION
+    _KEYCODES = table or None
+    _KEYCODES_VERSION += 1
+
+
+def keycode_table_version() -> int:
+    """Return a counter bumped by every set_keycode_table() call."""
+    return _KEYCODES_VERSION
+
+
 def talon_key_to_dotool_actions(
     key_spec: KeySpec, log_unknown: LogUnknownKey | None = None
 ) -> DotoolActions:
@@ -81,6 +98,24 @@ def talon_key_to_dotool_actions(
     ]
 
 
+def text_to_dotool_actions(text: str) -> DotoolActions:
+    """Convert literal text into dotool type actions.
+
+    Args:
+        text: Text to type; newlines become enter key presses.
+
+    Returns:
+        List of dotool action lines.
+    """
+    actions: DotoolActions = []
+    for index, line in enumerate(text.replace("\r\n", "\n").split("\n")):
+        if index:
+            actions.append("key enter")
+        if line:
+            actions.append(f"type {line}")
+    return actions
+
+
 def dotool_actions_to_input(actions: DotoolActions) -> str:
     """Build newline-delimited dotool stdin payload from actions."""
     if not actions:
@@ -133,6 +168,7 @@ def _parse_chord(
     base, action, repeat = _parse_suffix(chord)
     mods, key = _split_modifiers(base)
     mods, key = _normalize_alpha_key(key, mods)
+    mods, key = _resolve_keycode(key, mods)
     key = _normalize_key_name(key)
     _maybe_log_unknown_key(key, log_unknown)
     return ChordSpec(mods=mods, key=key, action=action, repeat=repeat)
@@ -196,6 +232,36 @@ def _normalize_alpha_key(key: str, mods: tuple[str, ...]) -> tuple[tuple[str, ..
     return mods, key
 
 
+def _resolve_keycode(key: str, mods: tuple[str, ...]) -> tuple[tuple[str, ...], str]:
+    """Swap a key for its layout keycode when a keycode table is set.
+
+    Args:
+        key: Single key string, letters already lowercased.
+        mods: Modifier tuple.
+
+    Returns:
+        Tuple of (mods, key): the level's modifiers are added and the key
+        becomes "k:<code>", or both are unchanged if the keysym is unknown.
+    """
+    table = _KEYCODES
+    if table is None or not key:
+        return mods, key
+    if key in SYMBOL_KEY_MAP:
+        keysym = SYMBOL_KEY_MAP[key][len("x:") :]
+    elif key.startswith("x:"):
+        keysym = key[len("x:") :]
+    elif len(key) == 1 and key.isascii() and key.isalnum():
+        keysym = key
+    else:
+        return mods, key
+    position = table.get(keysym)
+    if position is None:
+        return mods, key
+    code, level = position
+    extra = tuple(mod for mod in LEVEL_MODIFIERS[level] if mod not in mods)
+    return mods + extra, f"k:{code}"
+
+
 def _normalize_key_name(key: str) -> str:
     """Normalize a Talon key name to a dotool-compatible name.
 
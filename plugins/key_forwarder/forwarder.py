@@ -1,14 +1,33 @@
 """Global Talon key forwarder via dotool."""
 
-from talon import Context, Module, actions, settings
-import subprocess
-import sys
+from talon import Context, Module, actions, app, fs, settings
+from pathlib import Path
+import shlex
+import threading
+from types import SimpleNamespace
 
+from ..shared import resource_registry
+from ..shared.async_log import LOG
+from ..shared.dotool_connection import shared_connection
+from ..shared.instrumentation import CALLBACK_PROFILER, STARTUP_PROFILER
+from ..shared.metrics import METRICS
+from ..shared.wayland_clipboard import (
+    ClipboardSnapshot,
+    schedule_clipboard_restore,
+    write_clipboard,
+)
+from ..shared.write_batch import PHRASE_BATCHER
 from .dotool_translate import (
     KeySpec,
-    dotool_actions_to_input,
+    DotoolActions,
+    set_keycode_table,
     talon_key_to_dotool_actions,
+    text_to_dotool_actions,
 )
+from .key_precompile import KEY_PRECOMPILER
+from .macro_recorder import MACRO_RECORDER
+from .modifier_state import MODIFIER_TRACKER
+from .xkb_keycodes import LazyKeycodeTable, read_keymap
 
 mod = Module()
 mod.setting(
@@ -17,11 +36,227 @@ mod.setting(
     default=False,
     desc="Forward Talon key() through external backend (global).",
 )
+mod.setting(
+    "key_forwarder_paste_threshold",
+    type=int,
+    default=200,
+    desc="Insert text at least this long via wl-copy and paste (0 disables).",
+)
+mod.setting(
+    "key_forwarder_paste_chord",
+    type=str,
+    default="ctrl-v",
+    desc="Talon key spec sent to paste inserted text.",
+)
+mod.setting(
+    "key_forwarder_paste_restore_delay",
+    type=float,
+    default=0.3,
+    desc="Seconds to wait before restoring the clipboard after a paste.",
+)
+mod.setting(
+    "key_forwarder_precompile_root",
+    type=str,
+    default="",
+    desc="Directory scanned for literal key() specs (default: the Talon user dir).",
+)
+mod.setting(
+    "key_forwarder_xkb_keycodes",
+    type=bool,
+    default=False,
+    desc="Send symbols and letters as keycodes resolved from the XKB layout.",
+)
+mod.setting(
+    "key_forwarder_xkb_keymap_command",
+    type=str,
+    default="xkbcli compile-keymap",
+    desc="Command printing the active XKB keymap (match dotoold's layout).",
+)
 
 ctx = Context()
 
+_connection = shared_connection("key_forwarder")
+# Held keys outlive a reload of modifier_state, so they are still released.
+MODIFIER_TRACKER.use_state(resource_registry.keep("key_forwarder.held_keys", dict))
+# Watches the clipboard so a paste never waits for wl-paste.
+_clipboard = resource_registry.keep(
+    "key_forwarder.clipboard",
+    ClipboardSnapshot,
+    ClipboardSnapshot.stop,
+    reuse=lambda snapshot: isinstance(snapshot, ClipboardSnapshot),
+)
+_keycodes: LazyKeycodeTable | None = None
+_keys_forwarded = METRICS.counter(
+    "talon_events_forwarded_total", "Talon actions forwarded to dotool.",
+    plugin="key_forwarder", kind="key",
+)
+_inserts_forwarded = METRICS.counter(
+    "talon_events_forwarded_total", "Talon actions forwarded to dotool.",
+    plugin="key_forwarder", kind="insert",
+)
+
+
+def _send_dotool_actions(actions_list: DotoolActions) -> bool:
+    # Write the batch to a persistent dotoolc (dotoold should be running).
+    MACRO_RECORDER.capture(actions_list)
+    lines = MODIFIER_TRACKER.filter_actions(actions_list)
+    if not PHRASE_BATCHER.send_lines(_connection, lines, _release_held_keys):
+        _release_held_keys()
+        return False
+    return True
+
+
+def _release_held_keys() -> None:
+    """Release every key still held through keydown."""
+    PHRASE_BATCHER.flush()
+    _connection.send_lines(MODIFIER_TRACKER.release_all())
+
+
+def _forwarding() -> bool:
+    """Return whether to forward to dotool; falls back while the circuit is open."""
+    return settings.get("user.key_forwarder_enabled") and _connection.available()
+
+
+def _precompile_root() -> str:
+    root = settings.get("user.key_forwarder_precompile_root")
+    # This file lives at <talon user>/<repo>/plugins/key_forwarder/.
+    return root or str(Path(__file__).resolve().parents[3])
+
+
+# fs.watch/fs.unwatch as a resource_registry registrar.
+_FS_WATCHES = SimpleNamespace(register=fs.watch, unregister=fs.unwatch)
+_precompile_lock = threading.Lock()
+_precompile_running = False
+_precompile_requested = False
+
+
+def _request_precompile() -> None:
+    """Rescan .talon files on a background thread, coalescing requests."""
+    global _precompile_running, _precompile_requested
+    with _precompile_lock:
+        _precompile_requested = True
+        if _precompile_running:
+            return
+        _precompile_running = True
+    threading.Thread(
+        target=_precompile_loop,
+        args=(_precompile_root(),),
+        name="key_forwarder-precompile",
+        daemon=True,
+    ).start()
+
+
+def _load_keycodes() -> None:
+    """Build the layout keycode table once, before any precompile scan."""
+    keycodes = _keycodes
+    if keycodes is None or keycodes.loaded():
+        return
+    table = keycodes.get()
+    if keycodes.error is not None:
+        LOG.error("key_forwarder", "keymap load failed", error=keycodes.error)
+    set_keycode_table(table)
+
+
+def _precompile_loop(root: str) -> None:
+    global _precompile_running, _precompile_requested
+    _load_keycodes()
+    while True:
+        with _precompile_lock:
+            if not _precompile_requested:
+                _precompile_running = False
+                return
+            _precompile_requested = False
+        try:
+            KEY_PRECOMPILER.scan([root])
+        except Exception as exc:
+            LOG.error("key_forwarder", "precompile failed", error=exc)
+
+
+@CALLBACK_PROFILER.profile(__name__)
+def _on_talon_file_change(path: str, _flags) -> None:
+    if path.endswith(".talon"):
+        _request_precompile()
+
+
+def _key_actions(key: KeySpec) -> DotoolActions:
+    precompiled = KEY_PRECOMPILER.lookup(key)
+    if precompiled is not None:
+        return list(precompiled)
+    return talon_key_to_dotool_actions(key, _log_unknown_key)
+
+
+def _log_unknown_key(key: str) -> None:
+    LOG.warning("key_forwarder", "unknown key", key=key)
+
+
+def _should_paste(text: str) -> bool:
+    # A recorded paste would replay whatever the clipboard holds by then.
+    if MACRO_RECORDER.recording():
+        return False
+    threshold = settings.get("user.key_forwarder_paste_threshold")
+    return threshold > 0 and len(text) >= threshold
+
+
+def _paste_text(text: str) -> bool:
+    """Insert text through the clipboard, restoring it in the background."""
+    payload = text.encode("utf-8")
+    previous = _clipboard.previous(payload)
+    if not write_clipboard(payload):
+        return False
+    _send_dotool_actions(
+        talon_key_to_dotool_actions(settings.get("user.key_forwarder_paste_chord"))
+    )
+    # The restore timer starts now, so the paste chord cannot wait for the phrase.
+    PHRASE_BATCHER.flush()
+    schedule_clipboard_restore(
+        previous,
+        payload,
+        settings.get("user.key_forwarder_paste_restore_delay"),
+    )
+    return True
+
+
+@mod.action_class
+class Actions:
+    @staticmethod
+    def key_forwarder_macro_record() -> None:
+        """Start recording forwarded key, insert and mouse actions."""
+        MACRO_RECORDER.start()
+        LOG.info("key_forwarder", "macro recording")
+
+    @staticmethod
+    def key_forwarder_macro_stop() -> int:
+        """Stop recording and compile the macro; returns its line count."""
+        macro = MACRO_RECORDER.stop()
+        count = 0 if macro is None else len(macro.lines)
+        LOG.info("key_forwarder", "macro recorded", lines=count)
+        return count
+
+    @staticmethod
+    def key_forwarder_macro_replay(times: int = 1) -> bool:
+        """Replay the recorded macro times times.
+
+        With no keys held this is one write of the macro's cached payload;
+        otherwise the lines are filtered against the held keys first.
+        """
+        macro = MACRO_RECORDER.macro
+        if macro is None or times < 1:
+            return False
+        if MODIFIER_TRACKER.held():
+            return _send_dotool_actions(macro.repeated(times))
+        MACRO_RECORDER.capture(macro.repeated(times))
+        # Lines batched earlier in the phrase go first.
+        PHRASE_BATCHER.flush()
+        return _connection.send_payload(macro.payload(times))
+
+    @staticmethod
+    def key_forwarder_macro_recording() -> bool:
+        """Return whether a macro is being recorded."""
+        return MACRO_RECORDER.recording()
+
 
 @ctx.action_class("main")
+@CALLBACK_PROFILER.profile_actions(__name__)
 class MainActions:
     @staticmethod
     def key(key: KeySpec):
@@ -30,22 +265,57 @@ class MainActions:
         Args:
             key: Talon key spec string.
         """
-        if not settings.get("user.key_forwarder_enabled"):
+        if not _forwarding():
+            _release_held_keys()
             actions.next(key)
             return
-        print(f"dotool key: {key!r}", file=sys.stderr, flush=True)
+        LOG.debug("key_forwarder", "key", spec=key)
+        _keys_forwarded.inc()
+        try:
+            _send_dotool_actions(_key_actions(key))
+        except Exception as exc:
+            LOG.error("key_forwarder", "key failed", spec=key, error=exc)
+            _release_held_keys()
+
+    @staticmethod
+    def insert(text: str):
+        """Type text through dotoolc, pasting large blocks via wl-copy.
+
+        Args:
+            text: Text to insert.
+        """
+        if not _forwarding():
+            actions.next(text)
+            return
+        _inserts_forwarded.inc()
         try:
-            # TODO: pass log_unknown callback to surface unmapped keys.
-            actions_list = talon_key_to_dotool_actions(key)
-            if not actions_list:
+            if _should_paste(text) and _paste_text(text):
                 return
-            # Send a small batch to dotoolc (dotoold should be running).
-            subprocess.run(
-                ["dotoolc"],
-                input=dotool_actions_to_input(actions_list),
-                text=True,
-                check=False,
-                timeout=0.5,
-            )
+            _send_dotool_actions(text_to_dotool_actions(text))
         except Exception as exc:
-            print(f"dotool error: {exc}", file=sys.stderr, flush=True)
+            LOG.error("key_forwarder", "insert failed", error=exc)
+
+
+@CALLBACK_PROFILER.profile(__name__)
+def _on_ready() -> None:
+    global _keycodes
+    if settings.get("user.key_forwarder_enabled"):
+        if settings.get("user.key_forwarder_xkb_keycodes") and _keycodes is None:
+            command = shlex.split(settings.get("user.key_forwarder_xkb_keymap_command"))
+            _keycodes = LazyKeycodeTable(lambda: read_keymap(command))
+        _connection.warm_up()
+        if settings.get("user.key_forwarder_paste_threshold") > 0:
+            _clipboard.start()
+        resource_registry.subscribe(
+            "key_forwarder.talon_files", _FS_WATCHES, _precompile_root(), _on_talon_file_change
+        )
+        _request_precompile()
+
+
+app.register("ready", STARTUP_PROFILER.profile_ready(__name__, _on_ready))
+
+# Never leave keys held when Talon exits or this module is reloaded.
+resource_registry.subscribe(
+    "key_forwarder.release_held_keys", resource_registry.ATEXIT, "exit", _release_held_keys
+)
+_release_held_keys()
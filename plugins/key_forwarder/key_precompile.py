@@ -0,0 +1,133 @@
+"""Translate literal key() specs from .talon files ahead of time.
+
+Most key() calls in .talon files are literals such as key(ctrl-shift-t).
+KeyPrecompiler scans .talon files, translates every literal spec once and
+publishes a read-only lookup table, so the forwarder skips the translator
+for them. Specs with {templates} are left to the runtime translator. Files
+are re-read only when their modification time changes, or when
+set_keycode_table() changes what every spec translates to.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+from types import MappingProxyType
+from typing import Callable, Iterable, Mapping
+
+from .dotool_translate import (
+    DotoolActions,
+    KeySpec,
+    keycode_table_version,
+    talon_key_to_dotool_actions,
+)
+
+Translate = Callable[[KeySpec], DotoolActions]
+CompiledKeys = Mapping[KeySpec, tuple[str, ...]]
+
+_KEY_CALL_RE = re.compile(r"(?<![\w.])key\(\s*([^()\n]*?)\s*\)")
+_QUOTES = ("'", '"')
+
+
+def extract_key_specs(source: str) -> set[KeySpec]:
+    """Return the literal key() specs in .talon source text.
+
+    Quoted specs are unquoted; empty specs and specs with {templates} are
+    skipped, as are comment lines.
+    """
+    specs = set()
+    for line in source.splitlines():
+        if line.lstrip().startswith("#"):
+            continue
+        for match in _KEY_CALL_RE.finditer(line):
+            spec = match.group(1)
+            if len(spec) >= 2 and spec[0] in _QUOTES and spec[-1] == spec[0]:
+                spec = spec[1:-1].strip()
+            if spec and "{" not in spec:
+                specs.add(spec)
+    return specs
+
+
+def iter_talon_files(roots: Iterable[str]) -> Iterable[str]:
+    """Yield .talon file paths under roots, skipping hidden directories."""
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [name for name in dirnames if not name.startswith(".")]
+            for filename in filenames:
+                if filename.endswith(".talon"):
+                    yield os.path.join(dirpath, filename)
+
+
+class KeyPrecompiler:
+    """Per-file cache of translated literal specs, merged into one table."""
+
+    def __init__(self, translate: Translate = talon_key_to_dotool_actions) -> None:
+        self._translate = translate
+        self._files: dict[str, tuple[int, dict[KeySpec, tuple[str, ...]]]] = {}
+        self._scan_lock = threading.Lock()
+        self._keycodes_version = keycode_table_version()
+        self.table: CompiledKeys = MappingProxyType({})
+
+    def lookup(self, spec: KeySpec) -> tuple[str, ...] | None:
+        """Return the precompiled dotool actions for a spec, if any.
+
+        Nothing is returned from a table compiled under an older keycode
+        table until the next scan recompiles it.
+        """
+        if self._keycodes_version != keycode_table_version():
+            return None
+        return self.table.get(spec)
+
+    def scan(self, roots: Iterable[str]) -> int:
+        """Recompile changed .talon files under roots and republish the table.
+
+        Returns:
+            Number of files that were (re)compiled.
+        """
+        with self._scan_lock:
+            version = keycode_table_version()
+            stale = version != self._keycodes_version
+            if stale:
+                self._files.clear()
+            seen = set()
+            compiled = 0
+            for path in iter_talon_files(roots):
+                seen.add(path)
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+                cached = self._files.get(path)
+                if cached is not None and cached[0] == mtime:
+                    continue
+                self._files[path] = (mtime, self._compile_file(path))
+                compiled += 1
+
+            removed = set(self._files) - seen
+            for path in removed:
+                del self._files[path]
+            if compiled or removed or stale:
+                table = {}
+                for _mtime, specs in self._files.values():
+                    table.update(specs)
+                self.table = MappingProxyType(table)
+            self._keycodes_version = version
+            return compiled
+
+    def _compile_file(self, path: str) -> dict[KeySpec, tuple[str, ...]]:
+        try:
+            with open(path, encoding="utf-8", errors="replace") as talon_file:
+                source = talon_file.read()
+        except OSError:
+            return {}
+        compiled = {}
+        for spec in extract_key_specs(source):
+            try:
+                compiled[spec] = tuple(self._translate(spec))
+            except Exception:
+                continue
+        return compiled
+
+
+KEY_PRECOMPILER = KeyPrecompiler()
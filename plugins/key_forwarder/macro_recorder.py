@@ -0,0 +1,112 @@
+"""Record forwarded dotool lines and compile them into one replayable batch.
+
+While recording, every line the key and mouse forwarders are asked to write
+is captured before the modifier tracker filters it, so a replay does not
+depend on which keys happened to be held while recording. Stopping compiles
+the capture once: keys and buttons still pressed at the end are released.
+
+Replaying with no keys held writes a payload filtered and encoded once per
+repeat count and cached on the macro. With keys held, the replay's lines go
+through the tracker like any other batch.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import threading
+
+from .dotool_translate import DotoolActions
+from .modifier_state import ModifierTracker
+
+
+@dataclass(frozen=True)
+class Macro:
+    """A compiled recording."""
+
+    lines: tuple[str, ...]
+    _payloads: dict[int, str] = field(default_factory=dict, compare=False, repr=False)
+
+    def repeated(self, times: int) -> DotoolActions:
+        """Return the lines for replaying the macro times times."""
+        return list(self.lines) * max(0, times)
+
+    def payload(self, times: int) -> str:
+        """Return the newline-terminated dotool input for times repeats.
+
+        The lines are filtered as if no key were held before the replay,
+        which leaves none held after it, and the result is cached.
+        """
+        payload = self._payloads.get(times)
+        if payload is None:
+            lines = ModifierTracker().filter_actions(self.repeated(times))
+            payload = self._payloads.setdefault(times, "".join(f"{line}\n" for line in lines))
+        return payload
+
+
+def compile_macro(lines: DotoolActions) -> Macro:
+    """Compile recorded lines, releasing keys and buttons left pressed.
+
+    Args:
+        lines: dotool action lines in the order they were forwarded.
+
+    Returns:
+        Macro whose lines leave nothing held after each repeat.
+    """
+    held_keys: list[str] = []
+    held_buttons: list[str] = []
+    for line in lines:
+        command, _, arg = line.partition(" ")
+        if command == "keydown" and arg not in held_keys:
+            held_keys.append(arg)
+        elif command == "keyup" and arg in held_keys:
+            held_keys.remove(arg)
+        elif command == "buttondown" and arg not in held_buttons:
+            held_buttons.append(arg)
+        elif command == "buttonup" and arg in held_buttons:
+            held_buttons.remove(arg)
+
+    compiled = [
+        *lines,
+        *(f"buttonup {button}" for button in reversed(held_buttons)),
+        *(f"keyup {key}" for key in reversed(held_keys)),
+    ]
+    return Macro(tuple(compiled))
+
+
+class MacroRecorder:
+    """Capture forwarded lines between start() and stop()."""
+
+    def __init__(self) -> None:
+        self._lines: DotoolActions | None = None
+        self._lock = threading.Lock()
+        self.macro: Macro | None = None
+
+    def recording(self) -> bool:
+        """Return whether lines are being captured."""
+        return self._lines is not None
+
+    def start(self) -> None:
+        """Start a new recording, discarding any unfinished one."""
+        with self._lock:
+            self._lines = []
+
+    def capture(self, lines: DotoolActions) -> None:
+        """Append forwarded lines to the recording, if one is running."""
+        if self._lines is None:
+            return
+        with self._lock:
+            if self._lines is not None:
+                self._lines.extend(lines)
+
+    def stop(self) -> Macro | None:
+        """Finish recording and compile it; returns None if none was running."""
+        with self._lock:
+            lines = self._lines
+            self._lines = None
+        if lines is None:
+            return None
+        self.macro = compile_macro(lines)
+        return self.macro
+
+
+MACRO_RECORDER = MacroRecorder()
@@ -0,0 +1,140 @@
+"""Track held keys and drop redundant dotool keydown/keyup traffic.
+
+dotool presses every key of a "key ctrl+a" chord and releases them all
+afterwards, so a modifier held with "ctrl:down" must be left out of later
+chords to stay held. Within one batch, a release immediately followed by a
+press of the same key is dropped so the key stays down across chords.
+"""
+
+from __future__ import annotations
+
+import threading
+
+from .dotool_keymap import MODIFIER_KEY_NAMES
+
+DotoolActions = list[str]
+
+
+class ModifierTracker:
+    """Remember keys held through keydown and filter batches against them."""
+
+    def __init__(self) -> None:
+        self._held: list[str] = []
+        self._released: set[str] = set()
+        self._lock = threading.Lock()
+
+    def use_state(self, state: dict) -> None:
+        """Keep held-key state in state, merging what is tracked so far.
+
+        Args:
+            state: Dict that outlives a reload of this module, so a new
+                tracker still knows which keys the old one left held.
+        """
+        with self._lock:
+            held = state.setdefault("held", [])
+            if held is self._held:
+                return
+            released = state.setdefault("released", set())
+            held.extend(key for key in self._held if key not in held)
+            released.update(self._released)
+            self._held, self._released = held, released
+
+    def held(self) -> tuple[str, ...]:
+        """Return held key names in press order."""
+        with self._lock:
+            return tuple(self._held)
+
+    def filter_actions(self, actions: DotoolActions) -> DotoolActions:
+        """Drop duplicate presses/releases and merge release-press pairs.
+
+        Only keys held across other actions (an explicit :down, a modified
+        click) have a release merged with a following press; bare taps
+        are sent as written.
+
+        Args:
+            actions: dotool action lines for one batch.
+
+        Returns:
+            Equivalent action lines with redundant key traffic removed.
+        """
+        with self._lock:
+            out: DotoolActions = []
+            pending_up: list[str] = []
+            previous = ""
+            for action in actions:
+                command, _, key = action.partition(" ")
+                tapped = previous == f"keydown {key}"
+                previous = action
+                if command == "keydown":
+                    if key in pending_up:
+                        pending_up.remove(key)
+                        continue
+                    if key in self._held:
+                        continue
+                    self._flush_releases(pending_up, out)
+                    self._held.append(key)
+                    self._released.discard(key)
+                    out.append(action)
+                    continue
+                if command == "keyup":
+                    if key in self._held:
+                        if tapped:
+                            # A bare tap, e.g. "shift shift": never merged
+                            # with the next press, so double taps survive.
+                            pending_up.append(key)
+                            self._flush_releases(pending_up, out)
+                            continue
+                        if key not in pending_up:
+                            pending_up.append(key)
+                        continue
+                    if key in self._released:
+                        continue
+                    # Unknown state (e.g. held before a reload): release it.
+                    self._released.add(key)
+                    out.append(action)
+                    continue
+                self._flush_releases(pending_up, out)
+                if command == "key":
+                    action = self._strip_held_modifiers(action, key)
+                out.append(action)
+            self._flush_releases(pending_up, out)
+            return out
+
+    def release_all(self) -> DotoolActions:
+        """Return keyup lines for every held key and forget them."""
+        with self._lock:
+            actions = [f"keyup {key}" for key in reversed(self._held)]
+            self._released.update(self._held)
+            self._held.clear()
+            return actions
+
+    def _flush_releases(self, pending_up: list[str], out: DotoolActions) -> None:
+        for key in pending_up:
+            self._held.remove(key)
+            self._released.add(key)
+            out.append(f"keyup {key}")
+        pending_up.clear()
+
+    def _strip_held_modifiers(self, action: str, chord: str) -> str:
+        if not self._held:
+            return action
+        parts = chord.split("+")
+        if parts[-1] in self._held:
+            # dotool releases the chord key afterwards, even if it was held.
+            self._held.remove(parts[-1])
+            self._released.add(parts[-1])
+        if len(parts) == 1:
+            return action
+        kept = [
+            part
+            for part in parts[:-1]
+            if MODIFIER_KEY_NAMES.get(part, part) not in self._held
+        ]
+        if len(kept) == len(parts) - 1:
+            return action
+        return "key " + "+".join([*kept, parts[-1]])
+
+
+# Key and mouse forwarders write to the same dotoold device, so they share
+# one view of which keys are held.
+MODIFIER_TRACKER = ModifierTracker()
@@ -0,0 +1,145 @@
+"""Resolve keysyms to keycodes and shift levels from an XKB keymap.
+
+dotool resolves "x:" keysym names by searching the xkb keymap on every
+keystroke. Parsing the active keymap once instead gives a frozen table from
+keysym name to (Linux keycode, level), so the translator can send "k:"
+keycodes plus the modifiers that select the level. Because the table comes
+from the real layout, symbols and letters land on the right keys on non-US
+layouts too. Named keys such as esc or enter are layout independent and stay
+as Linux key names.
+"""
+
+from __future__ import annotations
+
+import re
+import subprocess
+import threading
+from types import MappingProxyType
+from typing import Callable, Mapping, Sequence
+
+KeyPosition = tuple[int, int]
+KeycodeTable = Mapping[str, KeyPosition]
+ReadKeymap = Callable[[], str]
+
+DEFAULT_KEYMAP_COMMAND = ("xkbcli", "compile-keymap")
+
+# XKB keycodes are Linux evdev keycodes offset by 8.
+XKB_KEYCODE_OFFSET = 8
+
+# Modifiers selecting each shift level of group 1 (FOUR_LEVEL style types).
+LEVEL_MODIFIERS: tuple[tuple[str, ...], ...] = (
+    (),
+    ("shift",),
+    ("altgr",),
+    ("altgr", "shift"),
+)
+
+_SECTION_RE = re.compile(r"\bxkb_(keycodes|symbols)\b[^{]*\{")
+_KEYCODE_RE = re.compile(r"<([^>]+)>\s*=\s*(\d+)\s*;")
+_ALIAS_RE = re.compile(r"\balias\s+<([^>]+)>\s*=\s*<([^>]+)>\s*;")
+_KEY_RE = re.compile(r"\bkey\s+<([^>]+)>\s*\{(.*?)\}\s*;", re.DOTALL)
+_GROUP1_RE = re.compile(r"\bsymbols\s*\[\s*(?:Group)?1\s*\]\s*=\s*\[([^\]]*)\]", re.I)
+_BARE_SYMBOLS_RE = re.compile(r"(?:^|[{,])\s*\[([^\]]*)\]")
+_TYPE_RE = re.compile(r"\btype(?:\s*\[[^\]]*\])?\s*=\s*\"([^\"]*)\"")
+
+
+def _sections(text: str) -> dict[str, str]:
+    """Return the body of each xkb_keycodes/xkb_symbols section."""
+    sections = {}
+    for match in _SECTION_RE.finditer(text):
+        depth = 1
+        index = match.end()
+        while index < len(text) and depth:
+            if text[index] == "{":
+                depth += 1
+            elif text[index] == "}":
+                depth -= 1
+            index += 1
+        sections.setdefault(match.group(1), text[match.end() : index - 1])
+    return sections
+
+
+def _group1_symbols(body: str) -> list[str]:
+    match = _GROUP1_RE.search(body)
+    if match is None and "symbols" not in body:
+        match = _BARE_SYMBOLS_RE.search(body)
+    if match is None:
+        return []
+    return [symbol.strip() for symbol in match.group(1).split(",")]
+
+
+def parse_xkb_keymap(text: str) -> KeycodeTable:
+    """Build a keysym table from keymap text.
+
+    Args:
+        text: Keymap as printed by xkbcli compile-keymap or xkbcomp -xkb.
+
+    Returns:
+        Read-only map from keysym name to (Linux keycode, level index).
+        When a keysym appears on several keys, the lowest level wins, then
+        the lowest keycode. Keypad keys are skipped, since their second
+        level follows NumLock rather than shift.
+    """
+    sections = _sections(text)
+    keycodes_text = sections.get("keycodes", "")
+    keycodes = {name: int(code) for name, code in _KEYCODE_RE.findall(keycodes_text)}
+    for alias, target in _ALIAS_RE.findall(keycodes_text):
+        if target in keycodes:
+            keycodes.setdefault(alias, keycodes[target])
+
+    table: dict[str, KeyPosition] = {}
+    for name, body in _KEY_RE.findall(sections.get("symbols", "")):
+        keycode = keycodes.get(name)
+        if keycode is None or keycode < XKB_KEYCODE_OFFSET:
+            continue
+        key_type = _TYPE_RE.search(body)
+        if key_type is not None and "KEYPAD" in key_type.group(1):
+            continue
+        code = keycode - XKB_KEYCODE_OFFSET
+        for level, keysym in enumerate(_group1_symbols(body)[: len(LEVEL_MODIFIERS)]):
+            if not keysym or keysym == "NoSymbol":
+                continue
+            position = (code, level)
+            current = table.get(keysym)
+            if current is None or (level, code) < (current[1], current[0]):
+                table[keysym] = position
+    return MappingProxyType(table)
+
+
+def read_keymap(command: Sequence[str] = DEFAULT_KEYMAP_COMMAND, timeout: float = 5.0) -> str:
+    """Run a keymap dump command and return its output."""
+    result = subprocess.run(
+        list(command), capture_output=True, text=True, timeout=timeout, check=True
+    )
+    return result.stdout
+
+
+class LazyKeycodeTable:
+    """Parse the keymap on first use and keep the table."""
+
+    def __init__(self, read: ReadKeymap = read_keymap) -> None:
+        self._read = read
+        self._lock = threading.Lock()
+        self._table: KeycodeTable | None = None
+        self.error: Exception | None = None
+
+    def loaded(self) -> bool:
+        """Return whether a load has been attempted."""
+        return self._table is not None
+
+    def get(self) -> KeycodeTable:
+        """Return the table, reading and parsing the keymap once.
+
+        A failed read or parse leaves an empty table and sets error.
+        """
+        table = self._table
+        if table is not None:
+            return table
+        with self._lock:
+            if self._table is None:
+                try:
+                    self._table = parse_xkb_keymap(self._read())
+                except Exception as exc:
+                    self.error = exc
+                    self._table = MappingProxyType({})
+            return self._table
@@ -0,0 +1,44 @@
+from talon import Module, app, settings
+
+from .shared.async_log import LOG, parse_level, parse_subsystem_config
+
+mod = Module()
+
+mod.setting(
+    "log_level",
+    type=str,
+    default="info",
+    desc="Lowest level written to the Talon log: debug, info, warning or error.",
+)
+mod.setting(
+    "log_subsystems",
+    type=str,
+    default="",
+    desc='Per-subsystem overrides, e.g. "key_forwarder:debug:rate=20, control1_gaze_logger:sample=10".',
+)
+
+
+@mod.action_class
+class Actions:
+    @staticmethod
+    def log_set_level(level: str) -> None:
+        """Set the global log level (debug, info, warning, error)."""
+        LOG.level = parse_level(level)
+
+    @staticmethod
+    def log_configure(spec: str) -> None:
+        """Apply per-subsystem level, rate limit and sampling overrides."""
+        for subsystem, options in parse_subsystem_config(spec).items():
+            LOG.configure(subsystem, **options)
+
+
+def _on_ready() -> None:
+    try:
+        LOG.level = parse_level(settings.get("user.log_level"))
+        for subsystem, options in parse_subsystem_config(settings.get("user.log_subsystems")).items():
+            LOG.configure(subsystem, **options)
+    except ValueError as exc:
+        LOG.error("log_control", "bad log setting", error=exc)
+
+
+app.register("ready", _on_ready)
@@ -0,0 +1,44 @@
+from talon import Module, app, settings
+
+from .shared import unix_server
+from .shared.metrics import METRICS
+from .shared.write_batch import PHRASE_BATCHER
+
+mod = Module()
+
+mod.setting(
+    "metrics_socket_path",
+    type=str,
+    default="",
+    desc="Serve Prometheus text metrics on this Unix socket (empty disables).",
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+METRICS.gauge(
+    "talon_phrase_batch_queued_lines",
+    "dotool lines buffered for the running phrase.",
+    PHRASE_BATCHER.queued,
+)
+
+
+def _handle(_request: str) -> str:
+    # Every request path returns the full exposition; runs on a server thread.
+    return METRICS.render()
+
+
+@mod.action_class
+class Actions:
+    @staticmethod
+    def metrics_report() -> str:
+        """Return pipeline metrics in the Prometheus text format."""
+        return METRICS.render()
+
+
+def _on_ready() -> None:
+    path = settings.get("user.metrics_socket_path")
+    if path:
+        unix_server.serve(path, _handle, "metrics_endpoint", PROMETHEUS_CONTENT_TYPE)
+
+
+app.register("ready", _on_ready)
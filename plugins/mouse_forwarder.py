@@ -1,15 +1,19 @@
 import os
-import subprocess
-import sys
 
 from talon import Context, Module, actions, app, settings, ui
 
 from .key_forwarder.dotool_translate import talon_key_to_dotool_actions
-from .shared.pure_utils import (
-    accumulate_scroll_steps,
-    desktop_bounds_from_rects,
-    normalize_point,
-)
+from .key_forwarder.macro_recorder import MACRO_RECORDER
+from .key_forwarder.modifier_state import MODIFIER_TRACKER
+from .shared import resource_registry
+from .shared.dotool_connection import shared_connection
+from .shared.hires_scroll import accumulate_hires_scroll, merge_wheel, wheel_line
+from .shared.instrumentation import CALLBACK_PROFILER, STARTUP_PROFILER
+from .shared.metrics import METRICS
+from .shared.priority_lanes import shared_motion_lane
+from .shared.pure_utils import accumulate_scroll_steps, desktop_bounds_from_rects
+from .shared.shadow_cursor import SHADOW_CURSOR
+from .shared.write_batch import PHRASE_BATCHER
 
 mod = Module()
 mod.tag(
@@ -17,6 +21,19 @@ mod.tag(
     desc="Enable Wayland mouse forwarder command overrides.",
 )
 
+mod.setting(
+    "mouse_forwarder_hires_scroll",
+    type=bool,
+    default=False,
+    desc="Scroll in 1/120-notch units (needs a dotool build mapping fractional amounts like 'wheel 0.008333' to REL_WHEEL_HI_RES; see README).",
+)
+mod.setting(
+    "mouse_forwarder_scroll_lines_per_notch",
+    type=float,
+    default=3.0,
+    desc="Lines scrolled per wheel notch, for mouse_scroll(by_lines=True).",
+)
+
 ctx = Context()
 ctx.matches = r"""
 os: linux
@@ -45,11 +62,27 @@ class Actions:
     def mouse_forwarder_modified_click(modifiers: str, button: int = 0):
         """Click while holding modifiers via Wayland mouse forwarder."""
 
+    @staticmethod
+    def mouse_forwarder_nudge(dx: float, dy: float):
+        """Move the pointer by dx, dy pixels via Wayland mouse forwarder."""
+
 
-_dotoolc_proc = None
+_connection = shared_connection("mouse_forwarder")
+MODIFIER_TRACKER.use_state(resource_registry.keep("key_forwarder.held_keys", dict))
+_mouse_forwarded = METRICS.counter(
+    "talon_events_forwarded_total", "Talon actions forwarded to dotool.",
+    plugin="mouse_forwarder", kind="mouse",
+)
+# Hi-res scroll lines are coalesced per write, summing anything unwritten.
+# The lanes are ordered: every discrete write flushes them first.
+_wheel_lanes = {
+    command: shared_motion_lane(_connection, f"mouse_forwarder_{command}", ordered=True)
+    for command in ("wheel", "hwheel")
+}
 _pressed_buttons: set[int] = set()
 _vertical_scroll_remainder = 0.0
 _horizontal_scroll_remainder = 0.0
+_desktop_bounds = (0.0, 0.0, 1.0, 1.0)
 
 
 def _is_wayland() -> bool:
@@ -60,6 +93,25 @@ def _is_wayland() -> bool:
     return os.environ.get("XDG_SESSION_TYPE", "").lower() == "wayland"
 
 
+def _forwarding() -> bool:
+    """Return whether to forward to dotool; falls back while the circuit is open."""
+    return _is_wayland() and _connection.available()
+
+
+def _refresh_desktop_bounds() -> None:
+    global _desktop_bounds
+    rects = [
+        (screen.rect.x, screen.rect.y, screen.rect.width, screen.rect.height)
+        for screen in ui.screens()
+    ]
+    _desktop_bounds = desktop_bounds_from_rects(rects)
+
+
+@CALLBACK_PROFILER.profile(__name__)
+def _on_screen_change(_screens) -> None:
+    _refresh_desktop_bounds()
+
+
 def _button_name(button: int) -> str | None:
     if button == 0:
         return "left"
@@ -70,86 +122,20 @@ def _button_name(button: int) -> str | None:
     return None
 
 
-def _close_dotoolc_proc() -> None:
-    global _dotoolc_proc
-    if _dotoolc_proc is None:
-        return
-
-    proc = _dotoolc_proc
-    _dotoolc_proc = None
-
-    try:
-        if proc.stdin is not None:
-            proc.stdin.close()
-    except Exception:
-        pass
-
-    try:
-        proc.terminate()
-        proc.wait(timeout=0.1)
-    except subprocess.TimeoutExpired:
-        try:
-            proc.kill()
-            proc.wait(timeout=0.1)
-        except Exception:
-            pass
-    except Exception:
-        pass
-
-
-def _ensure_dotoolc_proc() -> bool:
-    global _dotoolc_proc
-    if _dotoolc_proc is not None and _dotoolc_proc.poll() is None and _dotoolc_proc.stdin:
-        return True
-
-    _close_dotoolc_proc()
-    try:
-        _dotoolc_proc = subprocess.Popen(
-            ["dotoolc"],
-            stdin=subprocess.PIPE,
-            text=True,
-            bufsize=1,
-        )
-    except Exception as exc:
-        print(f"mouse_forwarder dotoolc error: {exc}", file=sys.stderr, flush=True)
-        _dotoolc_proc = None
-        return False
-
-    if _dotoolc_proc.stdin is None:
-        _close_dotoolc_proc()
-        return False
-    return True
+def _release_held_inputs() -> None:
+    """Release held modifiers and buttons after a failed write."""
+    lines = MODIFIER_TRACKER.release_all()
+    lines.extend(f"buttonup {_button_name(button)}" for button in sorted(_pressed_buttons))
+    _pressed_buttons.clear()
+    _connection.send_lines(lines)
 
 
 def _send_dotool_lines(lines: list[str]) -> None:
-    if not lines:
-        return
-
-    if not _ensure_dotoolc_proc():
-        return
-
-    payload = "".join(f"{line}\n" for line in lines)
-
-    assert _dotoolc_proc is not None
-    assert _dotoolc_proc.stdin is not None
-    try:
-        _dotoolc_proc.stdin.write(payload)
-        _dotoolc_proc.stdin.flush()
-        return
-    except Exception:
-        _close_dotoolc_proc()
-
-    if not _ensure_dotoolc_proc():
-        return
-
-    assert _dotoolc_proc is not None
-    assert _dotoolc_proc.stdin is not None
-    try:
-        _dotoolc_proc.stdin.write(payload)
-        _dotoolc_proc.stdin.flush()
-    except Exception as exc:
-        print(f"mouse_forwarder write error: {exc}", file=sys.stderr, flush=True)
-        _close_dotoolc_proc()
+    _mouse_forwarded.inc()
+    MACRO_RECORDER.capture(lines)
+    lines = MODIFIER_TRACKER.filter_actions(lines)
+    if not PHRASE_BATCHER.send_lines(_connection, lines, _release_held_inputs):
+        _release_held_inputs()
 
 
 def _send_dotool_line(line: str) -> None:
@@ -173,48 +159,68 @@ def _release_all_buttons() -> bool:
     return had_buttons
 
 
-def _scaled_scroll_delta(delta: float, setting_name: str) -> float:
+def _scaled_scroll_delta(delta: float, setting_name: str, by_lines: bool = False) -> float:
+    if by_lines:
+        setting_name = "user.mouse_forwarder_scroll_lines_per_notch"
     unit = settings.get(setting_name)
     if unit == 0:
         return delta
     return delta / unit
 
 
-def _forward_vertical_scroll(delta: float) -> None:
+def _send_wheel(command: str, units: int) -> None:
+    line = wheel_line(command, units)
+    if PHRASE_BATCHER.batching():
+        # Keep phrase order, e.g. a held modifier before the scroll.
+        _send_dotool_line(line)
+        return
+    _mouse_forwarded.inc()
+    MACRO_RECORDER.capture([line])
+    _wheel_lanes[command].submit(line, merge_wheel)
+
+
+def _forward_scroll(command: str, notches: float, remainder: float) -> float:
+    """Send notches on one wheel axis; returns the remainder to carry."""
+    if settings.get("user.mouse_forwarder_hires_scroll"):
+        units, remainder = accumulate_hires_scroll(notches, remainder)
+        if units:
+            _send_wheel(command, units)
+        return remainder
+    steps, remainder = accumulate_scroll_steps(notches, remainder)
+    if steps:
+        _send_dotool_line(f"{command} {steps}")
+    return remainder
+
+
+def _forward_vertical_scroll(delta: float, by_lines: bool = False) -> None:
     global _vertical_scroll_remainder
     if delta == 0:
         return
 
-    scaled = _scaled_scroll_delta(delta, "user.mouse_wheel_down_amount")
-    steps, _vertical_scroll_remainder = accumulate_scroll_steps(
-        scaled,
-        _vertical_scroll_remainder,
+    # dotool wheel is positive upwards, Talon deltas are positive downwards.
+    scaled = _scaled_scroll_delta(delta, "user.mouse_wheel_down_amount", by_lines)
+    _vertical_scroll_remainder = -_forward_scroll(
+        "wheel", -scaled, -_vertical_scroll_remainder
     )
-    if steps == 0:
-        return
-    _send_dotool_line(f"wheel {-steps}")
 
 
-def _forward_horizontal_scroll(delta: float) -> None:
+def _forward_horizontal_scroll(delta: float, by_lines: bool = False) -> None:
     global _horizontal_scroll_remainder
     if delta == 0:
         return
 
-    scaled = _scaled_scroll_delta(delta, "user.mouse_wheel_horizontal_amount")
-    steps, _horizontal_scroll_remainder = accumulate_scroll_steps(
-        scaled,
-        _horizontal_scroll_remainder,
+    scaled = _scaled_scroll_delta(delta, "user.mouse_wheel_horizontal_amount", by_lines)
+    _horizontal_scroll_remainder = _forward_scroll(
+        "hwheel", scaled, _horizontal_scroll_remainder
     )
-    if steps == 0:
-        return
-    _send_dotool_line(f"hwheel {steps}")
 
 
 @ctx.action_class("main")
+@CALLBACK_PROFILER.profile_actions(__name__)
 class MainActions:
     @staticmethod
     def mouse_click(button: int = 0):
-        if not _is_wayland():
+        if not _forwarding():
             actions.next(button)
             return
 
@@ -226,7 +232,7 @@ class MainActions:
 
     @staticmethod
     def mouse_drag(button: int = 0):
-        if not _is_wayland():
+        if not _forwarding():
             actions.next(button)
             return
 
@@ -239,7 +245,7 @@ class MainActions:
 
     @staticmethod
     def mouse_release(button: int = 0):
-        if not _is_wayland():
+        if not _forwarding():
             actions.next(button)
             return
 
@@ -252,34 +258,42 @@ class MainActions:
 
     @staticmethod
     def mouse_move(x: float, y: float):
-        if not _is_wayland():
+        if not _forwarding():
             actions.next(x, y)
             return
 
-        rects = [
-            (screen.rect.x, screen.rect.y, screen.rect.width, screen.rect.height)
-            for screen in ui.screens()
-        ]
-        bounds = desktop_bounds_from_rects(rects)
-        nx, ny = normalize_point(bounds, x, y)
-        _send_dotool_line(f"mouseto {nx:.6f} {ny:.6f}")
+        _send_dotool_line(SHADOW_CURSOR.move_to(_desktop_bounds, x, y))
+
+    @staticmethod
+    def mouse_x() -> float:
+        position = SHADOW_CURSOR.position()
+        if position is None or not _is_wayland():
+            return actions.next()
+        return position[0]
+
+    @staticmethod
+    def mouse_y() -> float:
+        position = SHADOW_CURSOR.position()
+        if position is None or not _is_wayland():
+            return actions.next()
+        return position[1]
 
     @staticmethod
     def mouse_scroll(y: float = 0.0, x: float = 0.0, by_lines: bool = False):
-        if not _is_wayland():
+        if not _forwarding():
             actions.next(y, x, by_lines)
             return
 
-        _ = by_lines
-        _forward_vertical_scroll(y)
-        _forward_horizontal_scroll(x)
+        _forward_vertical_scroll(y, by_lines)
+        _forward_horizontal_scroll(x, by_lines)
 
 
 @ctx.action_class("user")
+@CALLBACK_PROFILER.profile_actions(__name__)
 class UserActions:
     @staticmethod
     def mouse_forwarder_scroll_up(amount: float = 1):
-        if not _is_wayland():
+        if not _forwarding():
             actions.user.mouse_scroll_up(amount)
             return
 
@@ -288,7 +302,7 @@ class UserActions:
 
     @staticmethod
     def mouse_forwarder_scroll_down(amount: float = 1):
-        if not _is_wayland():
+        if not _forwarding():
             actions.user.mouse_scroll_down(amount)
             return
 
@@ -297,7 +311,7 @@ class UserActions:
 
     @staticmethod
     def mouse_forwarder_scroll_left(amount: float = 1):
-        if not _is_wayland():
+        if not _forwarding():
             actions.user.mouse_scroll_left(amount)
             return
 
@@ -306,7 +320,7 @@ class UserActions:
 
     @staticmethod
     def mouse_forwarder_scroll_right(amount: float = 1):
-        if not _is_wayland():
+        if not _forwarding():
             actions.user.mouse_scroll_right(amount)
             return
 
@@ -315,7 +329,7 @@ class UserActions:
 
     @staticmethod
     def mouse_forwarder_modified_click(modifiers: str, button: int = 0):
-        if not _is_wayland():
+        if not _forwarding():
             actions.key(f"{modifiers}:down")
             actions.mouse_click(button)
             actions.key(f"{modifiers}:up")
@@ -327,9 +341,21 @@ class UserActions:
             return
         _send_dotool_lines(_modified_click_lines(modifiers, button_name))
 
+    @staticmethod
+    def mouse_forwarder_nudge(dx: float, dy: float):
+        if not _forwarding():
+            actions.mouse_move(actions.mouse_x() + dx, actions.mouse_y() + dy)
+            return
+
+        line = SHADOW_CURSOR.nudge(_desktop_bounds, dx, dy)
+        if line is None:
+            # No absolute write yet, so only a relative move is possible.
+            line = f"mousemove {dx:g} {dy:g}"
+        _send_dotool_line(line)
+
     @staticmethod
     def mouse_scroll_up(amount: float = 1):
-        if not _is_wayland():
+        if not _forwarding():
             actions.next(amount)
             return
 
@@ -338,7 +364,7 @@ class UserActions:
 
     @staticmethod
     def mouse_scroll_down(amount: float = 1):
-        if not _is_wayland():
+        if not _forwarding():
             actions.next(amount)
             return
 
@@ -347,7 +373,7 @@ class UserActions:
 
     @staticmethod
     def mouse_scroll_left(amount: float = 1):
-        if not _is_wayland():
+        if not _forwarding():
             actions.next(amount)
             return
 
@@ -356,7 +382,7 @@ class UserActions:
 
     @staticmethod
     def mouse_scroll_right(amount: float = 1):
-        if not _is_wayland():
+        if not _forwarding():
             actions.next(amount)
             return
 
@@ -365,13 +391,13 @@ class UserActions:
 
     @staticmethod
     def mouse_drag_end() -> bool:
-        if not _is_wayland():
+        if not _forwarding():
             return actions.next()
         return _release_all_buttons()
 
     @staticmethod
     def mouse_drag_toggle(button: int):
-        if not _is_wayland():
+        if not _forwarding():
             actions.next(button)
             return
 
@@ -381,12 +407,18 @@ class UserActions:
         actions.mouse_drag(button)
 
 
+@CALLBACK_PROFILER.profile(__name__)
 def _on_ready() -> None:
+    _refresh_desktop_bounds()
     if not _is_wayland():
         ctx.tags = []
         return
     ctx.tags = ["user.wayland_mouse_forwarder"]
+    _connection.warm_up()
 
 
-app.register("ready", _on_ready)
+resource_registry.subscribe(
+    "mouse_forwarder.screen_change", ui, "screen_change", _on_screen_change
+)
+app.register("ready", STARTUP_PROFILER.profile_ready(__name__, _on_ready))
 _on_ready()
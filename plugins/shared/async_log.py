@@ -0,0 +1,261 @@
+"""Leveled, rate-limited logging written from a background thread.
+
+Callers on hot paths (key actions, gaze and noise callbacks, writer
+threads) pay a level check and one non-blocking enqueue; formatting and the
+stderr write happen on a daemon thread. Each subsystem can override the
+level, cap its rate with a token bucket and keep only every Nth record, so
+debug output can stay on without flooding the Talon log. Records arriving
+while the queue is full are dropped and counted.
+
+Lines look like:
+
+    DEBUG key_forwarder key spec='ctrl-a'
+    ERROR key_forwarder precompile failed error='permission denied' suppressed=12
+"""
+
+from __future__ import annotations
+
+import atexit
+import queue
+import sys
+import threading
+import time
+from typing import Callable, TextIO
+
+from .metrics import METRICS
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+LEVELS = {name.lower(): level for level, name in LEVEL_NAMES.items()}
+
+DEFAULT_MAX_QUEUE = 4096
+
+Record = tuple[int, str, str, dict]
+
+
+def parse_level(name: str) -> int:
+    """Return the level for a name such as "debug"; raises ValueError."""
+    try:
+        return LEVELS[name.strip().lower()]
+    except KeyError:
+        raise ValueError(f"unknown log level {name!r}") from None
+
+
+def parse_subsystem_config(spec: str) -> dict[str, dict]:
+    """Parse "name[:level][:rate=N][:burst=N][:sample=N], ..." into configure() kwargs.
+
+    Example: "key_forwarder:debug:rate=20, control1_gaze_logger:sample=10".
+
+    Raises:
+        ValueError: for unknown levels or options.
+    """
+    config: dict[str, dict] = {}
+    for entry in spec.split(","):
+        name, *options = [part.strip() for part in entry.split(":")]
+        if not name:
+            continue
+        kwargs: dict = {}
+        for option in options:
+            key, sep, value = option.partition("=")
+            if not sep:
+                kwargs["level"] = parse_level(key)
+            elif key in ("rate", "burst"):
+                kwargs[key] = float(value)
+            elif key == "sample":
+                kwargs["sample_every"] = int(value)
+            else:
+                raise ValueError(f"unknown log option {key!r}")
+        config[name] = kwargs
+    return config
+
+
+def _format_value(value) -> str:
+    if isinstance(value, BaseException):
+        value = str(value) or type(value).__name__
+    if isinstance(value, str):
+        return repr(value)
+    return str(value)
+
+
+def format_record(record: Record) -> str:
+    """Return the log line for a queued record."""
+    level, subsystem, message, fields = record
+    parts = [LEVEL_NAMES.get(level, str(level)), subsystem, message]
+    parts.extend(f"{key}={_format_value(value)}" for key, value in fields.items())
+    return " ".join(part for part in parts if part)
+
+
+class _Subsystem:
+    __slots__ = ("level", "rate", "burst", "sample_every", "tokens", "stamp", "seen", "suppressed")
+
+    def __init__(self) -> None:
+        self.level: int | None = None
+        self.rate: float | None = None
+        self.burst = 1.0
+        self.sample_every = 1
+        self.tokens = 0.0
+        self.stamp = 0.0
+        self.seen = 0
+        self.suppressed = 0
+
+
+class AsyncLog:
+    """Queue log records for a background writer thread."""
+
+    def __init__(
+        self,
+        stream: Callable[[], TextIO] | None = None,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.level = INFO
+        self.written = 0
+        self.rate_limited = 0
+        self.sampled_out = 0
+        self.overflowed = 0
+        self._stream = stream or (lambda: sys.stderr)
+        self._clock = clock
+        self._queue: queue.Queue = queue.Queue(max_queue)
+        self._subsystems: dict[str, _Subsystem] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def configure(
+        self,
+        subsystem: str,
+        level: int | None = None,
+        rate: float | None = None,
+        burst: float | None = None,
+        sample_every: int = 1,
+    ) -> None:
+        """Set a subsystem's level override, rate limit and sampling.
+
+        Args:
+            subsystem: Name used when logging, e.g. "key_forwarder".
+            level: Level for this subsystem (None: the global level).
+            rate: Records per second allowed on average (None: unlimited).
+            burst: Records allowed at once before the rate applies
+                (default: one second's worth).
+            sample_every: Keep one record in every sample_every.
+        """
+        with self._lock:
+            state = self._subsystems.setdefault(subsystem, _Subsystem())
+            state.level = level
+            state.rate = rate
+            state.burst = max(1.0, burst if burst is not None else (rate or 1.0))
+            state.tokens = state.burst
+            state.stamp = self._clock()
+            state.sample_every = max(1, int(sample_every))
+            state.seen = 0
+
+    def enabled(self, level: int, subsystem: str) -> bool:
+        """Return whether records at level from subsystem pass the level check."""
+        state = self._subsystems.get(subsystem)
+        threshold = self.level if state is None or state.level is None else state.level
+        return level >= threshold
+
+    def log(self, level: int, subsystem: str, message: str, **fields) -> bool:
+        """Queue a record; returns whether it was accepted."""
+        if not self.enabled(level, subsystem):
+            return False
+        state = self._subsystems.get(subsystem)
+        if state is not None and (state.rate is not None or state.sample_every > 1):
+            suppressed = self._admit(state)
+            if suppressed is None:
+                return False
+            if suppressed:
+                fields["suppressed"] = suppressed
+        try:
+            self._queue.put_nowait((level, subsystem, message, fields))
+        except queue.Full:
+            self.overflowed += 1
+            return False
+        if self._thread is None:
+            self._start()
+        return True
+
+    def debug(self, subsystem: str, message: str, **fields) -> bool:
+        return self.log(DEBUG, subsystem, message, **fields)
+
+    def info(self, subsystem: str, message: str, **fields) -> bool:
+        return self.log(INFO, subsystem, message, **fields)
+
+    def warning(self, subsystem: str, message: str, **fields) -> bool:
+        return self.log(WARNING, subsystem, message, **fields)
+
+    def error(self, subsystem: str, message: str, **fields) -> bool:
+        return self.log(ERROR, subsystem, message, **fields)
+
+    def flush(self, timeout: float = 1.0) -> bool:
+        """Wait until every queued record is written; False on timeout."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def _admit(self, state: _Subsystem) -> int | None:
+        """Apply sampling and the token bucket; None drops the record.
+
+        Returns:
+            How many records were dropped since the last admitted one.
+        """
+        with self._lock:
+            state.seen += 1
+            if (state.seen - 1) % state.sample_every:
+                self.sampled_out += 1
+                return None
+            if state.rate is not None:
+                now = self._clock()
+                state.tokens = min(state.burst, state.tokens + (now - state.stamp) * state.rate)
+                state.stamp = now
+                if state.tokens < 1.0:
+                    state.suppressed += 1
+                    self.rate_limited += 1
+                    return None
+                state.tokens -= 1.0
+            suppressed, state.suppressed = state.suppressed, 0
+            return suppressed
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="async-log", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            records = [self._queue.get()]
+            while True:
+                try:
+                    records.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                stream = self._stream()
+                stream.write("".join(format_record(record) + "\n" for record in records))
+                stream.flush()
+                self.written += len(records)
+            except Exception:
+                pass
+            finally:
+                for _record in records:
+                    self._queue.task_done()
+
+
+LOG = AsyncLog()
+atexit.register(LOG.flush)
+
+for _outcome in ("written", "rate_limited", "sampled_out", "overflowed"):
+    METRICS.counter_func(
+        "talon_log_records_total",
+        "Log records by outcome.",
+        lambda outcome=_outcome: getattr(LOG, outcome),
+        outcome=_outcome,
+    )
@@ -0,0 +1,92 @@
+"""NumPy batch versions of pure_utils geometry helpers.
+
+Each function takes whole columns of samples and matches its scalar
+counterpart in pure_utils element by element, including NaN, signed zero
+and boundary handling. NumPy is optional: Talon plugins never call these,
+only replay and analytics tooling does.
+"""
+
+from __future__ import annotations
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+RectTuple = tuple[float, float, float, float]
+Bounds = tuple[float, float, float, float]
+
+
+def numpy_available() -> bool:
+    """Return whether NumPy can be imported."""
+    return np is not None
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("numpy is required for batch geometry helpers")
+    return np
+
+
+def _as_float_array(values):
+    return _require_numpy().asarray(values, dtype=np.float64)
+
+
+def clamp01_array(values):
+    """Clamp every value into 0..1, like pure_utils.clamp01.
+
+    Comparisons mirror the scalar version, so NaN and -0.0 pass through
+    unchanged instead of being rewritten as np.clip would.
+    """
+    values = _as_float_array(values)
+    return np.where(values < 0.0, 0.0, np.where(values > 1.0, 1.0, values))
+
+
+def normalize_points(bounds: Bounds, xs, ys):
+    """Convert desktop pixel columns to clamped 0..1 columns.
+
+    Returns:
+        Tuple of (normalized_xs, normalized_ys) arrays.
+    """
+    left, top, width, height = bounds
+    xs = _as_float_array(xs)
+    ys = _as_float_array(ys)
+    return clamp01_array((xs - left) / width), clamp01_array((ys - top) / height)
+
+
+def rect_contains_points(rect: RectTuple, xs, ys):
+    """Return a boolean mask of points inside a rectangle (edges included)."""
+    rect_x, rect_y, rect_width, rect_height = rect
+    xs = _as_float_array(xs)
+    ys = _as_float_array(ys)
+    return (
+        (rect_x <= xs)
+        & (xs <= rect_x + rect_width)
+        & (rect_y <= ys)
+        & (ys <= rect_y + rect_height)
+    )
+
+
+def rect_local_points(rect: RectTuple, xs, ys):
+    """Return rect-local coordinates with NaN outside the rectangle.
+
+    Returns:
+        Tuple of (local_xs, local_ys, inside_mask) arrays.
+    """
+    rect_x, rect_y, _, _ = rect
+    xs = _as_float_array(xs)
+    ys = _as_float_array(ys)
+    inside = rect_contains_points(rect, xs, ys)
+    local_xs = np.where(inside, xs - rect_x, np.nan)
+    local_ys = np.where(inside, ys - rect_y, np.nan)
+    return local_xs, local_ys, inside
+
+
+def screen_indices(rects: list[RectTuple], xs, ys):
+    """Return the index of the first rectangle containing each point, or -1."""
+    xs = _as_float_array(xs)
+    ys = _as_float_array(ys)
+    indices = np.full(xs.shape, -1, dtype=np.int64)
+    for index in range(len(rects) - 1, -1, -1):
+        indices[rect_contains_points(rects[index], xs, ys)] = index
+    return indices
@@ -0,0 +1,81 @@
+"""Circuit breaker with exponential backoff for backend connections."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Fail fast after backend failures and retry with exponential backoff.
+
+    Closed: requests pass. Open: requests fail fast until the retry time.
+    Half-open: one trial request passes; its outcome closes or reopens.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 1,
+        base_delay: float = 0.25,
+        max_delay: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._delay = base_delay
+        self._retry_at = 0.0
+
+    @property
+    def state(self) -> str:
+        """Return closed, open or half-open."""
+        return self._state
+
+    @property
+    def failures(self) -> int:
+        """Return consecutive failures since the last success."""
+        return self._failures
+
+    def retry_delay(self) -> float:
+        """Return seconds until an open breaker allows a trial request."""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self._retry_at - self._clock())
+
+    def allow(self) -> bool:
+        """Return whether a request may be attempted now."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and self._clock() >= self._retry_at:
+                self._state = HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Close the breaker and reset the backoff."""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._delay = self.base_delay
+
+    def record_failure(self) -> bool:
+        """Count a failure; return whether the breaker is now open."""
+        with self._lock:
+            self._failures += 1
+            if self._state != HALF_OPEN and self._failures < self.failure_threshold:
+                return False
+            self._state = OPEN
+            self._retry_at = self._clock() + self._delay
+            self._delay = min(self._delay * 2.0, self.max_delay)
+            return True
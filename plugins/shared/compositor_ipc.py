@@ -0,0 +1,405 @@
+"""Follow the focused window and output layout from sway or niri IPC events.
+
+The compositor pushes focus and output changes over its IPC socket, so a
+background client keeps COMPOSITOR up to date and readers (context scopes,
+geometry consumers) take the cached, immutable values without a round
+trip:
+
+- sway ($SWAYSOCK): i3-ipc framing, "i3-ipc" + length + type + JSON. One
+  connection subscribes to window and output events and also carries the
+  GET_TREE / GET_OUTPUTS queries; their replies and the events are told
+  apart by type.
+- niri ($NIRI_SOCKET): newline-delimited JSON. "EventStream" turns a
+  connection into an event feed, so outputs are queried on a second,
+  short-lived connection, again whenever workspaces change (which is how
+  output hotplug shows up in the stream).
+
+Clients reconnect with exponential backoff when the socket goes away.
+"""
+
+from __future__ import annotations
+
+import abc
+import json
+import os
+import socket
+import struct
+import threading
+from dataclasses import dataclass
+from typing import Callable, Mapping
+
+from .async_log import LOG
+from .metrics import METRICS
+
+I3_MAGIC = b"i3-ipc"
+I3_HEADER = struct.Struct("=6sII")
+
+SWAY_SUBSCRIBE = 2
+SWAY_GET_OUTPUTS = 3
+SWAY_GET_TREE = 4
+SWAY_EVENT = 0x80000000
+SWAY_OUTPUT_EVENT = SWAY_EVENT | 1
+SWAY_WINDOW_EVENT = SWAY_EVENT | 3
+
+FOCUS = "focus"
+OUTPUTS = "outputs"
+
+DEFAULT_RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 30.0
+
+Listener = Callable[[], None]
+
+
+@dataclass(frozen=True)
+class FocusedApp:
+    """The focused window as the compositor reports it."""
+
+    app_id: str
+    title: str = ""
+    pid: int | None = None
+    window_id: int | None = None
+
+
+@dataclass(frozen=True)
+class Output:
+    """An enabled output in logical (scaled) layout coordinates."""
+
+    name: str
+    x: float
+    y: float
+    width: float
+    height: float
+    scale: float = 1.0
+
+
+class CompositorState:
+    """Focus and output layout cached from compositor events.
+
+    Reads are plain attribute loads of immutable values; writers replace
+    them whole and then notify listeners registered for FOCUS or OUTPUTS.
+    Listeners run on the IPC thread.
+    """
+
+    def __init__(self) -> None:
+        self.compositor = ""
+        self.focused: FocusedApp | None = None
+        self.outputs: tuple[Output, ...] = ()
+        self.events = 0
+        self._listeners: dict[str, list[Listener]] = {FOCUS: [], OUTPUTS: []}
+        self._lock = threading.Lock()
+
+    def register(self, topic: str, listener: Listener) -> None:
+        with self._lock:
+            self._listeners[topic] = [*self._listeners[topic], listener]
+
+    def unregister(self, topic: str, listener: Listener) -> None:
+        with self._lock:
+            self._listeners[topic] = [
+                registered for registered in self._listeners[topic] if registered is not listener
+            ]
+
+    def set_focused(self, focused: FocusedApp | None) -> None:
+        if focused == self.focused:
+            return
+        self.focused = focused
+        self._notify(FOCUS)
+
+    def set_outputs(self, outputs: list[Output]) -> None:
+        outputs = tuple(sorted(outputs, key=lambda output: (output.x, output.y, output.name)))
+        if outputs == self.outputs:
+            return
+        self.outputs = outputs
+        self._notify(OUTPUTS)
+
+    def reset(self) -> None:
+        """Forget everything, e.g. when the compositor connection is lost."""
+        self.compositor = ""
+        self.set_focused(None)
+        self.set_outputs([])
+
+    def status(self) -> str:
+        focused = self.focused
+        return (
+            f"compositor={self.compositor or 'none'} events={self.events} "
+            f"app_id={focused.app_id if focused else ''} outputs={len(self.outputs)}"
+        )
+
+    def _notify(self, topic: str) -> None:
+        for listener in self._listeners[topic]:
+            try:
+                listener()
+            except Exception as exc:
+                LOG.error("compositor_ipc", "listener failed", topic=topic, error=exc)
+
+
+COMPOSITOR = CompositorState()
+
+METRICS.counter_func(
+    "talon_compositor_events_total",
+    "Focus and output events received over compositor IPC.",
+    lambda: COMPOSITOR.events,
+)
+
+
+def sway_message(message_type: int, payload: str = "") -> bytes:
+    """Return an i3-ipc message."""
+    data = payload.encode("utf-8")
+    return I3_HEADER.pack(I3_MAGIC, len(data), message_type) + data
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError("compositor closed the IPC socket")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_sway_message(sock: socket.socket) -> tuple[int, object]:
+    """Read one i3-ipc message; returns its type and decoded JSON payload."""
+    magic, length, message_type = I3_HEADER.unpack(_recv_exact(sock, I3_HEADER.size))
+    if magic != I3_MAGIC:
+        raise ValueError("bad i3-ipc magic")
+    return message_type, json.loads(_recv_exact(sock, length))
+
+
+def sway_focused_app(node: Mapping) -> FocusedApp:
+    """Return the FocusedApp for a sway container node."""
+    app_id = node.get("app_id") or (node.get("window_properties") or {}).get("class") or ""
+    return FocusedApp(
+        app_id=app_id,
+        title=node.get("name") or "",
+        pid=node.get("pid"),
+        window_id=node.get("id"),
+    )
+
+
+def sway_find_focused(tree: Mapping) -> FocusedApp | None:
+    """Return the focused view in a GET_TREE reply, if any."""
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        children = [*node.get("nodes", ()), *node.get("floating_nodes", ())]
+        if node.get("focused") and not children and node.get("type") in ("con", "floating_con"):
+            return sway_focused_app(node)
+        stack.extend(children)
+    return None
+
+
+def sway_outputs(reply: list) -> list[Output]:
+    """Return the active outputs in a GET_OUTPUTS reply."""
+    return [
+        Output(
+            name=output["name"],
+            x=output["rect"]["x"],
+            y=output["rect"]["y"],
+            width=output["rect"]["width"],
+            height=output["rect"]["height"],
+            scale=output.get("scale") or 1.0,
+        )
+        for output in reply
+        if output.get("active")
+    ]
+
+
+def niri_focused_app(window: Mapping) -> FocusedApp:
+    """Return the FocusedApp for a niri window object."""
+    return FocusedApp(
+        app_id=window.get("app_id") or "",
+        title=window.get("title") or "",
+        pid=window.get("pid"),
+        window_id=window.get("id"),
+    )
+
+
+def niri_outputs(reply: Mapping) -> list[Output]:
+    """Return the enabled outputs in a niri "Outputs" reply."""
+    outputs = reply["Ok"]["Outputs"]
+    return [
+        Output(
+            name=name,
+            x=logical["x"],
+            y=logical["y"],
+            width=logical["width"],
+            height=logical["height"],
+            scale=logical.get("scale") or 1.0,
+        )
+        for name, output in outputs.items()
+        if (logical := output.get("logical"))
+    ]
+
+
+def niri_request(path: str, request: str, timeout: float = 2.0):
+    """Send one niri IPC request on a fresh connection; returns the reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        return json.loads(sock.makefile("rb").readline())
+
+
+class _IpcClient(abc.ABC):
+    """Run a compositor session on a daemon thread, reconnecting on loss."""
+
+    compositor = ""
+
+    def __init__(
+        self,
+        path: str,
+        state: CompositorState = COMPOSITOR,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+        max_retry_delay: float = MAX_RETRY_DELAY,
+    ) -> None:
+        self.path = path
+        self.state = state
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._stop = threading.Event()
+        self._sock: socket.socket | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name=f"{self.compositor}-ipc", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _run(self) -> None:
+        delay = self.retry_delay
+        while not self._stop.is_set():
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.connect(self.path)
+                    self._sock = sock
+                    self.state.compositor = self.compositor
+                    delay = self.retry_delay
+                    self._session(sock)
+            except (OSError, ValueError, KeyError, TypeError) as exc:
+                if not self._stop.is_set():
+                    LOG.warning(
+                        "compositor_ipc", "connection lost", compositor=self.compositor, error=exc
+                    )
+            finally:
+                self._sock = None
+            if self._stop.is_set():
+                break
+            self.state.reset()
+            self._stop.wait(delay)
+            delay = min(delay * 2, self.max_retry_delay)
+        self.state.reset()
+
+    @abc.abstractmethod
+    def _session(self, sock: socket.socket) -> None:
+        """Query the initial state, then apply events until the socket closes."""
+
+
+class SwayClient(_IpcClient):
+    """Follow sway window focus and outputs over i3-ipc."""
+
+    compositor = "sway"
+
+    def _session(self, sock: socket.socket) -> None:
+        sock.sendall(
+            sway_message(SWAY_SUBSCRIBE, json.dumps(["window", "output"]))
+            + sway_message(SWAY_GET_TREE)
+            + sway_message(SWAY_GET_OUTPUTS)
+        )
+        state = self.state
+        while not self._stop.is_set():
+            message_type, payload = read_sway_message(sock)
+            if message_type == SWAY_GET_TREE:
+                state.set_focused(sway_find_focused(payload))
+            elif message_type == SWAY_GET_OUTPUTS:
+                state.set_outputs(sway_outputs(payload))
+            elif message_type == SWAY_WINDOW_EVENT:
+                state.events += 1
+                self._on_window(payload)
+            elif message_type == SWAY_OUTPUT_EVENT:
+                state.events += 1
+                sock.sendall(sway_message(SWAY_GET_OUTPUTS))
+            elif message_type == SWAY_SUBSCRIBE and not payload.get("success"):
+                raise ValueError("sway refused the event subscription")
+
+    def _on_window(self, event: Mapping) -> None:
+        change = event.get("change")
+        container = event.get("container") or {}
+        focused = self.state.focused
+        if change == "focus" or (change == "title" and container.get("focused")):
+            self.state.set_focused(sway_focused_app(container))
+        elif change == "close" and focused is not None and focused.window_id == container.get("id"):
+            self.state.set_focused(None)
+
+
+class NiriClient(_IpcClient):
+    """Follow niri window focus and outputs over its JSON event stream."""
+
+    compositor = "niri"
+
+    def _session(self, sock: socket.socket) -> None:
+        sock.sendall(b'"EventStream"\n')
+        stream = sock.makefile("rb")
+        reply = json.loads(stream.readline() or b"null")
+        if not isinstance(reply, dict) or "Ok" not in reply:
+            raise ValueError(f"niri refused the event stream: {reply!r}")
+        self._refresh_outputs()
+        windows: dict[int, Mapping] = {}
+        for line in stream:
+            if self._stop.is_set():
+                return
+            self.state.events += 1
+            self._on_event(json.loads(line), windows)
+        raise ConnectionError("compositor closed the IPC socket")
+
+    def _refresh_outputs(self) -> None:
+        self.state.set_outputs(niri_outputs(niri_request(self.path, "Outputs")))
+
+    def _on_event(self, event: Mapping, windows: dict[int, Mapping]) -> None:
+        state = self.state
+        if "WindowsChanged" in event:
+            windows.clear()
+            focused = None
+            for window in event["WindowsChanged"]["windows"]:
+                windows[window["id"]] = window
+                if window.get("is_focused"):
+                    focused = niri_focused_app(window)
+            state.set_focused(focused)
+        elif "WindowOpenedOrChanged" in event:
+            window = event["WindowOpenedOrChanged"]["window"]
+            windows[window["id"]] = window
+            if window.get("is_focused"):
+                state.set_focused(niri_focused_app(window))
+        elif "WindowClosed" in event:
+            window_id = event["WindowClosed"]["id"]
+            windows.pop(window_id, None)
+            if state.focused is not None and state.focused.window_id == window_id:
+                state.set_focused(None)
+        elif "WindowFocusChanged" in event:
+            window = windows.get(event["WindowFocusChanged"]["id"])
+            state.set_focused(None if window is None else niri_focused_app(window))
+        elif "WorkspacesChanged" in event:
+            self._refresh_outputs()
+
+
+def client_for_environment(
+    environ: Mapping[str, str] = os.environ, state: CompositorState = COMPOSITOR
+) -> _IpcClient | None:
+    """Return an unstarted client for the compositor in environ, if any."""
+    if environ.get("NIRI_SOCKET"):
+        return NiriClient(environ["NIRI_SOCKET"], state)
+    if environ.get("SWAYSOCK"):
+        return SwayClient(environ["SWAYSOCK"], state)
+    return None
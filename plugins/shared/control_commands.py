@@ -0,0 +1,51 @@
+"""Parse the one-line control socket protocol.
+
+A request is a command name optionally followed by on, off or toggle:
+
+    speech toggle
+    control1 on
+    hiss off
+    overlay
+    stats
+    ping
+
+A bare toggle command flips the current state.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+TOGGLE_COMMANDS = ("speech", "control1", "hiss", "overlay")
+QUERY_COMMANDS = ("stats", "ping")
+
+_STATES = {"on": True, "off": False, "toggle": None}
+
+
+@dataclass(frozen=True)
+class ControlCommand:
+    """A parsed request: name plus the requested state (None: toggle)."""
+
+    name: str
+    state: bool | None = None
+
+
+def parse_control_command(line: str) -> ControlCommand:
+    """Parse a request line.
+
+    Raises:
+        ValueError: for unknown commands or arguments.
+    """
+    words = line.strip().lower().split()
+    if not words:
+        raise ValueError("empty command")
+    name, args = words[0], words[1:]
+    if name in QUERY_COMMANDS:
+        if args:
+            raise ValueError(f"{name} takes no argument")
+        return ControlCommand(name)
+    if name not in TOGGLE_COMMANDS:
+        raise ValueError(f"unknown command {name!r}")
+    if len(args) > 1 or (args and args[0] not in _STATES):
+        raise ValueError(f"expected on, off or toggle after {name}")
+    return ControlCommand(name, _STATES[args[0]] if args else None)
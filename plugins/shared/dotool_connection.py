@@ -0,0 +1,478 @@
+"""Persistent, supervised dotoolc connections shared by forwarder plugins."""
+
+from __future__ import annotations
+
+import os
+import queue
+import subprocess
+import threading
+import time
+import weakref
+from typing import Callable
+
+from .async_log import LOG
+from .circuit_breaker import OPEN, CircuitBreaker
+from .instrumentation import CALLBACK_BUCKETS_MS, LatencyStats
+from .metrics import METRICS
+from .priority_lanes import DISCRETE, LANE_GATE
+from .resource_registry import keep
+
+DOTOOLC_COMMAND = ("dotoolc",)
+DEFAULT_DOTOOL_PIPE = "/tmp/dotool-pipe"
+
+HealthCheck = Callable[[], bool]
+SendCallback = Callable[[bool], None]
+ProcessFactory = Callable[[list[str]], subprocess.Popen]
+
+
+def spawn_dotoolc(command: list[str]) -> subprocess.Popen:
+    """Spawn a dotoolc process reading action lines from stdin."""
+    return subprocess.Popen(
+        command,
+        stdin=subprocess.PIPE,
+        text=True,
+        bufsize=1,
+    )
+
+
+_process_factory: ProcessFactory = spawn_dotoolc
+_session_lines: list[str] = []
+_connections: weakref.WeakSet[DotoolConnection] = weakref.WeakSet()
+
+
+def set_session_lines(lines: list[str]) -> None:
+    """Set lines sent once per connection and resend them to live connections.
+
+    Args:
+        lines: Session setup lines, e.g. dotool timing commands.
+    """
+    global _session_lines
+    _session_lines = list(lines)
+    for connection in list(_connections):
+        connection.resend_session_lines()
+
+
+def set_process_factory(factory: ProcessFactory | None) -> None:
+    """Replace how connections spawn dotoolc; None restores spawn_dotoolc.
+
+    The factory gets the command and returns a Popen-like object with a text
+    stdin, poll(), terminate(), kill() and wait().
+    """
+    global _process_factory
+    _process_factory = spawn_dotoolc if factory is None else factory
+
+
+def session_lines() -> list[str]:
+    """Return the lines sent at the start of each connection."""
+    return list(_session_lines)
+
+
+def connections() -> list[DotoolConnection]:
+    """Return all live connection objects sorted by name."""
+    return sorted(_connections, key=lambda connection: connection.name)
+
+
+def shared_connection(name: str, **options) -> DotoolConnection:
+    """Return the connection kept for name, reused across plugin reloads.
+
+    A reloaded plugin gets its live dotoolc process back instead of
+    orphaning it. A connection built by a reloaded DotoolConnection class
+    is closed and replaced; options only apply when building.
+    """
+    return keep(
+        f"dotool:{name}",
+        lambda: DotoolConnection(name, **options),
+        DotoolConnection.close,
+        reuse=lambda connection: isinstance(connection, DotoolConnection),
+    )
+
+
+def dotool_pipe_path() -> str:
+    """Return the FIFO dotoold reads from."""
+    return os.environ.get("DOTOOL_PIPE", DEFAULT_DOTOOL_PIPE)
+
+
+def dotoold_listening(pipe_path: str | None = None) -> bool:
+    """Return whether a dotoold process is reading the dotool pipe.
+
+    Opening a FIFO for writing without blocking fails when nobody reads it,
+    which makes this a cheap health probe with no dotoolc spawn.
+    """
+    path = dotool_pipe_path() if pipe_path is None else pipe_path
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+    except OSError:
+        return False
+    os.close(fd)
+    return True
+
+
+def _encode_lines(lines: list[str]) -> str:
+    return "".join(f"{line}\n" for line in lines)
+
+
+def _close_proc(proc: subprocess.Popen) -> None:
+    try:
+        if proc.stdin is not None:
+            proc.stdin.close()
+    except Exception:
+        pass
+
+    try:
+        proc.terminate()
+        proc.wait(timeout=0.1)
+    except subprocess.TimeoutExpired:
+        try:
+            proc.kill()
+            proc.wait(timeout=0.1)
+        except Exception:
+            pass
+    except Exception:
+        pass
+
+
+class DotoolConnection:
+    """A lazily spawned, persistent dotoolc process fed line by line.
+
+    Failures open a circuit breaker so callers fail fast (or fall back)
+    instead of spawning dotoolc on every event; a background thread then
+    reconnects with exponential backoff. With an idle timeout, the process
+    is closed after that many seconds without writes.
+
+    Writes on the discrete lane hold LANE_GATE so motion lanes yield to
+    them. With a pipe path, dotoolc and the health probe target that
+    dotoold pipe instead of DOTOOL_PIPE.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        command: tuple[str, ...] = DOTOOLC_COMMAND,
+        health_check: HealthCheck | None = dotoold_listening,
+        idle_timeout: float | None = None,
+        breaker: CircuitBreaker | None = None,
+        lane: str = DISCRETE,
+        pipe_path: str | None = None,
+    ):
+        self.name = name
+        self._command = list(command)
+        self._health_check = health_check
+        self.lane = lane
+        self.pipe_path = pipe_path
+        self.idle_timeout = idle_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._proc: subprocess.Popen | None = None
+        self._lock = threading.RLock()
+        self._last_write = time.monotonic()
+        self._reconnecting = False
+        # Set by close(); stops a reconnect loop before its next attempt.
+        self._closed = threading.Event()
+        self._idle_watch = False
+        self._pending: queue.SimpleQueue | None = None
+        self._register_metrics()
+        _connections.add(self)
+
+    def _register_metrics(self) -> None:
+        plugin = self.name
+        self.writes = METRICS.counter(
+            "talon_dotool_writes_total", "Writes to dotoolc.", plugin=plugin
+        )
+        self.lines_written = METRICS.counter(
+            "talon_dotool_lines_written_total", "dotool lines written.", plugin=plugin
+        )
+        self.write_failures = METRICS.counter(
+            "talon_dotool_write_failures_total",
+            "Writes dropped or failed (circuit open or dotoolc gone).",
+            plugin=plugin,
+        )
+        self.reconnects = METRICS.counter(
+            "talon_dotool_reconnects_total",
+            "Background reconnects after the circuit opened.",
+            plugin=plugin,
+        )
+        self.write_latency = LatencyStats(CALLBACK_BUCKETS_MS)
+        METRICS.histogram(
+            "talon_dotool_write_seconds",
+            "Time spent writing to dotoolc.",
+            self.write_latency,
+            plugin=plugin,
+        )
+        METRICS.gauge(
+            "talon_dotool_connected", "Whether dotoolc is running.", self.connected, plugin=plugin
+        )
+        METRICS.gauge(
+            "talon_dotool_circuit_open",
+            "Whether the circuit breaker is open.",
+            lambda: self.breaker.state == OPEN,
+            plugin=plugin,
+        )
+        METRICS.gauge(
+            "talon_dotool_queue_depth",
+            "Batches waiting for the async writer.",
+            lambda: 0 if self._pending is None else self._pending.qsize(),
+            plugin=plugin,
+        )
+
+    def connected(self) -> bool:
+        """Return whether the dotoolc process is alive."""
+        proc = self._proc
+        return proc is not None and proc.poll() is None and proc.stdin is not None
+
+    def available(self) -> bool:
+        """Return whether writes may be attempted (circuit not open)."""
+        return self.breaker.state != OPEN or self.breaker.retry_delay() == 0.0
+
+    def reconnecting(self) -> bool:
+        """Return whether a background reconnect loop is running."""
+        return self._reconnecting
+
+    def status(self) -> str:
+        """Return a one-line health summary."""
+        return (
+            f"{self.name} lane={self.lane} state={self.breaker.state} "
+            f"connected={self.connected()} failures={self.breaker.failures}"
+        )
+
+    def set_pipe(self, pipe_path: str | None) -> None:
+        """Target another dotoold pipe (None: DOTOOL_PIPE), reconnecting lazily."""
+        with self._lock:
+            if pipe_path == self.pipe_path:
+                return
+            self.pipe_path = pipe_path
+            self._drop_proc()
+
+    def ensure(self) -> bool:
+        """Spawn dotoolc if needed and send the session lines to it."""
+        with self._lock:
+            if self.connected():
+                return True
+            if not self.breaker.allow():
+                return False
+            if self._connect():
+                self.breaker.record_success()
+                return True
+            self._record_failure()
+            return False
+
+    def warm_up(self) -> threading.Thread:
+        """Spawn dotoolc on a background thread so the first write is fast."""
+        thread = threading.Thread(
+            target=self.ensure,
+            name=f"{self.name}-warm-up",
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    def close(self) -> None:
+        """Close the dotoolc process and stop any background reconnect.
+
+        A later write still reconnects lazily.
+        """
+        self._closed.set()
+        self._drop_proc()
+
+    def _drop_proc(self) -> None:
+        with self._lock:
+            proc = self._proc
+            self._proc = None
+            if proc is not None:
+                _close_proc(proc)
+
+    def send_lines(self, lines: list[str]) -> bool:
+        """Write lines to dotoolc, reconnecting once on failure.
+
+        Args:
+            lines: dotool action lines without trailing newlines.
+
+        Returns:
+            Whether the lines were written; False immediately while the
+            circuit is open.
+        """
+        if not lines:
+            return True
+        return self.send_payload(_encode_lines(lines))
+
+    def send_payload(self, payload: str) -> bool:
+        """Write pre-encoded, newline-terminated lines in one write.
+
+        Args:
+            payload: dotool input text, e.g. a compiled macro.
+
+        Returns:
+            Whether the payload was written, as for send_lines.
+        """
+        if not payload:
+            return True
+
+        if self.lane == DISCRETE:
+            with LANE_GATE.discrete():
+                return self._send_payload(payload)
+        return self._send_payload(payload)
+
+    def _send_payload(self, payload: str) -> bool:
+        with self._lock:
+            for _attempt in range(2):
+                if not self.ensure():
+                    self.write_failures.inc()
+                    return False
+                started = time.perf_counter()
+                if self._write_payload(payload):
+                    self.write_latency.record((time.perf_counter() - started) * 1000.0)
+                    self._last_write = time.monotonic()
+                    self.writes.inc()
+                    self.lines_written.inc(payload.count("\n"))
+                    return True
+                self._drop_proc()
+            self._record_failure()
+            self.write_failures.inc()
+        LOG.warning(self.name, "write failed: dotoolc closed")
+        return False
+
+    def send_line(self, line: str) -> bool:
+        """Write one line to dotoolc."""
+        return self.send_lines([line])
+
+    def send_lines_async(
+        self, lines: list[str], on_done: SendCallback | None = None
+    ) -> None:
+        """Queue lines for a background writer so the caller never blocks.
+
+        Args:
+            lines: dotool action lines without trailing newlines.
+            on_done: Optional callback receiving whether the write succeeded.
+        """
+        pending = self._pending
+        if pending is None:
+            with self._lock:
+                if self._pending is None:
+                    self._pending = queue.SimpleQueue()
+                    threading.Thread(
+                        target=self._async_writer,
+                        args=(self._pending,),
+                        name=f"{self.name}-writer",
+                        daemon=True,
+                    ).start()
+                pending = self._pending
+        pending.put((lines, on_done))
+
+    def resend_session_lines(self) -> None:
+        """Send the current session lines if the connection is live."""
+        with self._lock:
+            if self.connected() and not self._write(_session_lines):
+                self._drop_proc()
+
+    def _async_writer(self, pending: queue.SimpleQueue) -> None:
+        while True:
+            lines, on_done = pending.get()
+            ok = self.send_lines(lines)
+            if on_done is not None:
+                try:
+                    on_done(ok)
+                except Exception as exc:
+                    LOG.error(self.name, "send callback failed", error=exc)
+
+    def _connect(self) -> bool:
+        self._drop_proc()
+        if not self._healthy():
+            return False
+        try:
+            proc = _process_factory(self._spawn_command())
+        except Exception as exc:
+            LOG.error(self.name, "dotoolc spawn failed", error=exc)
+            return False
+
+        if proc.stdin is None:
+            _close_proc(proc)
+            return False
+        self._proc = proc
+        if not self._write(_session_lines):
+            self._drop_proc()
+            return False
+        self._last_write = time.monotonic()
+        self._start_idle_watch()
+        return True
+
+    def _healthy(self) -> bool:
+        if self._health_check is None:
+            return True
+        if self._health_check is dotoold_listening:
+            return dotoold_listening(self.pipe_path)
+        return self._health_check()
+
+    def _spawn_command(self) -> list[str]:
+        if self.pipe_path is None:
+            return self._command
+        return ["env", f"DOTOOL_PIPE={self.pipe_path}", *self._command]
+
+    def _record_failure(self) -> None:
+        if self.breaker.record_failure():
+            self._start_reconnect()
+
+    def _start_reconnect(self) -> None:
+        if self._reconnecting:
+            return
+        self._reconnecting = True
+        self._closed.clear()
+        threading.Thread(
+            target=self._reconnect_loop,
+            name=f"{self.name}-reconnect",
+            daemon=True,
+        ).start()
+
+    def _reconnect_loop(self) -> None:
+        try:
+            while self.breaker.state == OPEN:
+                if self._closed.wait(self.breaker.retry_delay()):
+                    return
+                with self._lock:
+                    if self._closed.is_set():
+                        return
+                    reconnected = self.ensure()
+                if reconnected:
+                    self.reconnects.inc()
+                    LOG.info(self.name, "reconnected")
+                    return
+        finally:
+            self._reconnecting = False
+
+    def _start_idle_watch(self) -> None:
+        if self.idle_timeout is None or self._idle_watch:
+            return
+        self._idle_watch = True
+        threading.Thread(
+            target=self._idle_loop,
+            name=f"{self.name}-idle",
+            daemon=True,
+        ).start()
+
+    def _idle_loop(self) -> None:
+        assert self.idle_timeout is not None
+        try:
+            while self.connected():
+                idle = time.monotonic() - self._last_write
+                if idle >= self.idle_timeout:
+                    with self._lock:
+                        if time.monotonic() - self._last_write >= self.idle_timeout:
+                            self._drop_proc()
+                            return
+                    continue
+                time.sleep(self.idle_timeout - idle)
+        finally:
+            self._idle_watch = False
+
+    def _write(self, lines: list[str]) -> bool:
+        return self._write_payload(_encode_lines(lines))
+
+    def _write_payload(self, payload: str) -> bool:
+        if not payload:
+            return True
+        proc = self._proc
+        if proc is None or proc.stdin is None:
+            return False
+        try:
+            proc.stdin.write(payload)
+            proc.stdin.flush()
+        except Exception:
+            return False
+        return True
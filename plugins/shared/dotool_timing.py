@@ -0,0 +1,28 @@
+"""Named dotool timing profiles sent once per connection."""
+
+from __future__ import annotations
+
+# Milliseconds for dotool's keydelay, keyhold, typedelay and typehold.
+TIMING_PROFILES = {
+    "low-latency": {"keydelay": 0, "keyhold": 2, "typedelay": 1, "typehold": 2},
+    "compatible": {"keydelay": 2, "keyhold": 8, "typedelay": 2, "typehold": 8},
+    "games": {"keydelay": 10, "keyhold": 35, "typedelay": 10, "typehold": 35},
+}
+
+DEFAULT_TIMING_PROFILE = "compatible"
+
+
+def timing_profile_lines(name: str) -> list[str]:
+    """Return dotool setup lines for a named timing profile.
+
+    Args:
+        name: Profile name from TIMING_PROFILES.
+
+    Returns:
+        Lines like "keydelay 2".
+
+    Raises:
+        KeyError: If the profile name is unknown.
+    """
+    profile = TIMING_PROFILES[name]
+    return [f"{command} {value}" for command, value in profile.items()]
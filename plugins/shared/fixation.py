@@ -0,0 +1,229 @@
+"""Streaming fixation/saccade detection and dwell timing for gaze samples.
+
+The detector combines I-VT (sample velocity above a threshold is a saccade)
+with I-DT (a window whose dispersion stays below a threshold is a fixation).
+Samples live in a fixed-size ring buffer and window min/max are tracked with
+monotonic deques, so each update is amortized O(1).
+"""
+
+from __future__ import annotations
+
+from collections import deque
+import math
+import operator
+
+FIXATION = "fixation"
+SACCADE = "saccade"
+TRANSITION = "transition"
+
+PointTuple = tuple[float, float]
+
+
+class FixationDetector:
+    """Classify gaze samples as fixation, saccade or transition."""
+
+    def __init__(
+        self,
+        velocity_threshold: float = 1000.0,
+        dispersion_threshold: float = 60.0,
+        window: float = 0.1,
+        capacity: int = 256,
+    ) -> None:
+        self.velocity_threshold = velocity_threshold
+        self.dispersion_threshold = dispersion_threshold
+        self.window = window
+        self._capacity = max(2, capacity)
+        self._ts = [0.0] * self._capacity
+        self._xs = [0.0] * self._capacity
+        self._ys = [0.0] * self._capacity
+        self._min_x: deque[int] = deque()
+        self._max_x: deque[int] = deque()
+        self._min_y: deque[int] = deque()
+        self._max_y: deque[int] = deque()
+        self.reset()
+
+    def configure(
+        self,
+        velocity_threshold: float,
+        dispersion_threshold: float,
+        window: float,
+    ) -> None:
+        """Update thresholds without discarding buffered samples."""
+        self.velocity_threshold = velocity_threshold
+        self.dispersion_threshold = dispersion_threshold
+        self.window = window
+
+    def reset(self) -> None:
+        """Forget all samples and the current fixation."""
+        self._head = 0
+        self._next = 0
+        self._sum_x = 0.0
+        self._sum_y = 0.0
+        self._window_started = 0.0
+        self._clear_extremes()
+        self.kind = TRANSITION
+        self.velocity = 0.0
+        self.fixation_id = 0
+        self.fixation_start: float | None = None
+        self.last_ts: float | None = None
+        self._last_point: PointTuple | None = None
+
+    def update(self, ts: float, x: float, y: float) -> str:
+        """Add one sample and return its classification.
+
+        A repeated timestamp returns the previous classification, so a gaze
+        event that brings no new sample is not counted twice.
+        """
+        if ts == self.last_ts:
+            return self.kind
+
+        self.velocity = self._velocity(ts, x, y)
+        self.last_ts = ts
+        self._last_point = (x, y)
+
+        if self.velocity > self.velocity_threshold:
+            self._restart_window(ts)
+            self._push(ts, x, y)
+            self._end_fixation()
+            self.kind = SACCADE
+            return self.kind
+
+        self._push(ts, x, y)
+        while self._size() > 1 and ts - self._ts[self._head % self._capacity] > self.window:
+            self._pop()
+
+        if self.dispersion() > self.dispersion_threshold:
+            self._end_fixation()
+            self.kind = TRANSITION
+            return self.kind
+        if ts - self._window_started < self.window:
+            self.kind = TRANSITION
+            return self.kind
+
+        if self.fixation_start is None:
+            self.fixation_start = self._ts[self._head % self._capacity]
+            self.fixation_id += 1
+        self.kind = FIXATION
+        return self.kind
+
+    def dispersion(self) -> float:
+        """Return (max x - min x) + (max y - min y) over the window."""
+        if not self._min_x:
+            return 0.0
+        cap = self._capacity
+        width = self._xs[self._max_x[0] % cap] - self._xs[self._min_x[0] % cap]
+        height = self._ys[self._max_y[0] % cap] - self._ys[self._min_y[0] % cap]
+        return width + height
+
+    def centroid(self) -> PointTuple | None:
+        """Return the mean point of the window, or None when empty."""
+        size = self._size()
+        if size == 0:
+            return None
+        return (self._sum_x / size, self._sum_y / size)
+
+    def fixation_duration(self) -> float:
+        """Return seconds since the current fixation started, or 0."""
+        if self.fixation_start is None or self.last_ts is None:
+            return 0.0
+        return self.last_ts - self.fixation_start
+
+    def _velocity(self, ts: float, x: float, y: float) -> float:
+        if self._last_point is None or self.last_ts is None:
+            return 0.0
+        dt = ts - self.last_ts
+        if dt <= 0.0:
+            return 0.0
+        last_x, last_y = self._last_point
+        return math.hypot(x - last_x, y - last_y) / dt
+
+    def _end_fixation(self) -> None:
+        self.fixation_start = None
+
+    def _restart_window(self, ts: float) -> None:
+        self._head = self._next
+        self._sum_x = 0.0
+        self._sum_y = 0.0
+        self._window_started = ts
+        self._clear_extremes()
+
+    def _clear_extremes(self) -> None:
+        self._min_x.clear()
+        self._max_x.clear()
+        self._min_y.clear()
+        self._max_y.clear()
+
+    def _size(self) -> int:
+        return self._next - self._head
+
+    def _push(self, ts: float, x: float, y: float) -> None:
+        if self._size() == 0:
+            self._window_started = ts
+        if self._size() == self._capacity:
+            self._pop()
+        seq = self._next
+        slot = seq % self._capacity
+        self._ts[slot] = ts
+        self._xs[slot] = x
+        self._ys[slot] = y
+        self._next += 1
+        self._sum_x += x
+        self._sum_y += y
+        _push_extreme(self._min_x, self._xs, self._capacity, seq, x, operator.ge)
+        _push_extreme(self._max_x, self._xs, self._capacity, seq, x, operator.le)
+        _push_extreme(self._min_y, self._ys, self._capacity, seq, y, operator.ge)
+        _push_extreme(self._max_y, self._ys, self._capacity, seq, y, operator.le)
+
+    def _pop(self) -> None:
+        seq = self._head
+        slot = seq % self._capacity
+        self._sum_x -= self._xs[slot]
+        self._sum_y -= self._ys[slot]
+        self._head += 1
+        for extremes in (self._min_x, self._max_x, self._min_y, self._max_y):
+            if extremes and extremes[0] == seq:
+                extremes.popleft()
+
+
+def _push_extreme(extremes, values, capacity, seq, value, dominated) -> None:
+    """Append seq to a monotonic deque, dropping entries value dominates."""
+    while extremes and dominated(values[extremes[-1] % capacity], value):
+        extremes.pop()
+    extremes.append(seq)
+
+
+class DwellTimer:
+    """Fire once when a fixation stays within a radius for the dwell time."""
+
+    def __init__(self, dwell_time: float = 0.8, radius: float = 40.0) -> None:
+        self.dwell_time = dwell_time
+        self.radius = radius
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the current dwell anchor."""
+        self.anchor: PointTuple | None = None
+        self.started: float | None = None
+        self.fired = False
+        self.progress = 0.0
+
+    def update(self, ts: float, kind: str, point: PointTuple | None) -> bool:
+        """Advance the dwell timer; return True exactly once per dwell."""
+        if kind != FIXATION or point is None:
+            self.reset()
+            return False
+
+        if self.anchor is None or math.dist(point, self.anchor) > self.radius:
+            self.anchor = point
+            self.started = ts
+            self.fired = False
+
+        assert self.started is not None
+        if self.dwell_time <= 0.0:
+            self.progress = 1.0
+        else:
+            self.progress = min(1.0, (ts - self.started) / self.dwell_time)
+        if self.progress < 1.0 or self.fired:
+            return False
+        self.fired = True
+        return True
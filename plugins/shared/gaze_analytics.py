@@ -0,0 +1,227 @@
+"""Streaming, NumPy-vectorized analytics for recorded control1 gaze logs.
+
+Logs are read in fixed-size chunks and every statistic is accumulated in
+fixed-size histograms, so memory stays bounded however long the session.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+from .gaze_log import (
+    BINARY_MAGIC,
+    GAZE_FIELDS,
+    GAZE_RECORD,
+    is_binary_log,
+    parse_control1_line,
+)
+
+DEFAULT_CHUNK_SAMPLES = 65536
+DEFAULT_SACCADE_VELOCITY = 1000.0
+DEFAULT_GAP_FACTOR = 2.5
+
+TS = GAZE_FIELDS.index("ts")
+WRITE_TS = GAZE_FIELDS.index("write_ts")
+X_PX = GAZE_FIELDS.index("x_px")
+Y_PX = GAZE_FIELDS.index("y_px")
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("numpy is required for gaze log analytics")
+    return np
+
+
+def iter_gaze_chunks(path: str, chunk_samples: int = DEFAULT_CHUNK_SAMPLES) -> Iterator:
+    """Yield (n, len(GAZE_FIELDS)) float64 arrays from a text or binary log."""
+    _require_numpy()
+    with open(path, "rb") as log:
+        header = log.read(len(BINARY_MAGIC))
+        if is_binary_log(header):
+            chunk_bytes = chunk_samples * GAZE_RECORD.size
+            while True:
+                data = log.read(chunk_bytes)
+                usable = len(data) - len(data) % GAZE_RECORD.size
+                if usable <= 0:
+                    return
+                records = np.frombuffer(data[:usable], dtype="<f8")
+                yield records.reshape(-1, len(GAZE_FIELDS))
+
+        log.seek(0)
+        rows = []
+        for raw_line in log:
+            record = parse_control1_line(raw_line.decode("utf-8", "replace"))
+            if record is None:
+                continue
+            rows.append(record)
+            if len(rows) >= chunk_samples:
+                yield np.array(rows, dtype=np.float64)
+                rows = []
+        if rows:
+            yield np.array(rows, dtype=np.float64)
+
+
+class StreamingHistogram:
+    """Fixed-bin histogram with underflow/overflow bins and approximate quantiles."""
+
+    def __init__(self, edges) -> None:
+        self.edges = _require_numpy().asarray(edges, dtype=np.float64)
+        # counts[0] is below edges[0]; counts[-1] is at or above edges[-1].
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64)
+        self.max = -np.inf
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def add(self, values) -> None:
+        """Count a batch of finite values."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if not values.size:
+            return
+        bins = np.searchsorted(self.edges, values, side="right")
+        self.counts += np.bincount(bins, minlength=len(self.counts))
+        self.max = max(self.max, float(values.max()))
+
+    def quantile(self, q: float) -> float:
+        """Return the upper edge of the bin holding quantile q, capped at max."""
+        total = self.total
+        if not total:
+            return float("nan")
+        index = int(np.searchsorted(np.cumsum(self.counts), q * total, side="left"))
+        if index >= len(self.edges):
+            return self.max
+        return min(float(self.edges[index]), self.max)
+
+
+class GazeLogAnalyzer:
+    """Accumulate sample rate, gaps, jitter, saccade and latency statistics."""
+
+    def __init__(
+        self,
+        saccade_velocity: float = DEFAULT_SACCADE_VELOCITY,
+        gap_factor: float = DEFAULT_GAP_FACTOR,
+        expected_rate: float | None = None,
+    ) -> None:
+        _require_numpy()
+        self.saccade_velocity = saccade_velocity
+        self.gap_factor = gap_factor
+        self.nominal_interval = None if not expected_rate else 1.0 / expected_rate
+        self.samples = 0
+        self.first_ts: float | None = None
+        self.last_ts: float | None = None
+        self.gaps = 0
+        self.dropped_samples = 0
+        self.longest_gap = 0.0
+        self.non_monotonic = 0
+        self.fixation_steps = 0
+        self.fixation_sq_sum = 0.0
+        self.saccade_velocities = StreamingHistogram(np.arange(0.0, 20000.0, 250.0))
+        self.write_latency_ms = StreamingHistogram(np.arange(0.0, 500.0, 0.5))
+        self._last_row = None
+
+    def add_chunk(self, records) -> None:
+        """Add one chunk of records shaped (n, len(GAZE_FIELDS))."""
+        # Write records have no position; samples have no write time.
+        written = ~np.isnan(records[:, WRITE_TS])
+        writes = records[written]
+        self.write_latency_ms.add((writes[:, WRITE_TS] - writes[:, TS]) * 1000.0)
+        records = records[~written]
+        if not len(records):
+            return
+        if self.first_ts is None:
+            self.first_ts = float(records[0, TS])
+        self.last_ts = float(records[-1, TS])
+        self.samples += len(records)
+
+        rows = records if self._last_row is None else np.vstack((self._last_row, records))
+        self._last_row = records[-1:].copy()
+        if len(rows) < 2:
+            return
+
+        dt = np.diff(rows[:, TS])
+        self.non_monotonic += int(np.count_nonzero(dt <= 0.0))
+        if self.nominal_interval is None:
+            positive = dt[dt > 0.0]
+            if not positive.size:
+                return
+            self.nominal_interval = float(np.median(positive))
+
+        gap_mask = dt > self.gap_factor * self.nominal_interval
+        if gap_mask.any():
+            gap_dt = dt[gap_mask]
+            self.gaps += int(gap_mask.sum())
+            missing = np.rint(gap_dt / self.nominal_interval) - 1.0
+            self.dropped_samples += int(missing.sum())
+            self.longest_gap = max(self.longest_gap, float(gap_dt.max()))
+
+        step = np.hypot(np.diff(rows[:, X_PX]), np.diff(rows[:, Y_PX]))
+        valid = (dt > 0.0) & ~gap_mask
+        velocity = step[valid] / dt[valid]
+        saccade = velocity > self.saccade_velocity
+        self.saccade_velocities.add(velocity[saccade])
+        fixation_steps = step[valid][~saccade]
+        self.fixation_steps += int(fixation_steps.size)
+        self.fixation_sq_sum += float(np.square(fixation_steps).sum())
+
+    def duration(self) -> float:
+        if self.first_ts is None or self.last_ts is None:
+            return 0.0
+        return self.last_ts - self.first_ts
+
+    def effective_rate(self) -> float:
+        duration = self.duration()
+        if duration <= 0.0:
+            return 0.0
+        return (self.samples - 1) / duration
+
+    def fixation_jitter_rms(self) -> float:
+        if not self.fixation_steps:
+            return 0.0
+        return float(np.sqrt(self.fixation_sq_sum / self.fixation_steps))
+
+    def report_lines(self) -> list[str]:
+        """Return a human-readable report."""
+        nominal_ms = (self.nominal_interval or 0.0) * 1000.0
+        return [
+            f"samples={self.samples} duration={self.duration():.2f}s "
+            f"effective_rate={self.effective_rate():.1f}Hz "
+            f"nominal_interval={nominal_ms:.2f}ms",
+            f"gaps={self.gaps} dropped_samples={self.dropped_samples} "
+            f"longest_gap={self.longest_gap * 1000.0:.1f}ms "
+            f"non_monotonic={self.non_monotonic}",
+            f"fixation_jitter_rms={self.fixation_jitter_rms():.2f}px "
+            f"steps={self.fixation_steps}",
+            _distribution_line("saccade_velocity", self.saccade_velocities, "px/s"),
+            _distribution_line("write_latency", self.write_latency_ms, "ms"),
+        ]
+
+
+def _distribution_line(name: str, histogram: StreamingHistogram, unit: str) -> str:
+    if not histogram.total:
+        return f"{name} n=0"
+    return (
+        f"{name} n={histogram.total} "
+        f"p50<={histogram.quantile(0.5):.1f}{unit} "
+        f"p90<={histogram.quantile(0.9):.1f}{unit} "
+        f"p99<={histogram.quantile(0.99):.1f}{unit} "
+        f"max={histogram.max:.1f}{unit}"
+    )
+
+
+def analyze_gaze_log(
+    path: str,
+    chunk_samples: int = DEFAULT_CHUNK_SAMPLES,
+    **analyzer_options,
+) -> GazeLogAnalyzer:
+    """Stream a whole log through a GazeLogAnalyzer and return it."""
+    analyzer = GazeLogAnalyzer(**analyzer_options)
+    for chunk in iter_gaze_chunks(path, chunk_samples):
+        analyzer.add_chunk(chunk)
+    return analyzer
@@ -0,0 +1,89 @@
+"""Recorded control1 gaze log formats: text lines and fixed-size binary records.
+
+A log holds two kinds of record. Sample records (pure_utils
+format_control1_sample lines) carry the tracker's ts and positions, with
+write_ts NaN. Write records (format_control1_write lines) carry the ts of
+the gaze sample whose pointer motion reached dotoolc and write_ts, the
+perf_counter() time it did, with every position field NaN. The logger only
+writes them when ts is on the perf_counter() clock too, so write_ts - ts is
+gaze-to-write latency.
+
+Binary logs start with BINARY_MAGIC followed by little-endian float64
+records with the fields in GAZE_FIELDS; missing values are NaN.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import struct
+
+GAZE_FIELDS = ("ts", "write_ts", "x_px", "y_px", "dx", "dy", "gaze_x", "gaze_y")
+BINARY_MAGIC = b"C1GZLOG1"
+GAZE_RECORD = struct.Struct("<" + "d" * len(GAZE_FIELDS))
+
+GazeRecord = tuple[float, float, float, float, float, float, float, float]
+
+_NUMBER = r"([-+0-9.eEinfa]+)"
+_CONTROL1_LINE_RE = re.compile(
+    rf"control1 ts={_NUMBER} xy_px=\({_NUMBER},{_NUMBER}\)"
+    rf"(?: delta=\({_NUMBER},{_NUMBER}\))?"
+    rf" gaze_norm=\({_NUMBER},{_NUMBER}\)"
+)
+_CONTROL1_WRITE_RE = re.compile(rf"control1 write ts={_NUMBER} write_ts={_NUMBER}")
+
+
+def parse_control1_line(line: str) -> GazeRecord | None:
+    """Parse a sample or write line into a record in GAZE_FIELDS order.
+
+    Returns:
+        Record tuple, or None for lines that are not control1 records.
+    """
+    match = _CONTROL1_WRITE_RE.search(line)
+    if match is not None:
+        ts, write_ts = match.groups()
+        return (float(ts), float(write_ts)) + (math.nan,) * (len(GAZE_FIELDS) - 2)
+    match = _CONTROL1_LINE_RE.search(line)
+    if match is None:
+        return None
+    ts, x, y, dx, dy, gx, gy = match.groups()
+    return (
+        float(ts),
+        math.nan,
+        float(x),
+        float(y),
+        math.nan if dx is None else float(dx),
+        math.nan if dy is None else float(dy),
+        float(gx),
+        float(gy),
+    )
+
+
+def encode_gaze_record(
+    ts: float,
+    xy_px: tuple[float, float],
+    gaze_norm: tuple[float, float],
+    delta: tuple[float, float] | None = None,
+) -> bytes:
+    """Encode one sample as a binary gaze log record."""
+    dx, dy = (math.nan, math.nan) if delta is None else delta
+    return GAZE_RECORD.pack(
+        ts,
+        math.nan,
+        xy_px[0],
+        xy_px[1],
+        dx,
+        dy,
+        gaze_norm[0],
+        gaze_norm[1],
+    )
+
+
+def encode_write_record(ts: float, write_ts: float) -> bytes:
+    """Encode the write of the sample at ts as a binary gaze log record."""
+    return GAZE_RECORD.pack(ts, write_ts, *(math.nan,) * (len(GAZE_FIELDS) - 2))
+
+
+def is_binary_log(header: bytes) -> bool:
+    """Return whether a file header marks a binary gaze log."""
+    return header.startswith(BINARY_MAGIC)
@@ -0,0 +1,148 @@
+"""Shared-memory ring buffer of control1 gaze samples for outside processes.
+
+One writer (the Talon gaze logger) maps a file on /dev/shm and publishes
+each sample as a gaze_log binary record; any number of readers map the
+same file read-only and pick up new samples by sequence number, without
+pipes, locks or text parsing.
+
+Layout (little-endian):
+- Header, HEADER_SIZE bytes: RING_MAGIC, capacity (uint32), slot size
+  (uint32), then the sequence number of the last published sample (uint64).
+- capacity slots: the slot's sequence number (uint64) followed by one
+  GAZE_RECORD in gaze_log.GAZE_FIELDS order.
+
+Sample n (counting from 1) lives in slot (n - 1) % capacity. The writer
+zeroes the slot sequence, writes the record, stamps the slot with n and
+then advances the header, so a reader that sees the same slot sequence
+before and after unpacking a record knows the record was not torn.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+
+from .gaze_log import GAZE_RECORD, GazeRecord
+
+RING_MAGIC = b"C1GZRNG1"
+DEFAULT_RING_PATH = "/dev/shm/talon-control1-gaze"
+DEFAULT_CAPACITY = 1024
+
+_HEADER = struct.Struct("<8sII")
+_SEQUENCE = struct.Struct("<Q")
+_SEQUENCE_OFFSET = _HEADER.size
+HEADER_SIZE = 64
+SLOT_SIZE = _SEQUENCE.size + GAZE_RECORD.size
+
+
+def _slot_offset(sequence: int, capacity: int) -> int:
+    return HEADER_SIZE + ((sequence - 1) % capacity) * SLOT_SIZE
+
+
+class GazeRingWriter:
+    """Single producer: publish encoded gaze records into the ring.
+
+    Opening builds a fresh file and renames it over path, so readers of an
+    earlier ring keep a valid mapping; stale() tells them to reopen.
+    """
+
+    def __init__(self, path: str = DEFAULT_RING_PATH, capacity: int = DEFAULT_CAPACITY) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.path = path
+        self.capacity = capacity
+        self.sequence = 0
+        size = HEADER_SIZE + capacity * SLOT_SIZE
+        staging = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(staging, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        _HEADER.pack_into(self._map, 0, RING_MAGIC, capacity, SLOT_SIZE)
+        os.replace(staging, path)
+
+    def publish(self, record: bytes) -> int:
+        """Publish one GAZE_RECORD-encoded sample; returns its sequence number."""
+        sequence = self.sequence + 1
+        offset = _slot_offset(sequence, self.capacity)
+        _SEQUENCE.pack_into(self._map, offset, 0)
+        self._map[offset + _SEQUENCE.size : offset + SLOT_SIZE] = record
+        _SEQUENCE.pack_into(self._map, offset, sequence)
+        _SEQUENCE.pack_into(self._map, _SEQUENCE_OFFSET, sequence)
+        self.sequence = sequence
+        return sequence
+
+    def close(self) -> None:
+        """Unmap the ring; the file stays for readers still attached."""
+        self._map.close()
+
+
+class GazeRingReader:
+    """Consume samples published by a GazeRingWriter.
+
+    Records are unpacked straight from the shared mapping. A reader that
+    falls more than one ring behind skips to the oldest sample still held
+    and counts the rest in dropped.
+    """
+
+    def __init__(self, path: str = DEFAULT_RING_PATH, from_start: bool = False) -> None:
+        self.path = path
+        self.dropped = 0
+        with open(path, "rb") as ring_file:
+            self._inode = os.fstat(ring_file.fileno()).st_ino
+            self._map = mmap.mmap(ring_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER_SIZE:
+            self._map.close()
+            raise ValueError(f"{path} is not a gaze ring")
+        magic, self.capacity, slot_size = _HEADER.unpack_from(self._map, 0)
+        if magic != RING_MAGIC or slot_size != SLOT_SIZE:
+            self._map.close()
+            raise ValueError(f"{path} is not a gaze ring")
+        self.cursor = 0 if from_start else self.sequence()
+
+    def sequence(self) -> int:
+        """Return the sequence number of the last published sample."""
+        return _SEQUENCE.unpack_from(self._map, _SEQUENCE_OFFSET)[0]
+
+    def stale(self) -> bool:
+        """Return whether a newer writer has replaced the ring at path."""
+        try:
+            return os.stat(self.path).st_ino != self._inode
+        except OSError:
+            return True
+
+    def latest(self) -> GazeRecord | None:
+        """Return the newest sample without moving the cursor."""
+        return self._record(self.sequence())
+
+    def read(self) -> list[GazeRecord]:
+        """Return samples published since the last read, oldest first."""
+        sequence = self.sequence()
+        oldest = max(self.cursor, sequence - self.capacity)
+        self.dropped += oldest - self.cursor
+        records = []
+        for wanted in range(oldest + 1, sequence + 1):
+            record = self._record(wanted)
+            if record is None:
+                self.dropped += 1
+            else:
+                records.append(record)
+        self.cursor = sequence
+        return records
+
+    def close(self) -> None:
+        self._map.close()
+
+    def _record(self, sequence: int) -> GazeRecord | None:
+        if sequence < 1:
+            return None
+        offset = _slot_offset(sequence, self.capacity)
+        if _SEQUENCE.unpack_from(self._map, offset)[0] != sequence:
+            return None
+        record = GAZE_RECORD.unpack_from(self._map, offset + _SEQUENCE.size)
+        if _SEQUENCE.unpack_from(self._map, offset)[0] != sequence:
+            return None
+        return record
@@ -0,0 +1,41 @@
+"""High-resolution wheel amounts in 1/120-notch units.
+
+Linux reports precise scrolling as REL_WHEEL_HI_RES / REL_HWHEEL_HI_RES,
+where 120 units make one notch. Scroll deltas are quantized to those units
+instead of whole notches (pure_utils.accumulate_scroll_steps), carrying
+only the sub-unit rest, and written as fractional notch amounts for a
+backend that maps them onto the hi-res axes.
+"""
+
+from __future__ import annotations
+
+UNITS_PER_NOTCH = 120
+
+
+def accumulate_hires_scroll(notches: float, remainder: float) -> tuple[int, float]:
+    """Convert a scroll delta in notches to whole 1/120 units and next remainder.
+
+    The remainder is in notches, like accumulate_scroll_steps, so either
+    path can pick up where the other left off.
+    """
+    total = notches + remainder
+    units = int(round(total * UNITS_PER_NOTCH, 6))
+    return units, total - units / UNITS_PER_NOTCH
+
+
+def wheel_line(command: str, units: int) -> str:
+    """Return a dotool wheel/hwheel line for an amount in 1/120 units."""
+    return f"{command} {units / UNITS_PER_NOTCH:.6f}"
+
+
+def wheel_units(line: str) -> int:
+    """Return the 1/120 units of a wheel line written by wheel_line()."""
+    return round(float(line.split()[1]) * UNITS_PER_NOTCH)
+
+
+def merge_wheel(pending: str, line: str) -> str:
+    """Sum two wheel lines on the same axis so coalescing loses no scroll."""
+    command = line.split(maxsplit=1)[0]
+    if pending.split(maxsplit=1)[0] != command:
+        return line
+    return wheel_line(command, wheel_units(pending) + wheel_units(line))
@@ -0,0 +1,289 @@
+"""Lightweight timing instrumentation shared across plugins."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+import functools
+import sys
+import time
+from typing import Callable
+
+LATENCY_BUCKETS_MS = (1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0, 200.0, 500.0, 1000.0)
+
+
+def _short_module_name(module: str) -> str:
+    return module.rsplit(".", 1)[-1]
+
+
+class _TimedLoader:
+    """Loader wrapper that records how long exec_module takes."""
+
+    def __init__(self, loader, profiler: StartupProfiler) -> None:
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name: str):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler.record_import(module.__name__, started)
+
+
+def _is_plugin_module(name: str, prefix: str) -> bool:
+    if not name.startswith(prefix) or name == prefix:
+        return False
+    return name[len(prefix):].split(".", 1)[0] != "shared"
+
+
+class _ImportTimer:
+    """Meta path finder timing the import of each plugin module under prefix.
+
+    Shared modules are skipped: their import time is counted in the first
+    plugin that imports them.
+    """
+
+    is_import_timer = True
+
+    def __init__(self, profiler: StartupProfiler, prefix: str) -> None:
+        self._profiler = profiler
+        self._prefix = prefix
+
+    def find_spec(self, name, path, target=None):
+        if not _is_plugin_module(name, self._prefix):
+            return None
+        for finder in sys.meta_path:
+            if getattr(finder, "is_import_timer", False):
+                continue
+            find_spec = getattr(finder, "find_spec", None)
+            spec = None if find_spec is None else find_spec(name, path, target)
+            if spec is not None:
+                if hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self._profiler)
+                return spec
+        return None
+
+
+class StartupProfiler:
+    """Record import and ready-callback durations per plugin module.
+
+    Modules are named relative to prefix, e.g. "key_forwarder.forwarder",
+    so plugins in different directories never share a name.
+    """
+
+    def __init__(self, prefix: str = "") -> None:
+        self.prefix = prefix
+        self._import_ms: dict[str, float] = {}
+        self._ready_ms: dict[str, float] = {}
+        self._untimed: set[str] = set()
+
+    def module_name(self, module: str) -> str:
+        """Return module's name in timings(): relative to prefix if under it."""
+        if self.prefix and module.startswith(self.prefix):
+            return module[len(self.prefix):]
+        return module
+
+    def record_import(self, module: str, started: float) -> None:
+        """Record module import time from a perf_counter start value."""
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        name = self.module_name(module)
+        self._import_ms[name] = elapsed_ms
+        self._untimed.discard(name)
+
+    def watch_imports(self, prefix: str) -> None:
+        """Time every plugin module imported under prefix until stop_watching().
+
+        Plugins already imported, such as the one importing this module, are
+        reported as untimed. Replaces the finder a previous load of this
+        module installed.
+        """
+        self.stop_watching()
+        self.prefix = prefix
+        self._untimed.update(
+            self.module_name(name)
+            for name in list(sys.modules)
+            if _is_plugin_module(name, prefix)
+        )
+        sys.meta_path.insert(0, _ImportTimer(self, prefix))
+
+    def stop_watching(self) -> None:
+        """Remove the import timer, e.g. once startup is over."""
+        sys.meta_path[:] = [
+            finder for finder in sys.meta_path if not getattr(finder, "is_import_timer", False)
+        ]
+
+    def profile_ready(self, module: str, callback: Callable[[], None]) -> Callable:
+        """Wrap a ready callback so its duration is recorded."""
+        name = self.module_name(module)
+
+        @functools.wraps(callback)
+        def _profiled(*args):
+            started = time.perf_counter()
+            try:
+                return callback(*args)
+            finally:
+                elapsed_ms = (time.perf_counter() - started) * 1000.0
+                self._ready_ms[name] = elapsed_ms
+
+        return _profiled
+
+    def timings(self) -> dict[str, tuple[float | None, float | None]]:
+        """Return {module: (import_ms, ready_ms)} for all recorded modules.
+
+        import_ms is None for modules imported before watch_imports().
+        """
+        names = set(self._import_ms) | set(self._ready_ms) | self._untimed
+        return {
+            name: (self._import_ms.get(name), self._ready_ms.get(name))
+            for name in names
+        }
+
+    def report_lines(self) -> list[str]:
+        """Return report lines sorted by total startup cost, highest first."""
+
+        def _fmt(value: float | None) -> str:
+            return "-" if value is None else f"{value:.2f}ms"
+
+        def _fmt_import(name: str, value: float | None) -> str:
+            return "untimed" if name in self._untimed else _fmt(value)
+
+        rows = sorted(
+            self.timings().items(),
+            key=lambda item: (item[1][0] or 0.0) + (item[1][1] or 0.0),
+            reverse=True,
+        )
+        return [
+            f"{name} import={_fmt_import(name, import_ms)} ready={_fmt(ready_ms)}"
+            for name, (import_ms, ready_ms) in rows
+        ]
+
+
+STARTUP_PROFILER = StartupProfiler()
+# Plugin files are imported as <package>.<plugin>, with this module at
+# <package>.shared.instrumentation; time every plugin imported from here on
+# until ready, when the startup_profiler plugin stops watching.
+if __name__.count(".") >= 2:
+    STARTUP_PROFILER.watch_imports(__name__.rsplit(".", 2)[0] + ".")
+
+
+class LatencyStats:
+    """Count, total, max and bucketed histogram of latencies in milliseconds."""
+
+    def __init__(self, buckets_ms: tuple[float, ...] = LATENCY_BUCKETS_MS) -> None:
+        self.buckets_ms = tuple(buckets_ms)
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all recorded latencies."""
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        # One count per bucket upper bound, plus a final overflow bucket.
+        self.bucket_counts = [0] * (len(self.buckets_ms) + 1)
+
+    def record(self, latency_ms: float) -> None:
+        """Add one latency sample."""
+        self.count += 1
+        self.total_ms += latency_ms
+        if latency_ms > self.max_ms:
+            self.max_ms = latency_ms
+        self.bucket_counts[bisect_left(self.buckets_ms, latency_ms)] += 1
+
+    def mean_ms(self) -> float:
+        """Return the mean latency, or 0 without samples."""
+        if not self.count:
+            return 0.0
+        return self.total_ms / self.count
+
+    def summary(self) -> str:
+        """Return a one-line summary with count, mean, max and buckets."""
+        buckets = " ".join(
+            f"<={bound:g}ms:{count}"
+            for bound, count in zip(self.buckets_ms, self.bucket_counts)
+            if count
+        )
+        overflow = self.bucket_counts[-1]
+        if overflow:
+            buckets = f"{buckets} >{self.buckets_ms[-1]:g}ms:{overflow}".strip()
+        return (
+            f"count={self.count} mean={self.mean_ms():.2f}ms "
+            f"max={self.max_ms:.2f}ms {buckets}"
+        ).rstrip()
+
+
+CALLBACK_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0)
+
+
+class CallbackProfiler:
+    """Opt-in call counts and duration histograms per callback.
+
+    Wrapped callbacks check one attribute and call straight through while
+    the profiler is disabled.
+    """
+
+    def __init__(self, buckets_ms: tuple[float, ...] = CALLBACK_BUCKETS_MS) -> None:
+        self.enabled = False
+        self.buckets_ms = tuple(buckets_ms)
+        self._stats: dict[str, LatencyStats] = {}
+
+    def wrap(self, module: str, callback: Callable) -> Callable:
+        """Return a profiled wrapper named "<module>.<callback>"."""
+        name = f"{_short_module_name(module)}.{callback.__name__}"
+
+        @functools.wraps(callback)
+        def _profiled(*args, **kwargs):
+            if not self.enabled:
+                return callback(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return callback(*args, **kwargs)
+            finally:
+                self._record(name, (time.perf_counter() - started) * 1000.0)
+
+        return _profiled
+
+    def profile(self, module: str) -> Callable[[Callable], Callable]:
+        """Decorator form of wrap() for callbacks defined in module."""
+        return functools.partial(self.wrap, module)
+
+    def profile_actions(self, module: str) -> Callable[[type], type]:
+        """Class decorator wrapping every static action method."""
+
+        def _decorator(cls: type) -> type:
+            for name, value in list(vars(cls).items()):
+                if isinstance(value, staticmethod):
+                    setattr(cls, name, staticmethod(self.wrap(module, value.__func__)))
+            return cls
+
+        return _decorator
+
+    def reset(self) -> None:
+        """Drop all recorded calls."""
+        self._stats = {}
+
+    def stats(self) -> dict[str, LatencyStats]:
+        """Return {callback name: stats} for every profiled callback called."""
+        return dict(self._stats)
+
+    def report_lines(self) -> list[str]:
+        """Return one line per callback, highest total time first."""
+        rows = sorted(self._stats.items(), key=lambda item: item[1].total_ms, reverse=True)
+        return [
+            f"{name} total={stats.total_ms:.2f}ms {stats.summary()}"
+            for name, stats in rows
+        ]
+
+    def _record(self, name: str, elapsed_ms: float) -> None:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats.setdefault(name, LatencyStats(self.buckets_ms))
+        stats.record(elapsed_ms)
+
+
+CALLBACK_PROFILER = CallbackProfiler()
@@ -0,0 +1,163 @@
+"""Process-wide pipeline metrics rendered in the Prometheus text format.
+
+Plugins register series by metric name and labels. Counter objects are
+created once and handed back on re-registration, so totals survive module
+reloads. Gauges, callback counters and histograms are read when rendering
+and replace earlier registrations with the same labels.
+Histograms wrap instrumentation.LatencyStats, recorded in milliseconds and
+exposed in seconds as Prometheus expects.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from typing import Callable, Union
+
+from .instrumentation import LatencyStats
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+Labels = tuple[tuple[str, str], ...]
+ReadValue = Callable[[], float]
+
+
+class Counter:
+    """Monotonic counter incremented from any thread."""
+
+    def __init__(self) -> None:
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+Source = Union[Counter, ReadValue, LatencyStats]
+
+
+class _Family:
+    def __init__(self, kind: str, help_text: str) -> None:
+        self.kind = kind
+        self.help = help_text
+        self.series: dict[Labels, Source] = {}
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: tuple[str, str] | None = None) -> str:
+    pairs = [*labels, extra] if extra is not None else list(labels)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """Named metric families, each holding one source per label set."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._families: dict[str, _Family] = {}
+
+    def counter(self, name: str, help_text: str, **labels: str) -> Counter:
+        """Return the counter for name and labels, creating it once."""
+        with self._lock:
+            series = self._family(name, COUNTER, help_text).series
+            key = _labels(labels)
+            source = series.get(key)
+            if not isinstance(source, Counter):
+                source = series[key] = Counter()
+            return source
+
+    def counter_func(self, name: str, help_text: str, read: ReadValue, **labels: str) -> None:
+        """Expose a counter kept elsewhere, read through read()."""
+        self._register(name, COUNTER, help_text, labels, read)
+
+    def gauge(self, name: str, help_text: str, read: ReadValue, **labels: str) -> None:
+        """Expose a gauge read through read() at render time."""
+        self._register(name, GAUGE, help_text, labels, read)
+
+    def histogram(self, name: str, help_text: str, stats: LatencyStats, **labels: str) -> None:
+        """Expose millisecond LatencyStats as a histogram in seconds."""
+        self._register(name, HISTOGRAM, help_text, labels, stats)
+
+    def clear(self) -> None:
+        """Drop every registered series."""
+        with self._lock:
+            self._families = {}
+
+    def render(self) -> str:
+        """Return all series in the Prometheus text exposition format."""
+        with self._lock:
+            families = [
+                (name, family.kind, family.help, list(family.series.items()))
+                for name, family in sorted(self._families.items())
+            ]
+        out: list[str] = []
+        for name, kind, help_text, series in families:
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            for labels, source in series:
+                out.extend(self._render_series(name, labels, source))
+        return "\n".join(out) + "\n" if out else ""
+
+    def _family(self, name: str, kind: str, help_text: str) -> _Family:
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = _Family(kind, help_text)
+        elif family.kind != kind:
+            raise ValueError(f"metric {name} is a {family.kind}, not a {kind}")
+        return family
+
+    def _register(
+        self, name: str, kind: str, help_text: str, labels: dict[str, str], source: Source
+    ) -> None:
+        with self._lock:
+            self._family(name, kind, help_text).series[_labels(labels)] = source
+
+    def _render_series(self, name: str, labels: Labels, source: Source) -> list[str]:
+        if isinstance(source, LatencyStats):
+            return self._render_histogram(name, labels, source)
+        if isinstance(source, Counter):
+            value = source.value
+        else:
+            try:
+                value = float(source())
+            except Exception:
+                return []
+        return [f"{name}{_format_labels(labels)} {_format_value(value)}"]
+
+    def _render_histogram(self, name: str, labels: Labels, stats: LatencyStats) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(stats.buckets_ms, stats.bucket_counts):
+            cumulative += count
+            le = ("le", _format_value(bound / 1000.0))
+            lines.append(f"{name}_bucket{_format_labels(labels, le)} {cumulative}")
+        total = cumulative + stats.bucket_counts[-1]
+        lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {total}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(stats.total_ms / 1000.0)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {total}")
+        return lines
+
+
+METRICS = MetricsRegistry()
@@ -0,0 +1,54 @@
+"""Debounce pop noises and coalesce pop pairs into double clicks."""
+
+from __future__ import annotations
+
+IGNORED = "ignored"
+SINGLE = "single"
+PENDING = "pending"
+DOUBLE = "double"
+
+
+class PopClickCoalescer:
+    """Turn timestamped pops into single or double click decisions.
+
+    A pop within the debounce interval of the previous accepted pop is
+    ignored. Without a double-click window (the default) every accepted
+    pop clicks at once. With one, the first pop stays pending until
+    either a second pop arrives (double) or the window expires (single).
+    """
+
+    def __init__(self, debounce: float = 0.06, double_click_window: float = 0.0):
+        self.debounce = debounce
+        self.double_click_window = double_click_window
+        self._last_accepted: float | None = None
+        self.pending_since: float | None = None
+
+    def pop(self, ts: float) -> str:
+        """Register a pop at ts and return IGNORED, SINGLE, PENDING or DOUBLE."""
+        last = self._last_accepted
+        if last is not None and ts - last < self.debounce:
+            return IGNORED
+        self._last_accepted = ts
+
+        if self.double_click_window <= 0.0:
+            return SINGLE
+        if self.pending_since is not None and ts - self.pending_since <= self.double_click_window:
+            self.pending_since = None
+            return DOUBLE
+        self.pending_since = ts
+        return PENDING
+
+    def flush_expired(self, ts: float) -> float | None:
+        """Consume a pending pop whose window ended before ts; return its time."""
+        pending = self.pending_since
+        if pending is None or ts - pending <= self.double_click_window:
+            return None
+        self.pending_since = None
+        return pending
+
+    def take_pending(self, first_ts: float) -> bool:
+        """Consume the pending pop started at first_ts; False if already used."""
+        if self.pending_since != first_ts:
+            return False
+        self.pending_since = None
+        return True
@@ -0,0 +1,320 @@
+"""Priority lanes for dotool output: discrete events ahead of pointer motion.
+
+All dotoolc connections feed dotoold in arrival order, so a burst of gaze
+motion can queue ahead of a keystroke. Motion therefore goes through a
+MotionLane: a latest-wins slot drained by one writer thread, which keeps at
+most one motion line in flight and waits while discrete writes (keys,
+clicks) are in progress. Pointing the motion connection at its own dotoold
+pipe removes the shared queue altogether.
+
+Ordered lanes carry motion whose position in the stream matters, such as
+wheel scrolls: a discrete write first writes whatever they hold, so a click
+never reaches dotoold ahead of the scroll before it.
+
+MOTION_WRITES tells listeners when a lane's line has been handed to its
+writer, with the source timestamp given to submit(), e.g. for gaze-to-write
+latency.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Protocol
+
+from .async_log import LOG
+from .metrics import METRICS
+from .resource_registry import keep
+
+DISCRETE = "discrete"
+MOTION = "motion"
+
+# Longest a motion write waits for discrete writes before going anyway.
+DEFAULT_MAX_DEFER = 0.05
+# Longest a discrete write waits for an ordered lane's write in flight.
+DEFAULT_FLUSH_TIMEOUT = 1.0
+
+MergeLines = Callable[[str, str], str]
+WriteListener = Callable[[float, float], None]
+
+
+class LineWriter(Protocol):
+    def send_line(self, line: str) -> bool: ...
+
+
+class LaneGate:
+    """Count discrete writes in progress so motion can yield to them."""
+
+    def __init__(self) -> None:
+        self._active = 0
+        self._idle = threading.Condition()
+        self._ordered: list[MotionLane] = []
+        self._local = threading.local()
+
+    def active(self) -> int:
+        return self._active
+
+    def add_ordered(self, lane: MotionLane) -> None:
+        """Flush lane before every discrete write."""
+        with self._idle:
+            self._ordered.append(lane)
+
+    def remove_ordered(self, lane: MotionLane) -> None:
+        with self._idle:
+            if lane in self._ordered:
+                self._ordered.remove(lane)
+
+    def skip_flush_on_this_thread(self) -> None:
+        """Let discrete writes from the calling thread skip flushing."""
+        self._local.flushing = True
+
+    def flush_ordered(self) -> None:
+        """Write the lines ordered lanes hold, before a discrete write."""
+        if getattr(self._local, "flushing", False):
+            return
+        with self._idle:
+            lanes = list(self._ordered)
+        self._local.flushing = True
+        try:
+            for lane in lanes:
+                lane.flush()
+        finally:
+            self._local.flushing = False
+
+    @contextmanager
+    def discrete(self) -> Iterator[None]:
+        """Mark a discrete write as in progress for the with-block."""
+        self.flush_ordered()
+        with self._idle:
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._idle:
+                self._active -= 1
+                if not self._active:
+                    self._idle.notify_all()
+
+    def wait_idle(self, timeout: float) -> bool:
+        """Wait until no discrete write is in progress; False on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._active, timeout)
+
+
+LANE_GATE = LaneGate()
+
+
+class MotionWrites:
+    """Listeners told when a motion line reaches its writer, by lane name.
+
+    A listener gets (source_ts, written_at): the source_ts given to submit()
+    and time.perf_counter() right after the write returned. Listeners run on
+    the lane's writer thread; lines submitted without source_ts are not told.
+    """
+
+    def __init__(self) -> None:
+        self._listeners: dict[str, list[WriteListener]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, lane_name: str, listener: WriteListener) -> None:
+        with self._lock:
+            self._listeners[lane_name] = [*self._listeners.get(lane_name, ()), listener]
+
+    def unregister(self, lane_name: str, listener: WriteListener) -> None:
+        with self._lock:
+            self._listeners[lane_name] = [
+                registered
+                for registered in self._listeners.get(lane_name, ())
+                if registered is not listener
+            ]
+
+    def notify(self, lane_name: str, source_ts: float, written_at: float) -> None:
+        for listener in self._listeners.get(lane_name, ()):
+            try:
+                listener(source_ts, written_at)
+            except Exception as exc:
+                LOG.error(lane_name, "motion write listener failed", error=exc)
+
+
+MOTION_WRITES = MotionWrites()
+
+
+class MotionLane:
+    """Latest-wins motion writer: newer lines replace unsent older ones."""
+
+    def __init__(
+        self,
+        writer: LineWriter,
+        name: str,
+        gate: LaneGate = LANE_GATE,
+        max_defer: float = DEFAULT_MAX_DEFER,
+        ordered: bool = False,
+    ) -> None:
+        self.name = name
+        self.max_defer = max_defer
+        self.ordered = ordered
+        self.submitted = 0
+        self.written = 0
+        self.superseded = 0
+        self.merged = 0
+        self.failed = 0
+        self._writer = writer
+        self._gate = gate
+        self._pending: str | None = None
+        self._pending_source_ts: float | None = None
+        self._writing = False
+        self._closed = False
+        self._ready = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._register_metrics()
+        if ordered:
+            gate.add_ordered(self)
+
+    def _register_metrics(self) -> None:
+        for outcome in ("submitted", "written", "superseded", "merged", "failed"):
+            METRICS.counter_func(
+                "talon_motion_lines_total",
+                "Motion lines by outcome.",
+                lambda outcome=outcome: getattr(self, outcome),
+                plugin=self.name,
+                outcome=outcome,
+            )
+        METRICS.gauge(
+            "talon_motion_pending",
+            "Whether a motion line is waiting to be written.",
+            lambda: not self.idle(),
+            plugin=self.name,
+        )
+
+    def submit(
+        self,
+        line: str,
+        merge: MergeLines | None = None,
+        source_ts: float | None = None,
+    ) -> None:
+        """Queue a motion line, replacing any line not yet written.
+
+        Args:
+            line: dotool motion line.
+            merge: Combines the unwritten line with this one instead of
+                dropping it, e.g. to sum relative moves.
+            source_ts: When the input behind the line happened, passed to
+                MOTION_WRITES listeners once the line is written. A merged
+                line keeps the older line's source_ts.
+        """
+        with self._ready:
+            self.submitted += 1
+            if self._pending is not None and merge is not None:
+                self.merged += 1
+                line = merge(self._pending, line)
+                if self._pending_source_ts is not None:
+                    source_ts = self._pending_source_ts
+            elif self._pending is not None:
+                self.superseded += 1
+            self._pending = line
+            self._pending_source_ts = source_ts
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"{self.name}-motion", daemon=True
+                )
+                self._thread.start()
+            self._ready.notify()
+
+    def discard(self) -> None:
+        """Drop the pending line, if any."""
+        with self._ready:
+            if self._pending is not None:
+                self.superseded += 1
+            self._pending = None
+            self._pending_source_ts = None
+
+    def flush(self, timeout: float = DEFAULT_FLUSH_TIMEOUT) -> None:
+        """Write the pending line now, after any write already in flight."""
+        with self._ready:
+            self._ready.wait_for(lambda: not self._writing, timeout)
+            line, source_ts = self._take_pending()
+        if line is not None:
+            self._write(line, source_ts)
+
+    def close(self) -> None:
+        """Drop the pending line and stop the writer thread."""
+        self._gate.remove_ordered(self)
+        with self._ready:
+            self._closed = True
+            self._pending = None
+            self._pending_source_ts = None
+            self._ready.notify_all()
+
+    def idle(self) -> bool:
+        """Return whether no line is waiting to be written."""
+        return self._pending is None
+
+    def status(self) -> str:
+        return (
+            f"{self.name} submitted={self.submitted} written={self.written} "
+            f"superseded={self.superseded} merged={self.merged} failed={self.failed}"
+        )
+
+    def _take_pending(self) -> tuple[str | None, float | None]:
+        line, source_ts = self._pending, self._pending_source_ts
+        self._pending = self._pending_source_ts = None
+        return line, source_ts
+
+    def _write(self, line: str, source_ts: float | None = None) -> None:
+        try:
+            ok = self._writer.send_line(line)
+            written_at = time.perf_counter()
+        except Exception as exc:
+            LOG.error(self.name, "motion write failed", error=exc)
+            ok = False
+        if not ok:
+            self.failed += 1
+            return
+        self.written += 1
+        if source_ts is not None:
+            MOTION_WRITES.notify(self.name, source_ts, written_at)
+
+    def _run(self) -> None:
+        # Motion writes never flush ordered lanes; only discrete writes do.
+        self._gate.skip_flush_on_this_thread()
+        while True:
+            with self._ready:
+                self._ready.wait_for(lambda: self._pending is not None or self._closed)
+                if self._closed:
+                    return
+            self._gate.wait_idle(self.max_defer)
+            with self._ready:
+                line, source_ts = self._take_pending()
+                self._writing = line is not None
+            if line is None:
+                continue
+            try:
+                self._write(line, source_ts)
+            finally:
+                with self._ready:
+                    self._writing = False
+                    self._ready.notify_all()
+
+
+def shared_motion_lane(writer: LineWriter, name: str, **options) -> MotionLane:
+    """Return the motion lane kept for name, reused across plugin reloads.
+
+    A lane kept for another writer or ordering, or built by a reloaded
+    MotionLane class, is closed and replaced.
+    """
+    ordered = options.get("ordered", False)
+
+    def reusable(lane) -> bool:
+        return (
+            isinstance(lane, MotionLane)
+            and lane._writer is writer
+            and lane.ordered == ordered
+        )
+
+    return keep(
+        f"motion:{name}",
+        lambda: MotionLane(writer, name, **options),
+        MotionLane.close,
+        reuse=reusable,
+    )
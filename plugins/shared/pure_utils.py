@@ -80,17 +80,25 @@ def format_control1_sample(
     gaze_norm: PointTuple,
     delta: PointTuple | None,
 ) -> str:
-    """Format one control1 tracking sample log line."""
+    """Format one control1 tracking sample log line.
+
+    Timestamps keep microseconds so 250 Hz+ sample intervals stay distinct.
+    """
     if delta is None:
         return (
-            f"control1 ts={timestamp:.3f} "
+            f"control1 ts={timestamp:.6f} "
             f"xy_px=({xy_px[0]:.1f},{xy_px[1]:.1f}) "
             f"gaze_norm=({gaze_norm[0]:.3f},{gaze_norm[1]:.3f})"
         )
 
     return (
-        f"control1 ts={timestamp:.3f} "
+        f"control1 ts={timestamp:.6f} "
         f"xy_px=({xy_px[0]:.1f},{xy_px[1]:.1f}) "
         f"delta=({delta[0]:.2f},{delta[1]:.2f}) "
         f"gaze_norm=({gaze_norm[0]:.3f},{gaze_norm[1]:.3f})"
     )
+
+
+def format_control1_write(timestamp: float, write_ts: float) -> str:
+    """Format the log line for the sample at timestamp reaching dotoolc."""
+    return f"control1 write ts={timestamp:.6f} write_ts={write_ts:.6f}"
@@ -0,0 +1,75 @@
+"""Turn control1 per-sample deltas into relative dotool pointer moves.
+
+Each delta is scaled by gain and an acceleration curve, then split into
+whole pixels; the fractional rest is carried to the next sample (like
+pure_utils.accumulate_scroll_steps) so slow, sub-pixel head motion still
+moves the pointer instead of being rounded away.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+
+from .pure_utils import accumulate_scroll_steps
+
+# Delta speed, in pixels per sample, at which acceleration neither boosts
+# nor damps the gain.
+REFERENCE_SPEED = 1.0
+
+
+def mousemove_line(dx: int, dy: int) -> str:
+    """Return a dotool mousemove line for a relative move in pixels."""
+    return f"mousemove {dx} {dy}"
+
+
+def merge_mousemove(pending: str, line: str) -> str:
+    """Sum two mousemove lines so a coalesced write loses no motion.
+
+    Any other pending line is replaced, as for absolute moves.
+    """
+    if not pending.startswith("mousemove ") or not line.startswith("mousemove "):
+        return line
+    _, pending_dx, pending_dy = pending.split()
+    _, dx, dy = line.split()
+    return mousemove_line(int(pending_dx) + int(dx), int(pending_dy) + int(dy))
+
+
+def accelerated_delta(
+    dx: float, dy: float, gain: float, acceleration: float
+) -> tuple[float, float]:
+    """Scale a delta by gain * (speed / REFERENCE_SPEED) ** acceleration.
+
+    Acceleration 0 is linear; higher values damp slow motion for precision
+    and boost fast motion for reach.
+    """
+    speed = math.hypot(dx, dy)
+    if speed == 0.0:
+        return 0.0, 0.0
+    factor = gain * (speed / REFERENCE_SPEED) ** acceleration
+    return dx * factor, dy * factor
+
+
+class RelativePointer:
+    """Accumulate scaled deltas and emit whole-pixel moves."""
+
+    def __init__(self, gain: float = 1.0, acceleration: float = 0.0) -> None:
+        self.gain = gain
+        self.acceleration = acceleration
+        self._lock = threading.Lock()
+        self._remainder = (0.0, 0.0)
+
+    def reset(self) -> None:
+        """Drop the carried sub-pixel remainder."""
+        with self._lock:
+            self._remainder = (0.0, 0.0)
+
+    def step(self, dx: float, dy: float) -> tuple[int, int]:
+        """Return the whole-pixel move for one delta, carrying the rest."""
+        scaled_dx, scaled_dy = accelerated_delta(dx, dy, self.gain, self.acceleration)
+        with self._lock:
+            rest_x, rest_y = self._remainder
+            move_x, rest_x = accumulate_scroll_steps(scaled_dx, rest_x)
+            move_y, rest_y = accumulate_scroll_steps(scaled_dy, rest_y)
+            self._remainder = (rest_x, rest_y)
+        return move_x, move_y
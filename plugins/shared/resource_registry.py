@@ -0,0 +1,158 @@
+"""Process-wide resources that survive Talon reloading a plugin file.
+
+Talon re-executes a module when its file is saved, replacing its globals
+without cleanup: dotoolc processes and writer threads were orphaned and
+the old gaze callback stayed registered next to the new one. Resources and
+subscriptions are therefore recorded in a holder module in sys.modules,
+which reloads leave alone, under a stable key per owner:
+
+    _connection = keep("dotool:mouse_forwarder", make_connection, close)
+    subscribe("mouse_forwarder.screen_change", ui, "screen_change", _on_screen_change)
+
+keep() hands a reloaded module the live resource instead of a new one, and
+subscribe() unregisters the previous module's callback before registering
+the new one. Modules subscribe their event callbacks at import, so a
+reload swaps them; unsubscribe() returning True at import tells a module
+that a previous load was still running.
+"""
+
+from __future__ import annotations
+
+import atexit
+import sys
+import threading
+import types
+from typing import Any, Callable, TypeVar
+
+from .async_log import LOG
+
+STATE_MODULE = "talon_lite_resources"
+
+T = TypeVar("T")
+Close = Callable[[Any], None]
+Reuse = Callable[[Any], bool]
+
+
+class _AtExit:
+    """atexit as a registrar for subscribe(); the topic is ignored."""
+
+    @staticmethod
+    def register(_topic: str, callback: Callable) -> None:
+        atexit.register(callback)
+
+    @staticmethod
+    def unregister(_topic: str, callback: Callable) -> None:
+        atexit.unregister(callback)
+
+
+ATEXIT = _AtExit()
+
+
+def _state() -> types.ModuleType:
+    state = sys.modules.get(STATE_MODULE)
+    if state is None:
+        state = types.ModuleType(STATE_MODULE, "Resources kept across plugin reloads.")
+        state.lock = threading.RLock()
+        state.resources = {}
+        state.subscriptions = {}
+        sys.modules[STATE_MODULE] = state
+    return state
+
+
+def _close(key: str, resource, close: Close | None) -> None:
+    if close is None:
+        return
+    try:
+        close(resource)
+    except Exception as exc:
+        LOG.error("resource_registry", "close failed", key=key, error=exc)
+
+
+def keep(
+    key: str,
+    factory: Callable[[], T],
+    close: Close | None = None,
+    reuse: Reuse | None = None,
+) -> T:
+    """Return the resource kept under key, creating it on first use.
+
+    Args:
+        key: Stable name, e.g. "dotool:mouse_forwarder".
+        factory: Builds the resource when none is kept.
+        close: Releases the resource on release() or replacement.
+        reuse: Whether a kept resource may be handed out again; when it
+            returns False (e.g. its class was reloaded) the resource is
+            closed and rebuilt.
+    """
+    state = _state()
+    with state.lock:
+        entry = state.resources.get(key)
+        if entry is not None:
+            resource, old_close = entry
+            if reuse is None or reuse(resource):
+                return resource
+            _close(key, resource, old_close)
+        resource = factory()
+        state.resources[key] = (resource, close)
+        return resource
+
+
+def release(key: str) -> bool:
+    """Close and forget the resource kept under key; False if none was."""
+    state = _state()
+    with state.lock:
+        entry = state.resources.pop(key, None)
+    if entry is None:
+        return False
+    _close(key, *entry)
+    return True
+
+
+def subscribe(key: str, registrar, topic: str, callback: Callable) -> None:
+    """Register callback for topic, replacing whatever key registered before.
+
+    Args:
+        key: Stable name for the subscription, e.g. "control1_gaze_logger.gaze".
+        registrar: Object with register(topic, cb) and unregister(topic, cb),
+            such as talon.tracking_system.
+        topic: Event name, e.g. "gaze".
+        callback: The callback to register.
+    """
+    state = _state()
+    with state.lock:
+        unsubscribe(key)
+        registrar.register(topic, callback)
+        state.subscriptions[key] = (registrar, topic, callback)
+
+
+def unsubscribe(key: str) -> bool:
+    """Unregister the callback subscribed under key; False if none was."""
+    state = _state()
+    with state.lock:
+        entry = state.subscriptions.pop(key, None)
+        if entry is None:
+            return False
+        registrar, topic, callback = entry
+        try:
+            registrar.unregister(topic, callback)
+        except Exception as exc:
+            LOG.error("resource_registry", "unregister failed", key=key, error=exc)
+        return True
+
+
+def subscribed(key: str, callback: Callable | None = None) -> bool:
+    """Return whether a callback (this one, if given) is subscribed under key."""
+    entry = _state().subscriptions.get(key)
+    if entry is None:
+        return False
+    return callback is None or entry[2] is callback
+
+
+def release_all() -> None:
+    """Unsubscribe every callback and close every kept resource."""
+    state = _state()
+    with state.lock:
+        for key in list(state.subscriptions):
+            unsubscribe(key)
+        for key in list(state.resources):
+            release(key)
@@ -0,0 +1,82 @@
+"""Shadow model of the pointer position last sent to dotool.
+
+Wayland gives clients no way to query the pointer, so the forwarders record
+every absolute move they write here. Position queries and relative nudges
+are then answered locally, in desktop pixels, with no compositor round trip.
+The model goes stale if a physical mouse moves the pointer; the next
+absolute write resynchronizes it.
+"""
+
+from __future__ import annotations
+
+import threading
+
+from .pure_utils import Bounds, PointTuple, normalize_point
+
+
+def mouseto_line(nx: float, ny: float) -> str:
+    """Return a dotool mouseto line for a normalized 0..1 position."""
+    return f"mouseto {nx:.6f} {ny:.6f}"
+
+
+class ShadowCursor:
+    """Last pointer position written to dotool, in desktop pixels."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._position: PointTuple | None = None
+        self._last_line: str | None = None
+
+    def position(self) -> PointTuple | None:
+        """Return the last written (x, y), or None before any absolute write."""
+        return self._position
+
+    def forget(self) -> None:
+        """Drop the position, e.g. after the pointer moved outside dotool."""
+        with self._lock:
+            self._position = None
+            self._last_line = None
+
+    def move_to(
+        self, bounds: Bounds, x: float, y: float, skip_unchanged: bool = False
+    ) -> str | None:
+        """Record an absolute move and return its mouseto line.
+
+        The position is clamped to bounds like the written line is.
+
+        Args:
+            bounds: Desktop (left, top, width, height) in pixels.
+            x: Target desktop x in pixels.
+            y: Target desktop y in pixels.
+            skip_unchanged: Return None when the line equals the last one.
+
+        Returns:
+            mouseto line, or None when skipped.
+        """
+        nx, ny = normalize_point(bounds, x, y)
+        line = mouseto_line(nx, ny)
+        left, top, width, height = bounds
+        with self._lock:
+            if skip_unchanged and line == self._last_line:
+                return None
+            self._last_line = line
+            self._position = (left + nx * width, top + ny * height)
+        return line
+
+    def nudge(self, bounds: Bounds, dx: float, dy: float) -> str | None:
+        """Move relative to the shadow position; None if it is unknown."""
+        position = self._position
+        if position is None:
+            return None
+        return self.move_to(bounds, position[0] + dx, position[1] + dy)
+
+    def moved_by(self, dx: float, dy: float) -> None:
+        """Apply a relative move written without going through move_to()."""
+        with self._lock:
+            if self._position is None:
+                return
+            self._position = (self._position[0] + dx, self._position[1] + dy)
+            self._last_line = None
+
+
+SHADOW_CURSOR = ShadowCursor()
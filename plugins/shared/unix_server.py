@@ -0,0 +1,179 @@
+"""Serve one-line requests on a Unix socket from a background thread.
+
+A client sends one request line and reads the reply until the server
+closes the connection. Requests that look like HTTP (e.g. from curl
+--unix-socket) get an HTTP/1.0 response and have their headers drained.
+Servers are tracked by socket path for the whole process, so serving a
+path again, e.g. after a plugin reload, replaces the earlier server.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import socketserver
+import stat
+import threading
+from typing import Callable
+
+from .async_log import LOG
+
+Handler = Callable[[str], str]
+
+MAX_REQUEST_BYTES = 4096
+REQUEST_TIMEOUT = 2.0
+
+_servers: dict[str, "UnixServer"] = {}
+_servers_lock = threading.Lock()
+
+
+def http_response(body: str, content_type: str = "text/plain; charset=utf-8") -> bytes:
+    """Return body wrapped in a minimal HTTP/1.0 200 response."""
+    data = body.encode("utf-8")
+    head = (
+        "HTTP/1.0 200 OK\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    return head.encode("ascii") + data
+
+
+def _remove_stale_socket(path: str) -> None:
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    timeout = REQUEST_TIMEOUT
+
+    def handle(self) -> None:
+        server: UnixServer = self.server.owner  # type: ignore[attr-defined]
+        try:
+            line = self.rfile.readline(MAX_REQUEST_BYTES).decode("utf-8", "replace").strip()
+            is_http = line.endswith(("HTTP/1.0", "HTTP/1.1"))
+            if is_http:
+                while self.rfile.readline(MAX_REQUEST_BYTES).strip():
+                    pass
+        except OSError:
+            return
+        if is_http:
+            # "GET /metrics HTTP/1.1" -> "/metrics"
+            parts = line.split()
+            line = parts[1] if len(parts) == 3 else ""
+        try:
+            reply = server.handler(line)
+        except Exception as exc:
+            LOG.error(server.name, "handler failed", request=line, error=exc)
+            reply = f"error {exc}\n"
+        data = http_response(reply, server.content_type) if is_http else reply.encode("utf-8")
+        try:
+            self.wfile.write(data)
+        except OSError:
+            pass
+
+
+class _ThreadingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class UnixServer:
+    """A Unix stream socket answering request lines through handler."""
+
+    def __init__(
+        self,
+        path: str,
+        handler: Handler,
+        name: str,
+        content_type: str = "text/plain; charset=utf-8",
+    ) -> None:
+        self.path = path
+        self.handler = handler
+        self.name = name
+        self.content_type = content_type
+        self._server: _ThreadingServer | None = None
+
+    def running(self) -> bool:
+        return self._server is not None
+
+    def start(self) -> None:
+        """Bind the socket (owner-only) and serve on a daemon thread."""
+        _remove_stale_socket(self.path)
+        old_umask = os.umask(0o077)
+        try:
+            server = _ThreadingServer(self.path, _RequestHandler)
+        finally:
+            os.umask(old_umask)
+        server.owner = self  # type: ignore[attr-defined]
+        self._server = server
+        threading.Thread(
+            target=server.serve_forever,
+            kwargs={"poll_interval": 0.5},
+            name=f"{self.name}-server",
+            daemon=True,
+        ).start()
+
+    def close(self) -> None:
+        """Stop serving and remove the socket file."""
+        server, self._server = self._server, None
+        if server is None:
+            return
+        server.shutdown()
+        server.server_close()
+        _remove_stale_socket(self.path)
+
+
+def serve(
+    path: str,
+    handler: Handler,
+    name: str,
+    content_type: str = "text/plain; charset=utf-8",
+) -> UnixServer | None:
+    """Serve handler on path, replacing any server already on that path.
+
+    Returns:
+        The running server, or None if the socket could not be bound.
+    """
+    with _servers_lock:
+        previous = _servers.pop(path, None)
+        if previous is not None:
+            previous.close()
+        server = UnixServer(path, handler, name, content_type)
+        try:
+            server.start()
+        except OSError as exc:
+            LOG.error(name, "socket bind failed", path=path, error=exc)
+            return None
+        _servers[path] = server
+        return server
+
+
+def stop(path: str) -> None:
+    """Stop the server on path, if any."""
+    with _servers_lock:
+        server = _servers.pop(path, None)
+    if server is not None:
+        server.close()
+
+
+def request(path: str, line: str, timeout: float = REQUEST_TIMEOUT) -> str:
+    """Send a request to a Unix socket server and return the reply.
+
+    A newline is appended unless line already ends with one.
+    """
+    if not line.endswith("\n"):
+        line += "\n"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path)
+        client.sendall(line.encode("utf-8"))
+        chunks = []
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return b"".join(chunks).decode("utf-8", "replace")
@@ -0,0 +1,175 @@
+"""Wayland clipboard helpers backed by wl-copy and wl-paste."""
+
+from __future__ import annotations
+
+import subprocess
+import threading
+from typing import Callable
+
+ClipboardContents = bytes | None
+
+CLIPBOARD_TIMEOUT = 0.5
+# wl-paste runs the command on every selection change; echo prints one line.
+WATCH_COMMAND = ("wl-paste", "--watch", "echo")
+
+
+def read_clipboard(timeout: float = CLIPBOARD_TIMEOUT) -> ClipboardContents:
+    """Return raw clipboard bytes, or None when empty or unavailable."""
+    try:
+        result = subprocess.run(
+            ["wl-paste", "--no-newline"],
+            capture_output=True,
+            check=False,
+            timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout
+
+
+def write_clipboard(
+    contents: ClipboardContents, timeout: float = CLIPBOARD_TIMEOUT
+) -> bool:
+    """Replace clipboard contents, clearing it when contents is None."""
+    if contents is None:
+        command = ["wl-copy", "--clear"]
+        payload = b""
+    else:
+        command = ["wl-copy"]
+        payload = contents
+    try:
+        result = subprocess.run(
+            command,
+            input=payload,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+            timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return result.returncode == 0
+
+
+def restore_clipboard(previous: ClipboardContents, expected: bytes) -> bool:
+    """Restore previous contents unless the clipboard changed meanwhile.
+
+    Args:
+        previous: Clipboard contents saved before the paste.
+        expected: Contents written for the paste.
+
+    Returns:
+        Whether the previous contents were written back.
+    """
+    if read_clipboard() != expected:
+        return False
+    return write_clipboard(previous)
+
+
+def schedule_clipboard_restore(
+    previous: ClipboardContents, expected: bytes, delay: float
+) -> threading.Timer:
+    """Restore previous clipboard contents on a background timer."""
+    timer = threading.Timer(max(0.0, delay), restore_clipboard, (previous, expected))
+    timer.daemon = True
+    timer.start()
+    return timer
+
+
+class ClipboardSnapshot:
+    """The user's clipboard contents, kept current off the insert path.
+
+    A wl-paste --watch process reports each selection change and a daemon
+    thread re-reads the clipboard, so a paste can save what it replaces
+    without running wl-paste first. Contents written by the paste itself
+    are not taken as the user's. Until the watcher runs, or while a
+    reported change has not been read yet, previous() reads the clipboard
+    directly, so a copy made just before a paste is never missed.
+    """
+
+    def __init__(
+        self,
+        watch_command: tuple[str, ...] = WATCH_COMMAND,
+        reader: Callable[[], ClipboardContents] = read_clipboard,
+    ) -> None:
+        self.contents: ClipboardContents = None
+        self._watch_command = watch_command
+        self._reader = reader
+        self._pasted: bytes | None = None
+        # Selection changes wl-paste reported, and how many of them the
+        # last completed read saw.
+        self._changes = 0
+        self._read_changes = 0
+        self._lock = threading.Lock()
+        self._proc: subprocess.Popen | None = None
+
+    def start(self) -> bool:
+        """Start watching the clipboard; False if wl-paste is unavailable."""
+        if self.watching():
+            return True
+        try:
+            self._proc = subprocess.Popen(
+                self._watch_command,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError:
+            return False
+        self.refresh()
+        threading.Thread(
+            target=self._watch, args=(self._proc,), name="clipboard-watch", daemon=True
+        ).start()
+        return True
+
+    def stop(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        proc.terminate()
+        try:
+            proc.wait(timeout=CLIPBOARD_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    def watching(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def current(self) -> bool:
+        """Return whether contents reflect every change the watcher reported."""
+        with self._lock:
+            return self._read_changes == self._changes
+
+    def refresh(self) -> None:
+        """Re-read the clipboard, ignoring contents a paste wrote."""
+        with self._lock:
+            changes = self._changes
+        contents = self._reader()
+        with self._lock:
+            if changes < self._read_changes:
+                # A read that started later has already finished.
+                return
+            self._read_changes = changes
+            if contents is not None and contents == self._pasted:
+                return
+            self.contents = contents
+
+    def previous(self, payload: bytes) -> ClipboardContents:
+        """Return the contents a paste of payload replaces.
+
+        Args:
+            payload: Contents about to be written for the paste.
+        """
+        if not self.watching() or not self.current():
+            self.refresh()
+        with self._lock:
+            self._pasted = payload
+            return self.contents
+
+    def _watch(self, proc: subprocess.Popen) -> None:
+        for _line in proc.stdout:
+            with self._lock:
+                self._changes += 1
+            self.refresh()
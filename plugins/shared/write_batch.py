@@ -0,0 +1,112 @@
+"""Coalesce dotool writes made while one spoken phrase runs.
+
+Every dotoolc connection feeds the same dotoold pipe, so the lines queued
+during a phrase are flushed in order through the first connection that
+queued any, as a single write. Only the thread that began the batch is
+batched; gaze and noise threads keep writing straight through.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable, Protocol
+
+from .async_log import LOG
+
+DEFAULT_SAFETY_TIMEOUT = 2.0
+
+FailureCallback = Callable[[], None]
+
+
+class LineWriter(Protocol):
+    def send_lines(self, lines: list[str]) -> bool: ...
+
+
+class PhraseBatcher:
+    """Buffer writes between begin() and end(), then send them at once.
+
+    A safety timer ends the batch if end() never arrives, e.g. when a
+    phrase raises before Talon fires post:phrase.
+    """
+
+    def __init__(self, safety_timeout: float = DEFAULT_SAFETY_TIMEOUT) -> None:
+        self.safety_timeout = safety_timeout
+        self._lock = threading.Lock()
+        self._owner: int | None = None
+        self._writer: LineWriter | None = None
+        self._lines: list[str] = []
+        self._on_failure: list[FailureCallback] = []
+        self._timer: threading.Timer | None = None
+
+    def batching(self) -> bool:
+        """Return whether writes from the calling thread are being batched."""
+        return self._owner == threading.get_ident()
+
+    def queued(self) -> int:
+        """Return how many lines are waiting for the next flush."""
+        return len(self._lines)
+
+    def begin(self) -> None:
+        """Start batching writes from the calling thread."""
+        self.end()
+        timer = threading.Timer(self.safety_timeout, self.end)
+        timer.daemon = True
+        with self._lock:
+            self._owner = threading.get_ident()
+            self._timer = timer
+        timer.start()
+
+    def send_lines(
+        self,
+        writer: LineWriter,
+        lines: list[str],
+        on_failure: FailureCallback | None = None,
+    ) -> bool:
+        """Queue lines while batching, otherwise write them now.
+
+        Args:
+            writer: Connection the lines would normally be written to.
+            lines: dotool action lines.
+            on_failure: Called if a later flush of these lines fails.
+
+        Returns:
+            Whether the lines were queued or written.
+        """
+        if not lines:
+            return True
+        if self._owner == threading.get_ident():
+            with self._lock:
+                if self._owner == threading.get_ident():
+                    if self._writer is None:
+                        self._writer = writer
+                    self._lines.extend(lines)
+                    if on_failure is not None and on_failure not in self._on_failure:
+                        self._on_failure.append(on_failure)
+                    return True
+        return writer.send_lines(lines)
+
+    def flush(self) -> bool:
+        """Write queued lines now, keeping the batch open for later writes."""
+        with self._lock:
+            writer, lines, on_failure = self._writer, self._lines, self._on_failure
+            self._writer, self._lines, self._on_failure = None, [], []
+        if writer is None or writer.send_lines(lines):
+            return True
+        for callback in on_failure:
+            try:
+                callback()
+            except Exception as exc:
+                LOG.error("write_batch", "failure callback failed", error=exc)
+        return False
+
+    def end(self) -> bool:
+        """Stop batching and flush everything queued."""
+        with self._lock:
+            timer, self._timer = self._timer, None
+            self._owner = None
+        if timer is not None:
+            timer.cancel()
+        return self.flush()
+
+
+PHRASE_BATCHER = PhraseBatcher()
@@ -0,0 +1,23 @@
+from talon import Module, app
+
+from .shared.instrumentation import STARTUP_PROFILER
+
+mod = Module()
+
+
+@mod.action_class
+class Actions:
+    @staticmethod
+    def startup_profiler_report() -> str:
+        """Return per-module import and ready-callback times."""
+        return "\n".join(STARTUP_PROFILER.report_lines())
+
+    @staticmethod
+    def startup_profiler_log() -> None:
+        """Print per-module import and ready-callback times."""
+        for line in STARTUP_PROFILER.report_lines():
+            print(f"startup_profiler {line}")
+
+
+# Startup is over: later imports (reloads) are not timed.
+app.register("ready", STARTUP_PROFILER.stop_watching)
@@ -1,19 +1,23 @@
-from talon import Context, Module, actions, app, tracking_system, ui
+from talon import Context, Module, actions, cron, tracking_system, ui
 from talon.canvas import Canvas
 from talon.plugins import eye_mouse
 
+from ..shared import resource_registry
+from ..shared.instrumentation import CALLBACK_PROFILER, STARTUP_PROFILER
 from ..shared.pure_utils import rect_local_point
 
 ctx = Context()
 mod = Module()
 
 _overlay_enabled = False
-_gaze_registered = False
+_GAZE_KEY = "control1_debug_overlay.gaze"
+_CANVAS_KEY = "control1_debug_overlay.canvases"
 _dot_pos = None
 _canvas_entries = []
 
 
 def _make_draw(rect):
+    @CALLBACK_PROFILER.profile(__name__)
     def _draw(c):
         if _dot_pos is None:
             return
@@ -37,11 +41,16 @@ def _make_draw(rect):
     return _draw
 
 
-def _close_canvases() -> None:
-    global _canvas_entries
-    for canvas, draw_cb in _canvas_entries:
+def _close_entries(entries) -> None:
+    for canvas, draw_cb in entries:
         canvas.unregister("draw", draw_cb)
         canvas.close()
+
+
+def _close_canvases() -> None:
+    global _canvas_entries
+    # Also closes canvases left by a previous load of this file.
+    resource_registry.release(_CANVAS_KEY)
     _canvas_entries = []
 
 
@@ -57,15 +66,13 @@ def _create_canvases() -> None:
         canvas.register("draw", draw_cb)
         entries.append((canvas, draw_cb))
 
-    _canvas_entries = entries
+    _canvas_entries = resource_registry.keep(_CANVAS_KEY, lambda: entries, _close_entries)
 
 
 def _register_gaze() -> None:
-    global _gaze_registered
-    if _gaze_registered:
+    if resource_registry.subscribed(_GAZE_KEY, _on_gaze):
         return
-    tracking_system.register("gaze", _on_gaze)
-    _gaze_registered = True
+    resource_registry.subscribe(_GAZE_KEY, tracking_system, "gaze", _on_gaze)
 
 
 def _clear_overlay() -> None:
@@ -76,11 +83,7 @@ def _clear_overlay() -> None:
 
 
 def _unregister_gaze() -> None:
-    global _gaze_registered
-    if not _gaze_registered:
-        return
-    tracking_system.unregister("gaze", _on_gaze)
-    _gaze_registered = False
+    resource_registry.unsubscribe(_GAZE_KEY)
 
 
 def _sync_overlay() -> None:
@@ -97,6 +100,7 @@ def _sync_overlay() -> None:
     _register_gaze()
 
 
+@CALLBACK_PROFILER.profile(__name__)
 def _on_gaze(*_args) -> None:
     global _dot_pos
     if not _overlay_enabled:
@@ -116,6 +120,7 @@ def _on_gaze(*_args) -> None:
         canvas.freeze()
 
 
+@CALLBACK_PROFILER.profile(__name__)
 def _on_screen_change(_screens) -> None:
     if not _overlay_enabled:
         return
@@ -123,6 +128,7 @@ def _on_screen_change(_screens) -> None:
 
 
 @ctx.action_class("user")
+@CALLBACK_PROFILER.profile_actions(__name__)
 class UserActions:
     @staticmethod
     def control1_started() -> None:
@@ -176,8 +182,11 @@ class Actions:
         return _overlay_enabled
 
 
-def _on_ready() -> None:
-    ui.register("screen_change", _on_screen_change)
-
-
-app.register("ready", _on_ready)
+resource_registry.subscribe(
+    "control1_debug_overlay.screen_change", ui, "screen_change", _on_screen_change
+)
+# Canvases are only kept while enabled, so a previous load of this file was
+# showing: stop its callback and restart with this load's code.
+if resource_registry.release(_CANVAS_KEY):
+    resource_registry.unsubscribe(_GAZE_KEY)
+    cron.after("0ms", actions.user.control1_debug_overlay_start)
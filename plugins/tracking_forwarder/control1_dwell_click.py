@@ -0,0 +1,219 @@
+from talon import Module, actions, cron, settings, tracking_system, ui
+from talon.canvas import Canvas
+from talon.plugins import eye_mouse
+
+from ..shared import resource_registry
+from ..shared.fixation import FIXATION, DwellTimer, FixationDetector
+from ..shared.instrumentation import CALLBACK_PROFILER, STARTUP_PROFILER
+from ..shared.pure_utils import rect_local_point, resolve_toggle_state
+
+mod = Module()
+
+mod.setting(
+    "control1_dwell_click_time",
+    type=float,
+    default=0.8,
+    desc="Seconds a fixation must last before a dwell click.",
+)
+mod.setting(
+    "control1_dwell_click_radius",
+    type=float,
+    default=40.0,
+    desc="Pixels the fixation may drift before the dwell restarts.",
+)
+mod.setting(
+    "control1_fixation_velocity_threshold",
+    type=float,
+    default=1000.0,
+    desc="Gaze speed in pixels per second above which a sample is a saccade.",
+)
+mod.setting(
+    "control1_fixation_dispersion_threshold",
+    type=float,
+    default=60.0,
+    desc="Maximum x plus y spread in pixels of a fixation window.",
+)
+mod.setting(
+    "control1_fixation_window",
+    type=float,
+    default=0.1,
+    desc="Seconds of gaze a fixation window must cover.",
+)
+
+_dwell_enabled = False
+_GAZE_KEY = "control1_dwell_click.gaze"
+_CANVAS_KEY = "control1_dwell_click.canvases"
+_dwell = DwellTimer()
+_detector = FixationDetector()
+_canvas_entries = []
+
+
+def _make_draw(rect):
+    @CALLBACK_PROFILER.profile(__name__)
+    def _draw(c):
+        if _dwell.anchor is None or _dwell.fired:
+            return
+
+        x, y = _dwell.anchor
+        local_point = rect_local_point(rect, x, y)
+        if local_point is None:
+            return
+
+        lx, ly = local_point
+        radius = _dwell.radius
+
+        c.paint.style = c.paint.Style.STROKE
+        c.paint.color = "ffaa00cc"
+        c.paint.stroke_width = 2
+        c.draw_circle(lx, ly, radius)
+
+        c.paint.style = c.paint.Style.FILL
+        c.paint.color = "ffaa0066"
+        c.draw_circle(lx, ly, radius * _dwell.progress)
+
+    return _draw
+
+
+def _close_entries(entries) -> None:
+    for canvas, draw_cb in entries:
+        canvas.unregister("draw", draw_cb)
+        canvas.close()
+
+
+def _close_canvases() -> None:
+    global _canvas_entries
+    # Also closes canvases left by a previous load of this file.
+    resource_registry.release(_CANVAS_KEY)
+    _canvas_entries = []
+
+
+def _create_canvases() -> None:
+    global _canvas_entries
+    _close_canvases()
+
+    entries = []
+    for screen in ui.screens():
+        rect = screen.rect
+        draw_cb = _make_draw((rect.x, rect.y, rect.width, rect.height))
+        canvas = Canvas.from_screen(screen)
+        canvas.register("draw", draw_cb)
+        entries.append((canvas, draw_cb))
+
+    _canvas_entries = resource_registry.keep(_CANVAS_KEY, lambda: entries, _close_entries)
+
+
+def _redraw() -> None:
+    for canvas, _draw_cb in _canvas_entries:
+        canvas.freeze()
+
+
+def _apply_settings() -> None:
+    _detector.configure(
+        velocity_threshold=settings.get("user.control1_fixation_velocity_threshold"),
+        dispersion_threshold=settings.get("user.control1_fixation_dispersion_threshold"),
+        window=settings.get("user.control1_fixation_window"),
+    )
+    _dwell.dwell_time = settings.get("user.control1_dwell_click_time")
+    _dwell.radius = settings.get("user.control1_dwell_click_radius")
+
+
+def _latest_sample():
+    m = eye_mouse.mouse
+    # Dwell timing needs the tracker's timestamp; skip samples without one.
+    if not m.xy_hist or not m.eye_hist:
+        return None
+    point = m.xy_hist[-1]
+    return m.eye_hist[-1].ts, point.x, point.y
+
+
+@CALLBACK_PROFILER.profile(__name__)
+def _on_gaze(*_args) -> None:
+    if not _dwell_enabled:
+        return
+
+    if not actions.tracking.control1_enabled():
+        if _dwell.anchor is not None:
+            _dwell.reset()
+            _redraw()
+        return
+
+    sample = _latest_sample()
+    if sample is None:
+        return
+
+    ts, x, y = sample
+    kind = _detector.update(ts, x, y)
+    had_anchor = _dwell.anchor is not None
+    point = _detector.centroid() if kind == FIXATION else None
+    if _dwell.update(ts, kind, point):
+        actions.mouse_click(0)
+    if had_anchor or _dwell.anchor is not None:
+        _redraw()
+
+
+def _register_gaze() -> None:
+    if resource_registry.subscribed(_GAZE_KEY, _on_gaze):
+        return
+    resource_registry.subscribe(_GAZE_KEY, tracking_system, "gaze", _on_gaze)
+
+
+def _unregister_gaze() -> None:
+    resource_registry.unsubscribe(_GAZE_KEY)
+
+
+@CALLBACK_PROFILER.profile(__name__)
+def _on_screen_change(_screens) -> None:
+    if not _dwell_enabled:
+        return
+    _create_canvases()
+
+
+@mod.action_class
+class Actions:
+    @staticmethod
+    def control1_dwell_click_start() -> None:
+        """Start clicking wherever a control1 fixation dwells."""
+        global _dwell_enabled
+        if _dwell_enabled:
+            print("control1_dwell_click already running")
+            return
+        _apply_settings()
+        _dwell.reset()
+        _dwell_enabled = True
+        _create_canvases()
+        _register_gaze()
+        print("control1_dwell_click started")
+
+    @staticmethod
+    def control1_dwell_click_stop() -> None:
+        """Stop control1 dwell clicking."""
+        global _dwell_enabled
+        _dwell_enabled = False
+        _unregister_gaze()
+        _close_canvases()
+        _dwell.reset()
+        print("control1_dwell_click stopped")
+
+    @staticmethod
+    def control1_dwell_click_toggle(state: bool | None = None) -> None:
+        """Toggle control1 dwell clicking."""
+        target = resolve_toggle_state(_dwell_enabled, state)
+        if not target:
+            actions.user.control1_dwell_click_stop()
+            return
+        actions.user.control1_dwell_click_start()
+
+    @staticmethod
+    def control1_dwell_click_running() -> bool:
+        """Return whether control1 dwell clicking is enabled."""
+        return _dwell_enabled
+
+
+resource_registry.subscribe(
+    "control1_dwell_click.screen_change", ui, "screen_change", _on_screen_change
+)
+# Canvases are only kept while enabled, so a previous load of this file was
+# running: stop its callback and restart with this load's code.
+if resource_registry.release(_CANVAS_KEY):
+    resource_registry.unsubscribe(_GAZE_KEY)
+    cron.after("0ms", actions.user.control1_dwell_click_start)
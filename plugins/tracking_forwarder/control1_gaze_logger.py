@@ -1,7 +1,15 @@
-from talon import Module, actions, app, settings, tracking_system
+import threading
+
+from talon import Module, actions, app, cron, settings, tracking_system
 from talon.plugins import eye_mouse
 
-from ..shared.pure_utils import format_control1_sample
+from ..shared import resource_registry
+from ..shared.async_log import LOG
+from ..shared.gaze_log import BINARY_MAGIC, encode_gaze_record, encode_write_record
+from ..shared.gaze_ring import GazeRingWriter
+from ..shared.instrumentation import CALLBACK_PROFILER, STARTUP_PROFILER
+from ..shared.priority_lanes import MOTION_WRITES
+from ..shared.pure_utils import format_control1_sample, format_control1_write
 
 mod = Module()
 
@@ -11,43 +19,164 @@ mod.setting(
     default=False,
     desc="Auto-start control1 gaze logger at Talon startup.",
 )
+mod.setting(
+    "control1_gaze_logger_binary_path",
+    type=str,
+    default="",
+    desc="Append binary gaze records to this file instead of printing lines.",
+)
+mod.setting(
+    "control1_gaze_logger_ring_path",
+    type=str,
+    default="",
+    desc="Publish samples to a shared-memory ring here (e.g. /dev/shm/talon-control1-gaze).",
+)
 
-def _control1_sample_line() -> str:
+_binary_log = None
+_binary_log_lock = threading.Lock()
+_ring = None
+_clock_warned = False
+_GAZE_KEY = "control1_gaze_logger.gaze"
+_WRITES_KEY = "control1_gaze_logger.motion_writes"
+# The motion lane the control1 pointer forwarder writes gaze moves through.
+_POINTER_LANE = "control1_pointer_forwarder"
+# A gaze-to-write time outside [0, this) means the tracker's ts is not on
+# the perf_counter() clock the lane stamps writes with.
+_MAX_WRITE_LATENCY = 5.0
+_BINARY_LOG_KEY = "control1_gaze_logger.binary_log"
+_RING_KEY = "control1_gaze_logger.ring"
+
+
+def _control1_sample():
     m = eye_mouse.mouse
     if not m.xy_hist or not m.eye_hist:
-        return "control1 no samples"
+        return None
 
     xy = m.xy_hist[-1]
     d = m.delta_hist[-1] if m.delta_hist else None
     g = m.eye_hist[-1]
 
-    delta = None if d is None else (d.x, d.y)
+    return {
+        "ts": g.ts,
+        "xy_px": (xy.x, xy.y),
+        "gaze_norm": (g.gaze.x, g.gaze.y),
+        "delta": None if d is None else (d.x, d.y),
+    }
+
+
+def _control1_sample_line(sample) -> str:
+    if sample is None:
+        return "control1 no samples"
     return format_control1_sample(
-        timestamp=g.ts,
-        xy_px=(xy.x, xy.y),
-        gaze_norm=(g.gaze.x, g.gaze.y),
-        delta=delta,
+        timestamp=sample["ts"],
+        xy_px=sample["xy_px"],
+        gaze_norm=sample["gaze_norm"],
+        delta=sample["delta"],
     )
 
 
-def _on_gaze(*_args) -> None:
-    if not actions.tracking.control1_enabled():
+def _new_binary_log(path: str):
+    log = open(path, "ab")
+    if log.tell() == 0:
+        log.write(BINARY_MAGIC)
+    return log
+
+
+def _open_binary_log() -> None:
+    global _binary_log
+    _close_binary_log()
+    path = settings.get("user.control1_gaze_logger_binary_path")
+    if not path:
         return
-    print(_control1_sample_line())
+    try:
+        _binary_log = resource_registry.keep(
+            _BINARY_LOG_KEY, lambda: _new_binary_log(path), lambda log: log.close()
+        )
+    except OSError as exc:
+        LOG.error("control1_gaze_logger", "binary log open failed", error=exc)
+
+
+def _close_binary_log() -> None:
+    global _binary_log
+    # Also closes a log left open by a previous load of this file.
+    with _binary_log_lock:
+        resource_registry.release(_BINARY_LOG_KEY)
+        _binary_log = None
 
 
-def _clear_gaze_subscriptions() -> None:
-    for _ in range(16):
-        tracking_system.unregister("gaze", _on_gaze)
+def _write_binary(record: bytes) -> None:
+    # Gaze samples and motion writes arrive on different threads.
+    with _binary_log_lock:
+        if _binary_log is not None:
+            _binary_log.write(record)
+
+
+def _open_ring() -> None:
+    global _ring
+    _close_ring()
+    path = settings.get("user.control1_gaze_logger_ring_path")
+    if not path:
+        return
+    try:
+        _ring = resource_registry.keep(
+            _RING_KEY, lambda: GazeRingWriter(path), GazeRingWriter.close
+        )
+    except OSError as exc:
+        LOG.error("control1_gaze_logger", "ring open failed", error=exc)
+
+
+def _close_ring() -> None:
+    global _ring
+    resource_registry.release(_RING_KEY)
+    _ring = None
+
+
+@CALLBACK_PROFILER.profile(__name__)
+def _on_gaze(*_args) -> None:
+    if not actions.tracking.control1_enabled():
+        return
+    sample = _control1_sample()
+    # The binary log replaces the text lines; the ring only adds a stream.
+    if _binary_log is None:
+        LOG.info("control1_gaze_logger", _control1_sample_line(sample))
+    if sample is None or (_binary_log is None and _ring is None):
+        return
+    record = encode_gaze_record(**sample)
+    if _binary_log is not None:
+        _write_binary(record)
+    if _ring is not None:
+        _ring.publish(record)
+
+
+def _on_motion_written(gaze_ts: float, write_ts: float) -> None:
+    global _clock_warned
+    if not 0.0 <= write_ts - gaze_ts < _MAX_WRITE_LATENCY:
+        if not _clock_warned:
+            _clock_warned = True
+            LOG.warning(
+                "control1_gaze_logger",
+                "gaze ts is not on the perf_counter clock; not logging writes",
+                ts=gaze_ts,
+                write_ts=write_ts,
+            )
+        return
+    if _binary_log is None:
+        LOG.info("control1_gaze_logger", format_control1_write(gaze_ts, write_ts))
+        return
+    _write_binary(encode_write_record(gaze_ts, write_ts))
 
 
 def _register_gaze() -> None:
-    _clear_gaze_subscriptions()
-    tracking_system.register("gaze", _on_gaze)
+    # Replaces the callbacks of a previous load of this file, if any.
+    resource_registry.subscribe(_GAZE_KEY, tracking_system, "gaze", _on_gaze)
+    resource_registry.subscribe(
+        _WRITES_KEY, MOTION_WRITES, _POINTER_LANE, _on_motion_written
+    )
 
 
 def _unregister_gaze() -> None:
-    _clear_gaze_subscriptions()
+    resource_registry.unsubscribe(_GAZE_KEY)
+    resource_registry.unsubscribe(_WRITES_KEY)
 
 
 @mod.action_class
@@ -55,6 +184,8 @@ class Actions:
     @staticmethod
     def control1_gaze_logger_start() -> None:
         """Enable control1 gaze logger (gaze-event driven)."""
+        _open_binary_log()
+        _open_ring()
         _register_gaze()
         print(
             "control1_gaze_logger started mode=gaze "
@@ -65,17 +196,25 @@ class Actions:
     def control1_gaze_logger_stop() -> None:
         """Disable control1 gaze logger."""
         _unregister_gaze()
+        _close_binary_log()
+        _close_ring()
         print("control1_gaze_logger stopped")
 
     @staticmethod
     def control1_gaze_logger_once() -> None:
         """Log one control1 eye tracking sample."""
-        print(_control1_sample_line())
+        print(_control1_sample_line(_control1_sample()))
 
+@CALLBACK_PROFILER.profile(__name__)
 def _on_ready() -> None:
     if not settings.get("user.control1_gaze_logger_autostart"):
         return
     actions.user.control1_gaze_logger_start()
 
 
-app.register("ready", _on_ready)
+# A previous load of this file was logging: stop its callback and restart
+# logging with this load's code.
+if resource_registry.unsubscribe(_GAZE_KEY):
+    resource_registry.unsubscribe(_WRITES_KEY)
+    cron.after("0ms", actions.user.control1_gaze_logger_start)
+app.register("ready", STARTUP_PROFILER.profile_ready(__name__, _on_ready))
@@ -1,9 +1,15 @@
-import subprocess
-
-from talon import Module, actions, app, settings, tracking_system, ui
+from talon import Module, actions, app, cron, settings, tracking_system, ui
 from talon.plugins import eye_mouse
 
-from ..shared.pure_utils import desktop_bounds_from_rects, normalize_point
+from ..shared import resource_registry
+from ..shared.dotool_connection import shared_connection
+from ..shared.fixation import SACCADE, FixationDetector
+from ..shared.instrumentation import CALLBACK_PROFILER, STARTUP_PROFILER
+from ..shared.metrics import METRICS
+from ..shared.priority_lanes import MOTION, shared_motion_lane
+from ..shared.pure_utils import desktop_bounds_from_rects
+from ..shared.relative_pointer import RelativePointer, merge_mousemove, mousemove_line
+from ..shared.shadow_cursor import SHADOW_CURSOR
 
 mod = Module()
 
@@ -19,9 +25,62 @@ mod.setting(
     default=True,
     desc="Log when control1 pointer forwarder auto-starts.",
 )
+mod.setting(
+    "control1_pointer_forwarder_suppress_saccades",
+    type=bool,
+    default=False,
+    desc="Skip pointer writes for gaze samples classified as saccades.",
+)
+mod.setting(
+    "control1_pointer_forwarder_idle_timeout",
+    type=float,
+    default=30.0,
+    desc="Seconds without gaze writes before closing the dotoolc connection.",
+)
+mod.setting(
+    "control1_pointer_forwarder_mode",
+    type=str,
+    default="absolute",
+    desc='"absolute" follows xy_hist with mouseto; "relative" turns delta_hist into mousemove.',
+)
+mod.setting(
+    "control1_pointer_forwarder_relative_gain",
+    type=float,
+    default=1.0,
+    desc="Relative mode: pixels moved per pixel of control1 delta.",
+)
+mod.setting(
+    "control1_pointer_forwarder_relative_acceleration",
+    type=float,
+    default=0.0,
+    desc="Relative mode: acceleration exponent (0 is linear).",
+)
 
-_dotoolc_proc = None
+_connection = shared_connection("control1_pointer_forwarder", lane=MOTION)
+_motion = shared_motion_lane(_connection, "control1_pointer_forwarder")
+_gaze_received = METRICS.counter(
+    "talon_gaze_samples_received_total",
+    "control1 gaze samples seen while control1 was enabled.",
+    plugin="control1_pointer_forwarder",
+)
+_gaze_saccades = METRICS.counter(
+    "talon_gaze_samples_dropped_total",
+    "Gaze samples not forwarded, by reason.",
+    plugin="control1_pointer_forwarder",
+    reason="saccade",
+)
+_gaze_unchanged = METRICS.counter(
+    "talon_gaze_samples_dropped_total",
+    "Gaze samples not forwarded, by reason.",
+    plugin="control1_pointer_forwarder",
+    reason="unchanged",
+)
 _desktop_bounds = (0.0, 0.0, 1.0, 1.0)
+_suppress_saccades = False
+_relative: RelativePointer | None = None
+_last_delta = None
+_detector = FixationDetector()
+_GAZE_KEY = "control1_pointer_forwarder.gaze"
 
 
 def _refresh_desktop_bounds() -> None:
@@ -33,100 +92,77 @@ def _refresh_desktop_bounds() -> None:
     _desktop_bounds = desktop_bounds_from_rects(rects)
 
 
-def _close_dotoolc_proc() -> None:
-    global _dotoolc_proc
-    if _dotoolc_proc is None:
-        return
+def _gaze_ts() -> float | None:
+    # Tagged on motion lines so MOTION_WRITES listeners see gaze-to-write time.
+    eye_hist = eye_mouse.mouse.eye_hist
+    return eye_hist[-1].ts if eye_hist else None
 
-    proc = _dotoolc_proc
-    _dotoolc_proc = None
-
-    try:
-        if proc.stdin is not None:
-            proc.stdin.close()
-    except Exception:
-        pass
-
-    try:
-        proc.terminate()
-        proc.wait(timeout=0.1)
-    except subprocess.TimeoutExpired:
-        try:
-            proc.kill()
-            proc.wait(timeout=0.1)
-        except Exception:
-            pass
-    except Exception:
-        pass
-
-
-def _ensure_dotoolc_proc() -> bool:
-    global _dotoolc_proc
-    if _dotoolc_proc is not None and _dotoolc_proc.poll() is None and _dotoolc_proc.stdin:
-        return True
-
-    _close_dotoolc_proc()
-    try:
-        _dotoolc_proc = subprocess.Popen(
-            ["dotoolc"],
-            stdin=subprocess.PIPE,
-            text=True,
-            bufsize=1,
-        )
-    except Exception as exc:
-        print(f"control1_pointer_forwarder dotoolc error: {exc}")
-        _dotoolc_proc = None
-        return False
 
-    if _dotoolc_proc.stdin is None:
-        _close_dotoolc_proc()
-        return False
-    return True
+def _send_dotool_line(line: str) -> None:
+    # Latest-wins: a gaze burst never queues ahead of keys and clicks.
+    _motion.submit(line, source_ts=_gaze_ts())
 
 
-def _send_dotool_line(line: str) -> None:
-    if not _ensure_dotoolc_proc():
-        return
+def _register_gaze() -> None:
+    # Replaces the callback of a previous load of this file, if any.
+    resource_registry.subscribe(_GAZE_KEY, tracking_system, "gaze", _on_gaze)
 
-    assert _dotoolc_proc is not None
-    assert _dotoolc_proc.stdin is not None
-    try:
-        _dotoolc_proc.stdin.write(f"{line}\n")
-        _dotoolc_proc.stdin.flush()
-        return
-    except Exception:
-        _close_dotoolc_proc()
 
-    if not _ensure_dotoolc_proc():
-        return
+def _unregister_gaze() -> None:
+    resource_registry.unsubscribe(_GAZE_KEY)
 
-    assert _dotoolc_proc is not None
-    assert _dotoolc_proc.stdin is not None
-    try:
-        _dotoolc_proc.stdin.write(f"{line}\n")
-        _dotoolc_proc.stdin.flush()
-    except Exception as exc:
-        print(f"control1_pointer_forwarder write error: {exc}")
-        _close_dotoolc_proc()
 
+def _forward_relative(relative: RelativePointer) -> None:
+    global _last_delta
+    deltas = eye_mouse.mouse.delta_hist
+    # A gaze event without a new delta must not repeat the last move.
+    if not deltas or deltas[-1] is _last_delta:
+        _gaze_unchanged.inc()
+        return
+    delta = _last_delta = deltas[-1]
+    dx, dy = relative.step(delta.x, delta.y)
+    if not dx and not dy:
+        _gaze_unchanged.inc()
+        return
+    SHADOW_CURSOR.moved_by(dx, dy)
+    # Unwritten relative moves are summed, never dropped.
+    _motion.submit(mousemove_line(dx, dy), merge_mousemove, _gaze_ts())
 
-def _clear_gaze_subscriptions() -> None:
-    for _ in range(16):
-        tracking_system.unregister("gaze", _on_gaze)
 
+def _configure_connection() -> None:
+    # Before any connect, so the first dotoolc already uses these settings.
+    _connection.idle_timeout = settings.get("user.control1_pointer_forwarder_idle_timeout")
+    _connection.set_pipe(settings.get("user.dotool_motion_pipe") or None)
 
-def _register_gaze() -> None:
-    _clear_gaze_subscriptions()
-    tracking_system.register("gaze", _on_gaze)
 
+def _configure_detector() -> None:
+    # Thresholds are the control1_fixation_* settings the dwell clicker uses.
+    _detector.configure(
+        velocity_threshold=settings.get("user.control1_fixation_velocity_threshold"),
+        dispersion_threshold=settings.get("user.control1_fixation_dispersion_threshold"),
+        window=settings.get("user.control1_fixation_window"),
+    )
+    _detector.reset()
 
-def _unregister_gaze() -> None:
-    _clear_gaze_subscriptions()
+
+def _is_saccade(point) -> bool:
+    eye_hist = eye_mouse.mouse.eye_hist
+    # Velocity needs the tracker's timestamp; forward samples without one.
+    if not eye_hist:
+        return False
+    return _detector.update(eye_hist[-1].ts, point.x, point.y) == SACCADE
 
 
+@CALLBACK_PROFILER.profile(__name__)
 def _on_gaze(*_args) -> None:
+    # Keep dotoolc alive across control1 toggles; the idle timeout closes it.
     if not actions.tracking.control1_enabled():
-        _close_dotoolc_proc()
+        return
+
+    relative = _relative
+    if relative is not None:
+        _gaze_received.inc()
+        _forward_relative(relative)
         return
 
     hist = eye_mouse.mouse.xy_hist
@@ -134,10 +170,19 @@ def _on_gaze(*_args) -> None:
         return
 
     point = hist[-1]
-    x, y = normalize_point(_desktop_bounds, point.x, point.y)
-    _send_dotool_line(f"mouseto {x:.6f} {y:.6f}")
+    _gaze_received.inc()
+    if _suppress_saccades and _is_saccade(point):
+        _gaze_saccades.inc()
+        return
+    # Fixations repeat the same quantized position; skip those writes.
+    line = SHADOW_CURSOR.move_to(_desktop_bounds, point.x, point.y, skip_unchanged=True)
+    if line is None:
+        _gaze_unchanged.inc()
+        return
+    _send_dotool_line(line)
 
 
+@CALLBACK_PROFILER.profile(__name__)
 def _on_screen_change(_screens) -> None:
     _refresh_desktop_bounds()
 
@@ -147,10 +192,25 @@ class Actions:
     @staticmethod
     def control1_pointer_forwarder_start() -> None:
         """Start control1 pointer forwarding through dotool mouseto."""
+        global _suppress_saccades, _relative, _last_delta
+        _suppress_saccades = settings.get(
+            "user.control1_pointer_forwarder_suppress_saccades"
+        )
+        _configure_detector()
+        _motion.discard()
+        _relative = None
+        _last_delta = None
+        if settings.get("user.control1_pointer_forwarder_mode") == "relative":
+            _relative = RelativePointer(
+                settings.get("user.control1_pointer_forwarder_relative_gain"),
+                settings.get("user.control1_pointer_forwarder_relative_acceleration"),
+            )
+        _configure_connection()
         _refresh_desktop_bounds()
         _register_gaze()
         print(
             "control1_pointer_forwarder started "
+            f"mode={'absolute' if _relative is None else 'relative'} "
             f"enabled={actions.tracking.control1_enabled()}"
         )
 
@@ -158,8 +218,9 @@ class Actions:
     def control1_pointer_forwarder_stop() -> None:
         """Stop control1 pointer forwarding."""
         _unregister_gaze()
-        _close_dotoolc_proc()
-        print("control1_pointer_forwarder stopped")
+        _motion.discard()
+        _connection.close()
+        print(f"control1_pointer_forwarder stopped {_motion.status()}")
 
     @staticmethod
     def control1_pointer_forwarder_toggle(state: bool | None = None) -> None:
@@ -171,10 +232,12 @@ class Actions:
         actions.user.control1_pointer_forwarder_start()
 
 
+@CALLBACK_PROFILER.profile(__name__)
 def _on_ready() -> None:
-    ui.register("screen_change", _on_screen_change)
     _refresh_desktop_bounds()
     if settings.get("user.control1_pointer_forwarder_autostart"):
+        _configure_connection()
+        _connection.warm_up()
         actions.user.control1_pointer_forwarder_start()
         if settings.get("user.control1_pointer_forwarder_autostart_log"):
             print(
@@ -184,4 +247,11 @@ def _on_ready() -> None:
         return
 
 
-app.register("ready", _on_ready)
+resource_registry.subscribe(
+    "control1_pointer_forwarder.screen_change", ui, "screen_change", _on_screen_change
+)
+# A previous load of this file was forwarding: stop its callback and
+# restart forwarding with this load's code.
+if resource_registry.unsubscribe(_GAZE_KEY):
+    cron.after("0ms", actions.user.control1_pointer_forwarder_start)
+app.register("ready", STARTUP_PROFILER.profile_ready(__name__, _on_ready))
@@ -1,6 +1,7 @@
 from talon import Context, Module, actions, app
 from talon.plugins import eye_mouse_2
 
+from ..shared.instrumentation import CALLBACK_PROFILER, STARTUP_PROFILER
 from ..shared.pure_utils import should_emit_state_change
 
 ctx = Context()
@@ -47,6 +48,7 @@ def _install_menu_hook() -> bool:
 
 
 @ctx.action_class("tracking")
+@CALLBACK_PROFILER.profile_actions(__name__)
 class TrackingActions:
     @staticmethod
     def control1_toggle(state=None) -> None:
@@ -101,8 +103,9 @@ class Actions:
         _emit_control1_state(actions.tracking.control1_enabled())
 
 
+@CALLBACK_PROFILER.profile(__name__)
 def _on_ready() -> None:
     _install_menu_hook()
 
 
-app.register("ready", _on_ready)
+app.register("ready", STARTUP_PROFILER.profile_ready(__name__, _on_ready))
@@ -0,0 +1,140 @@
+"""Local fake sway and niri IPC servers for compositor client tests.
+
+Each server listens on a Unix socket in a temporary directory, answers the
+queries the client makes from canned state and pushes events on demand to
+every subscribed connection.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import struct
+import tempfile
+import threading
+
+I3_HEADER = struct.Struct("=6sII")
+
+
+class _FakeServer:
+    def __init__(self, name: str) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, f"{name}.sock")
+        self.connections = 0
+        self._subscribers: list[socket.socket] = []
+        self._lock = threading.Lock()
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(self.path)
+        self._listener.listen()
+        threading.Thread(target=self._accept, name=f"fake-{name}", daemon=True).start()
+
+    def subscribers(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def drop_subscribers(self) -> None:
+        """Close every event connection, as if the compositor restarted."""
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        for conn in subscribers:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+
+    def close(self) -> None:
+        self.drop_subscribers()
+        self._listener.close()
+        self._tmp.cleanup()
+
+    def _subscribe(self, conn: socket.socket) -> None:
+        with self._lock:
+            self._subscribers.append(conn)
+
+    def _broadcast(self, data: bytes) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for conn in subscribers:
+            try:
+                conn.sendall(data)
+            except OSError:
+                pass
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                conn, _addr = self._listener.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._serve_quietly, args=(conn,), daemon=True).start()
+
+    def _serve_quietly(self, conn: socket.socket) -> None:
+        try:
+            self._serve(conn)
+        except (OSError, ValueError):
+            pass
+
+    def _serve(self, conn: socket.socket) -> None:
+        raise NotImplementedError
+
+
+class FakeSway(_FakeServer):
+    """i3-ipc server answering SUBSCRIBE, GET_TREE and GET_OUTPUTS."""
+
+    def __init__(self, tree: dict, outputs: list) -> None:
+        self.tree = tree
+        self.outputs = outputs
+        super().__init__("sway")
+
+    def push(self, event_type: int, payload: dict) -> None:
+        self._broadcast(self._message(event_type, payload))
+
+    @staticmethod
+    def _message(message_type: int, payload) -> bytes:
+        data = json.dumps(payload).encode("utf-8")
+        return I3_HEADER.pack(b"i3-ipc", len(data), message_type) + data
+
+    def _serve(self, conn: socket.socket) -> None:
+        stream = conn.makefile("rb")
+        while True:
+            header = stream.read(I3_HEADER.size)
+            if len(header) < I3_HEADER.size:
+                return
+            _magic, length, message_type = I3_HEADER.unpack(header)
+            stream.read(length)
+            if message_type == 2:
+                conn.sendall(self._message(2, {"success": True}))
+                self._subscribe(conn)
+            elif message_type == 3:
+                conn.sendall(self._message(3, self.outputs))
+            elif message_type == 4:
+                conn.sendall(self._message(4, self.tree))
+
+
+class FakeNiri(_FakeServer):
+    """niri server answering "EventStream" and "Outputs" requests."""
+
+    def __init__(self, windows: list, outputs: dict) -> None:
+        self.windows = windows
+        self.outputs = outputs
+        self.output_requests = 0
+        super().__init__("niri")
+
+    def push(self, event: dict) -> None:
+        self._broadcast(json.dumps(event).encode("utf-8") + b"\n")
+
+    def _serve(self, conn: socket.socket) -> None:
+        request = json.loads(conn.makefile("rb").readline())
+        if request == "Outputs":
+            self.output_requests += 1
+            conn.sendall(json.dumps({"Ok": {"Outputs": self.outputs}}).encode("utf-8") + b"\n")
+            conn.close()
+        elif request == "EventStream":
+            conn.sendall(b'{"Ok":"Handled"}\n')
+            conn.sendall(
+                json.dumps({"WindowsChanged": {"windows": self.windows}}).encode("utf-8") + b"\n"
+            )
+            self._subscribe(conn)
@@ -0,0 +1,767 @@
+"""Headless stand-in for the talon package, used to load the real plugins.
+
+TalonStub installs fresh talon, talon.canvas and talon.plugins.* modules in
+sys.modules and imports the plugin files as the plugins.* namespace package.
+Tests can then fire ready, speak phrases, change screens, toggle control1
+and drive synthetic gaze streams through the registered callbacks. dotoolc processes
+are replaced by a RecordingTransport and a FIFO reader plays dotoold for the
+health probe, so throughput, latency and reconnects can be load-tested
+without Talon, dotool or a compositor.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextlib
+import importlib
+import io
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from collections import deque
+from pathlib import Path
+from typing import Callable, Iterable
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+DEFAULT_PLUGINS = (
+    "plugins.dotool_session",
+    "plugins.startup_profiler",
+    "plugins.callback_profiler",
+    "plugins.metrics_endpoint",
+    "plugins.control_socket",
+    "plugins.log_control",
+    "plugins.compositor_ipc",
+    "plugins.key_forwarder.forwarder",
+    "plugins.mouse_forwarder",
+    "plugins.hiss_mouse",
+    "plugins.tracking_forwarder.control1_state_events",
+    "plugins.tracking_forwarder.control1_debug_overlay",
+    "plugins.tracking_forwarder.control1_dwell_click",
+    "plugins.tracking_forwarder.control1_gaze_logger",
+    "plugins.tracking_forwarder.control1_pointer_forwarder",
+)
+
+# Settings the plugins read but that community (not this repo) declares.
+COMMUNITY_SETTINGS = {
+    "user.mouse_wheel_down_amount": 120,
+    "user.mouse_wheel_horizontal_amount": 40,
+}
+
+ACTION_NAMESPACES = ("app", "code", "core", "edit", "speech", "tracking", "user")
+
+HISTORY_LENGTH = 256
+
+Rect = tuple[float, float, float, float]
+GazePath = Callable[[float], tuple[float, float]]
+
+
+class Point2d:
+    def __init__(self, x: float, y: float) -> None:
+        self.x = x
+        self.y = y
+
+
+class EyeFrame:
+    def __init__(self, ts: float, gaze: Point2d) -> None:
+        self.ts = ts
+        self.gaze = gaze
+
+
+class StubRect:
+    def __init__(self, x: float, y: float, width: float, height: float) -> None:
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+
+class StubScreen:
+    def __init__(self, rect: Rect) -> None:
+        self.rect = StubRect(*rect)
+
+
+class StubCanvas:
+    """Canvas that counts redraw requests instead of drawing."""
+
+    def __init__(self, screen: StubScreen) -> None:
+        self.screen = screen
+        self.callbacks: dict[str, list[Callable]] = {}
+        self.freezes = 0
+        self.closed = False
+
+    def register(self, topic: str, callback: Callable) -> None:
+        self.callbacks.setdefault(topic, []).append(callback)
+
+    def unregister(self, topic: str, callback: Callable) -> None:
+        if callback in self.callbacks.get(topic, []):
+            self.callbacks[topic].remove(callback)
+
+    def freeze(self) -> None:
+        self.freezes += 1
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class StubMenuItem:
+    def __init__(self, callback: Callable) -> None:
+        self.attrs = {"cb": callback}
+
+    def click(self):
+        return self.attrs["cb"](self)
+
+
+class _RecordingStdin:
+    def __init__(self, process: RecordingProcess) -> None:
+        self._process = process
+        self._buffer = ""
+        self.closed = False
+
+    def write(self, text: str) -> int:
+        if self.closed or self._process.returncode is not None:
+            raise BrokenPipeError("dotoolc exited")
+        self._process.transport.writes += 1
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            self._process.transport.record(self._process, line)
+        return len(text)
+
+    def flush(self) -> None:
+        if self.closed or self._process.returncode is not None:
+            raise BrokenPipeError("dotoolc exited")
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class RecordingProcess:
+    """Popen-like dotoolc stand-in whose stdin lines go to a RecordingTransport."""
+
+    def __init__(self, transport: RecordingTransport, command: list[str]) -> None:
+        self.transport = transport
+        self.command = list(command)
+        self.returncode: int | None = None
+        self.stdin = _RecordingStdin(self)
+
+    def poll(self) -> int | None:
+        return self.returncode
+
+    def terminate(self) -> None:
+        if self.returncode is None:
+            self.returncode = -15
+
+    def kill(self) -> None:
+        if self.returncode is None:
+            self.returncode = -9
+
+    def wait(self, timeout: float | None = None) -> int | None:
+        return self.returncode
+
+
+class RecordingTransport:
+    """DotoolConnection process factory that records every line in memory.
+
+    Each record is (perf_counter, process, line), in write order across all
+    connections; `writes` counts stdin write() calls.
+    """
+
+    def __init__(self) -> None:
+        self.records: list[tuple[float, RecordingProcess, str]] = []
+        self.writes = 0
+        self.processes: list[RecordingProcess] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, command: list[str]) -> RecordingProcess:
+        process = RecordingProcess(self, command)
+        with self._lock:
+            self.processes.append(process)
+        return process
+
+    def record(self, process: RecordingProcess, line: str) -> None:
+        with self._lock:
+            self.records.append((time.perf_counter(), process, line))
+
+    def lines(self, prefix: str | tuple[str, ...] = "") -> list[str]:
+        """Return recorded lines starting with prefix, in write order."""
+        with self._lock:
+            return [line for _ts, _proc, line in self.records if line.startswith(prefix)]
+
+    def timed_lines(self, prefix: str | tuple[str, ...] = "") -> list[tuple[float, str]]:
+        """Return (perf_counter, line) pairs starting with prefix."""
+        with self._lock:
+            return [
+                (ts, line) for ts, _proc, line in self.records if line.startswith(prefix)
+            ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.records.clear()
+            self.writes = 0
+
+    def wait_for_lines(
+        self, prefix: str, count: int, timeout: float = 2.0
+    ) -> list[str]:
+        """Wait until at least count lines start with prefix and return them."""
+        wait_until(lambda: len(self.lines(prefix)) >= count, timeout)
+        return self.lines(prefix)
+
+    def kill_all(self) -> None:
+        """Kill every live process, as dotoolc exits when dotoold goes away."""
+        with self._lock:
+            processes = list(self.processes)
+        for process in processes:
+            process.kill()
+
+
+class FakeDotoold:
+    """Hold the read end of a FIFO open so dotoold_listening() succeeds."""
+
+    def __init__(self, pipe_path: str) -> None:
+        self.pipe_path = pipe_path
+        self._fd: int | None = None
+        os.mkfifo(pipe_path)
+
+    @property
+    def running(self) -> bool:
+        return self._fd is not None
+
+    def start(self) -> None:
+        if self._fd is None:
+            self._fd = os.open(self.pipe_path, os.O_RDONLY | os.O_NONBLOCK)
+
+    def stop(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class ActionRegistry:
+    """Talon-style action stacks: declaration or native default, then overrides.
+
+    actions.next() calls the next lower implementation of the action that is
+    currently running on this thread. Actions with no implementation left are
+    recorded in `native_calls`, standing in for Talon's own behaviour.
+    """
+
+    def __init__(self) -> None:
+        self._bases: dict[str, Callable] = {}
+        self._overrides: dict[str, list[Callable]] = {}
+        self._local = threading.local()
+        self.native_calls: list[tuple[str, tuple]] = []
+
+    def declare(self, name: str, func: Callable) -> None:
+        self._bases[name] = func
+
+    def override(self, name: str, func: Callable) -> None:
+        self._overrides.setdefault(name, []).append(func)
+
+    def call(self, name: str, *args, **kwargs):
+        impls = self._impls(name)
+        return self._invoke(name, impls, len(impls) - 1, args, kwargs)
+
+    def call_next(self, *args, **kwargs):
+        stack = self._stack()
+        if not stack:
+            raise RuntimeError("actions.next() called outside an action")
+        name, index = stack[-1]
+        return self._invoke(name, self._impls(name), index - 1, args, kwargs)
+
+    def _impls(self, name: str) -> list[Callable]:
+        base = self._bases.get(name)
+        return ([] if base is None else [base]) + self._overrides.get(name, [])
+
+    def _invoke(self, name, impls, index, args, kwargs):
+        if index < 0:
+            self.native_calls.append((name, args))
+            return None
+        stack = self._stack()
+        stack.append((name, index))
+        try:
+            return impls[index](*args, **kwargs)
+        finally:
+            stack.pop()
+
+    def _stack(self) -> list[tuple[str, int]]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+
+class _ActionNamespace:
+    def __init__(self, registry: ActionRegistry, prefix: str) -> None:
+        self._registry = registry
+        self._prefix = prefix
+
+    def __getattr__(self, name: str):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        if not self._prefix:
+            if name == "next":
+                return self._registry.call_next
+            if name in ACTION_NAMESPACES:
+                return _ActionNamespace(self._registry, f"{name}.")
+        full_name = f"{self._prefix}{name}"
+
+        def _action(*args, **kwargs):
+            return self._registry.call(full_name, *args, **kwargs)
+
+        return _action
+
+
+def _class_functions(cls) -> Iterable[tuple[str, Callable]]:
+    for name, value in vars(cls).items():
+        if isinstance(value, staticmethod):
+            yield name, value.__func__
+        elif callable(value) and not name.startswith("__"):
+            yield name, value
+
+
+class TalonStub:
+    """A headless Talon runtime hosting the real plugin modules."""
+
+    def __init__(
+        self,
+        settings: dict | None = None,
+        screens: list[Rect] | None = None,
+        environ: dict[str, str] | None = None,
+    ) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.registry = ActionRegistry()
+        self.actions = _ActionNamespace(self.registry, "")
+        self.setting_defaults: dict[str, object] = dict(COMMUNITY_SETTINGS)
+        self.setting_values: dict[str, object] = dict(settings or {})
+        self.scope_values: dict[str, object] = {}
+        self.environ = dict(environ or {})
+        self.screens = [StubScreen(rect) for rect in screens or [(0, 0, 1920, 1080)]]
+        self.callbacks: dict[tuple[str, str], list[Callable]] = {}
+        self.canvases: list[StubCanvas] = []
+        self.control1_enabled = False
+        self.ready_fired = False
+        self.modules: dict[str, types.ModuleType] = {}
+        self.transport = RecordingTransport()
+        self.dotoold = FakeDotoold(os.path.join(self._tmp.name, "dotool-pipe"))
+        self.dotoold.start()
+        self.eye_mouse = types.SimpleNamespace(
+            xy_hist=deque(maxlen=HISTORY_LENGTH),
+            eye_hist=deque(maxlen=HISTORY_LENGTH),
+            delta_hist=deque(maxlen=HISTORY_LENGTH),
+        )
+        self.control1_menu_item = StubMenuItem(self._toggle_control1_from_menu)
+        self._cron_jobs: list[Callable] = []
+        self._cron_lock = threading.Lock()
+        self._saved_env: dict[str, str | None] = {}
+        self._declare_native_actions()
+
+    # -- lifecycle -------------------------------------------------------
+
+    def load_plugins(self, names: Iterable[str] = DEFAULT_PLUGINS) -> dict:
+        """Install the fake talon package and import plugin modules."""
+        _purge_modules()
+        self._set_env("WAYLAND_DISPLAY", "wayland-stub")
+        self._set_env("DOTOOL_PIPE", self.dotoold.pipe_path)
+        for key in ("SWAYSOCK", "NIRI_SOCKET"):
+            self._set_env(key, self.environ.get(key))
+        for name, module in self._talon_modules().items():
+            sys.modules[name] = module
+
+        sys.path.insert(0, str(REPO_ROOT))
+        try:
+            dotool_connection = importlib.import_module("plugins.shared.dotool_connection")
+            dotool_connection.set_process_factory(self.transport)
+            self.modules["plugins.shared.dotool_connection"] = dotool_connection
+            for name in names:
+                self.modules[name] = importlib.import_module(name)
+        finally:
+            sys.path.remove(str(REPO_ROOT))
+        return self.modules
+
+    def close(self) -> None:
+        """Close connections, restore the environment and drop loaded modules."""
+        resource_registry = sys.modules.get("plugins.shared.resource_registry")
+        if resource_registry is not None:
+            resource_registry.release_all()
+        dotool_connection = self.modules.get("plugins.shared.dotool_connection")
+        if dotool_connection is not None:
+            live = dotool_connection.connections()
+            for connection in live:
+                connection.close()
+            # A reconnect loop left running would spawn the real dotoolc
+            # once the stub's process factory is gone.
+            wait_until(lambda: not any(c.reconnecting() for c in live))
+            dotool_connection.set_process_factory(None)
+        for module in self.modules.values():
+            for value in vars(module).values():
+                if callable(value):
+                    atexit.unregister(value)
+        self.dotoold.stop()
+        for key, value in self._saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        self._saved_env.clear()
+        _purge_modules()
+        self.modules.clear()
+        self._tmp.cleanup()
+
+    def __enter__(self) -> TalonStub:
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def module(self, name: str) -> types.ModuleType:
+        """Return a loaded module, including shared modules the plugins import."""
+        return sys.modules[name]
+
+    # -- simulated Talon events ------------------------------------------
+
+    def fire_ready(self) -> None:
+        self.ready_fired = True
+        self._dispatch("app", "ready")
+
+    def set_screens(self, rects: list[Rect]) -> None:
+        """Replace the screen layout and fire screen_change."""
+        self.screens = [StubScreen(rect) for rect in rects]
+        self._dispatch("ui", "screen_change", list(self.screens))
+
+    def set_control1(self, enabled: bool) -> None:
+        """Toggle control1 through the tracking.control1_toggle action stack."""
+        self.actions.tracking.control1_toggle(enabled)
+
+    def click_control1_menu(self) -> None:
+        """Toggle control1 through the eye_mouse_2 menu item callback."""
+        self.control1_menu_item.click()
+
+    def speak(self, command: Callable[[], object], phrase: str = "") -> None:
+        """Run a command's actions between pre:phrase and post:phrase."""
+        event = {"phrase": phrase.split()}
+        self._dispatch("speech", "pre:phrase", event)
+        try:
+            command()
+        finally:
+            self._dispatch("speech", "post:phrase", event)
+
+    def run_cron(self) -> int:
+        """Run cron.after callbacks queued so far, as Talon's main thread would."""
+        with self._cron_lock:
+            jobs, self._cron_jobs = self._cron_jobs, []
+        for job in jobs:
+            job()
+        return len(jobs)
+
+    def touch_file(self, path: str) -> None:
+        """Fire fs.watch callbacks for every watched directory holding path."""
+        for (scope, watched), callbacks in list(self.callbacks.items()):
+            if scope == "fs" and os.path.commonpath([watched, path]) == watched:
+                for callback in list(callbacks):
+                    callback(path, types.SimpleNamespace(exists=os.path.exists(path)))
+
+    def set_setting(self, name: str, value) -> None:
+        self.setting_values[name] = value
+
+    def gaze_callback_count(self) -> int:
+        return len(self.callbacks.get(("tracking", "gaze"), []))
+
+    def emit_gaze(self, x: float, y: float, ts: float | None = None) -> None:
+        """Append one gaze sample to eye_mouse history and fire gaze callbacks."""
+        ts = time.perf_counter() if ts is None else ts
+        mouse = self.eye_mouse
+        if mouse.xy_hist:
+            last = mouse.xy_hist[-1]
+            mouse.delta_hist.append(Point2d(x - last.x, y - last.y))
+        mouse.xy_hist.append(Point2d(x, y))
+        left, top, width, height = _desktop_rect(self.screens)
+        gaze = Point2d((x - left) / width, (y - top) / height)
+        frame = EyeFrame(ts, gaze)
+        mouse.eye_hist.append(frame)
+        self._dispatch("tracking", "gaze", frame)
+
+    def drive_gaze(
+        self,
+        rate_hz: float,
+        duration: float,
+        path: GazePath | None = None,
+        realtime: bool = False,
+    ) -> list[tuple[float, float, float]]:
+        """Emit a synthetic gaze stream and return (emit time, x, y) per sample.
+
+        Args:
+            rate_hz: Samples per second, e.g. 30 to 500.
+            duration: Stream length in seconds.
+            path: Maps seconds since start to desktop (x, y); defaults to a
+                slow circle with a saccade every half second.
+            realtime: Pace samples at rate_hz instead of as fast as possible.
+
+        Returns:
+            perf_counter taken just before each sample was emitted, with
+            the sample's desktop position.
+        """
+        path = path or self._default_gaze_path()
+        count = max(1, int(round(rate_hz * duration)))
+        interval = 1.0 / rate_hz
+        started = time.perf_counter()
+        emitted = []
+        for index in range(count):
+            offset = index * interval
+            if realtime:
+                delay = started + offset - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            x, y = path(offset)
+            now = time.perf_counter()
+            emitted.append((now, x, y))
+            self.emit_gaze(x, y, ts=now if realtime else started + offset)
+        return emitted
+
+    def stop_dotoold(self) -> None:
+        """Stop the fake daemon; live dotoolc processes exit with it."""
+        self.dotoold.stop()
+        self.transport.kill_all()
+
+    def start_dotoold(self) -> None:
+        self.dotoold.start()
+
+    # -- internals -------------------------------------------------------
+
+    def _default_gaze_path(self) -> GazePath:
+        left, top, width, height = _desktop_rect(self.screens)
+        cx, cy = left + width / 2.0, top + height / 2.0
+        radius = min(width, height) / 4.0
+
+        def _path(t: float) -> tuple[float, float]:
+            jump = radius if int(t * 2.0) % 2 else 0.0
+            angle = t * math.pi
+            return cx + jump + radius * math.cos(angle) * 0.1, cy + radius * math.sin(angle) * 0.1
+
+        return _path
+
+    def _set_env(self, key: str, value: str | None) -> None:
+        if key not in self._saved_env:
+            self._saved_env[key] = os.environ.get(key)
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+
+    def _register(self, scope: str, topic: str, callback: Callable) -> None:
+        self.callbacks.setdefault((scope, topic), []).append(callback)
+        if scope == "app" and topic == "ready" and self.ready_fired:
+            callback()
+
+    def _unregister(self, scope: str, topic: str, callback: Callable) -> None:
+        callbacks = self.callbacks.get((scope, topic), [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def _dispatch(self, scope: str, topic: str, *args) -> None:
+        for callback in list(self.callbacks.get((scope, topic), [])):
+            callback(*args)
+
+    def _get_setting(self, name: str, default=None):
+        if name in self.setting_values:
+            return self.setting_values[name]
+        if name in self.setting_defaults:
+            return self.setting_defaults[name]
+        if default is not None:
+            return default
+        raise KeyError(f"undeclared setting: {name}")
+
+    def _declare_native_actions(self) -> None:
+        registry = self.registry
+
+        def control1_enabled() -> bool:
+            return self.control1_enabled
+
+        def control1_toggle(state=None) -> None:
+            registry.native_calls.append(("tracking.control1_toggle", (state,)))
+            self.control1_enabled = (not self.control1_enabled) if state is None else bool(state)
+
+        registry.declare("tracking.control1_enabled", control1_enabled)
+        registry.declare("tracking.control1_toggle", control1_toggle)
+
+    def _schedule(self, callback: Callable) -> Callable:
+        with self._cron_lock:
+            self._cron_jobs.append(callback)
+        return callback
+
+    def _toggle_control1_from_menu(self, _item) -> None:
+        self.control1_enabled = not self.control1_enabled
+
+    def _talon_modules(self) -> dict[str, types.ModuleType]:
+        runtime = self
+
+        class Module:
+            def setting(self, name, type=None, default=None, desc=""):
+                runtime.setting_defaults[f"user.{name}"] = default
+
+            def tag(self, name, desc=""):
+                return None
+
+            def list(self, name, desc=""):
+                return None
+
+            def mode(self, name, desc=""):
+                return None
+
+            def scope(self, func):
+                func.update = lambda: runtime.scope_values.update(func())
+                return func
+
+            def action_class(self, cls):
+                for name, func in _class_functions(cls):
+                    runtime.registry.declare(f"user.{name}", func)
+                return cls
+
+        class Context:
+            def __init__(self) -> None:
+                self.matches = ""
+                self.tags = []
+                self.lists = {}
+                self.settings = {}
+
+            def action_class(self, namespace: str):
+                prefix = "" if namespace == "main" else f"{namespace}."
+
+                def _decorator(cls):
+                    for name, func in _class_functions(cls):
+                        runtime.registry.override(f"{prefix}{name}", func)
+                    return cls
+
+                return _decorator
+
+        def _registrar(scope: str):
+            return types.SimpleNamespace(
+                register=lambda topic, cb: runtime._register(scope, topic, cb),
+                unregister=lambda topic, cb: runtime._unregister(scope, topic, cb),
+            )
+
+        talon = types.ModuleType("talon")
+        talon.__path__ = []
+        talon.Module = Module
+        talon.Context = Context
+        talon.actions = self.actions
+        talon.settings = types.SimpleNamespace(get=self._get_setting)
+        talon.app = _registrar("app")
+        talon.app.platform = "linux"
+        talon.fs = types.SimpleNamespace(
+            watch=lambda path, cb: runtime._register("fs", path, cb),
+            unwatch=lambda path, cb: runtime._unregister("fs", path, cb),
+        )
+        talon.speech_system = _registrar("speech")
+        talon.cron = types.SimpleNamespace(
+            after=lambda _spec, cb: runtime._schedule(cb),
+            cancel=lambda _job: None,
+        )
+        talon.tracking_system = _registrar("tracking")
+        talon.ui = _registrar("ui")
+        talon.ui.screens = lambda: list(runtime.screens)
+        talon.ui.main_screen = lambda: runtime.screens[0]
+
+        canvas = types.ModuleType("talon.canvas")
+
+        class Canvas(StubCanvas):
+            @classmethod
+            def from_screen(cls, screen):
+                created = cls(screen)
+                runtime.canvases.append(created)
+                return created
+
+        canvas.Canvas = Canvas
+        talon.canvas = canvas
+
+        plugins = types.ModuleType("talon.plugins")
+        plugins.__path__ = []
+        eye_mouse = types.ModuleType("talon.plugins.eye_mouse")
+        eye_mouse.mouse = self.eye_mouse
+        eye_mouse_2 = types.ModuleType("talon.plugins.eye_mouse_2")
+        eye_mouse_2.control1_item = self.control1_menu_item
+        plugins.eye_mouse = eye_mouse
+        plugins.eye_mouse_2 = eye_mouse_2
+        talon.plugins = plugins
+
+        return {
+            "talon": talon,
+            "talon.canvas": canvas,
+            "talon.plugins": plugins,
+            "talon.plugins.eye_mouse": eye_mouse,
+            "talon.plugins.eye_mouse_2": eye_mouse_2,
+        }
+
+
+def _desktop_rect(screens: list[StubScreen]) -> Rect:
+    left = min(screen.rect.x for screen in screens)
+    top = min(screen.rect.y for screen in screens)
+    right = max(screen.rect.x + screen.rect.width for screen in screens)
+    bottom = max(screen.rect.y + screen.rect.height for screen in screens)
+    return left, top, right - left, bottom - top
+
+
+def _purge_modules() -> None:
+    for name in list(sys.modules):
+        if name in ("talon", "plugins", "talon_lite_resources") or name.startswith(
+            ("talon.", "plugins.")
+        ):
+            del sys.modules[name]
+
+
+def wait_until(predicate: Callable[[], bool], timeout: float = 2.0) -> bool:
+    """Poll predicate until it is true or timeout seconds pass."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+class StubPluginTestCase(unittest.TestCase):
+    """Loads every plugin into a TalonStub and fires ready before each test.
+
+    The key forwarder is enabled and precompiles a temporary talon_dir
+    holding one tabs.talon file, so feature tests can drive keys without
+    scanning the real Talon user directory.
+    """
+
+    screen: Rect = (0, 0, 1000, 1000)
+    settings: dict = {}
+
+    def setUp(self):
+        self._talon_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._talon_dir.cleanup)
+        self.talon_dir = Path(self._talon_dir.name)
+        self.talon_file = self.talon_dir / "tabs.talon"
+        self.talon_file.write_text("tab close: key(ctrl-w)\n")
+        self.talon = TalonStub(
+            settings={
+                "user.key_forwarder_enabled": True,
+                "user.key_forwarder_precompile_root": self._talon_dir.name,
+                "user.dotool_timing_profile": "low-latency",
+                "user.key_forwarder_paste_threshold": 0,
+                **self.settings,
+            },
+            screens=[self.screen],
+        )
+        self.addCleanup(self.talon.close)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.talon.load_plugins()
+            self.talon.fire_ready()
+
+    def start_pointer_forwarder(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.talon.set_control1(True)
+            self.talon.actions.user.control1_pointer_forwarder_start()
+
+    def pointer_forwarder(self) -> types.ModuleType:
+        return self.talon.module("plugins.tracking_forwarder.control1_pointer_forwarder")
+
+    def motion_idle(self) -> bool:
+        return self.pointer_forwarder()._motion.idle()
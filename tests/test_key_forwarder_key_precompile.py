@@ -0,0 +1,145 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from talon_stub import StubPluginTestCase, wait_until  # noqa: E402
+
+
+class KeyPrecompileTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from key_forwarder import dotool_translate, key_precompile
+
+            cls.translate = dotool_translate
+            cls.precompile = key_precompile
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.compiler = self.precompile.KeyPrecompiler()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, name, text, mtime=None):
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+        if mtime is not None:
+            os.utime(path, ns=(mtime, mtime))
+        return path
+
+    def test_extracts_literal_specs_only(self):
+        source = "\n".join(
+            [
+                "tab close: key(ctrl-w)",
+                "tab reopen: key( ctrl-shift-t )",
+                "go tab <number>: key('alt-{number}')",
+                "quoted: key(\"alt-9\")",
+                "# comment: key(ctrl-q)",
+                "other: user.mouse_key(a)",
+                "empty: key()",
+                "two:",
+                "    key(ctrl-l)",
+                "    insert('x') key(alt-enter)",
+            ]
+        )
+
+        self.assertEqual(
+            self.precompile.extract_key_specs(source),
+            {"ctrl-w", "ctrl-shift-t", "alt-9", "ctrl-l", "alt-enter"},
+        )
+
+    def test_scan_translates_specs_into_the_table(self):
+        self._write("core/tabs.talon", "tab close: key(ctrl-w)\n")
+
+        self.assertEqual(self.compiler.scan([str(self.root)]), 1)
+        self.assertEqual(self.compiler.lookup("ctrl-w"), ("key ctrl+w",))
+        self.assertIsNone(self.compiler.lookup("alt-3"))
+        with self.assertRaises(TypeError):
+            self.compiler.table["x"] = ()
+
+    def test_rescan_recompiles_only_changed_files(self):
+        self._write("a.talon", "a: key(ctrl-a)\n", mtime=1_000_000_000)
+        self._write("b.talon", "b: key(ctrl-b)\n", mtime=1_000_000_000)
+        self._write(".hidden/c.talon", "c: key(ctrl-c)\n")
+        self.assertEqual(self.compiler.scan([str(self.root)]), 2)
+        self.assertEqual(self.compiler.scan([str(self.root)]), 0)
+
+        self._write("a.talon", "a: key(ctrl-z)\n", mtime=2_000_000_000)
+        self.assertEqual(self.compiler.scan([str(self.root)]), 1)
+        self.assertIsNone(self.compiler.lookup("ctrl-a"))
+        self.assertEqual(self.compiler.lookup("ctrl-z"), ("key ctrl+z",))
+        self.assertIsNone(self.compiler.lookup("ctrl-c"))
+
+        (self.root / "b.talon").unlink()
+        self.assertEqual(self.compiler.scan([str(self.root)]), 0)
+        self.assertIsNone(self.compiler.lookup("ctrl-b"))
+
+    def test_new_keycode_table_recompiles_every_file(self):
+        self.addCleanup(self.translate.set_keycode_table, None)
+        self._write("a.talon", "a: key(ctrl-w)\n", mtime=1_000_000_000)
+        self.compiler.scan([str(self.root)])
+
+        self.translate.set_keycode_table({"w": (17, 0)})
+        self.assertIsNone(self.compiler.lookup("ctrl-w"))
+        self.assertEqual(self.compiler.scan([str(self.root)]), 1)
+        self.assertEqual(self.compiler.lookup("ctrl-w"), ("key ctrl+k:17",))
+
+    def test_untranslatable_specs_are_skipped(self):
+        def translate(spec):
+            if spec == "bad":
+                raise ValueError(spec)
+            return [f"key {spec}"]
+
+        compiler = self.precompile.KeyPrecompiler(translate)
+        self._write("a.talon", "a: key(bad)\nb: key(good)\n")
+        compiler.scan([str(self.root)])
+
+        self.assertEqual(dict(compiler.table), {"good": ("key good",)})
+
+
+class KeyPrecompilePluginTests(StubPluginTestCase):
+    def test_literal_key_specs_are_precompiled_and_rescanned_on_change(self):
+        precompiler = self.talon.module(
+            "plugins.key_forwarder.key_precompile"
+        ).KEY_PRECOMPILER
+        self.assertTrue(wait_until(lambda: precompiler.lookup("ctrl-w") is not None))
+
+        self.talon.actions.key("ctrl-w")
+        self.assertEqual(self.talon.transport.lines("key "), ["key ctrl+w"])
+
+        self.talon_file.write_text("tab reopen: key(ctrl-shift-t)\n")
+        os.utime(self.talon_file, ns=(1, 1))
+        self.talon.touch_file(str(self.talon_file))
+        self.assertTrue(
+            wait_until(lambda: precompiler.lookup("ctrl-shift-t") is not None)
+        )
+        self.assertIsNone(precompiler.lookup("ctrl-w"))
+
+    def test_keys_outside_the_table_warn_about_unknown_names(self):
+        log = self.talon.module("plugins.shared.async_log").LOG
+        with contextlib.redirect_stderr(io.StringIO()) as errors:
+            self.talon.actions.key("ctrl-blorp")
+            self.talon.actions.key("blorp")
+            log.flush()
+        self.assertEqual(errors.getvalue().count("unknown key"), 1)
+        self.assertIn("key='blorp'", errors.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
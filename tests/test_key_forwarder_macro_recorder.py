@@ -0,0 +1,137 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from talon_stub import StubPluginTestCase  # noqa: E402
+
+
+class MacroRecorderTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from key_forwarder import macro_recorder
+
+            cls.macro = macro_recorder
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def setUp(self):
+        self.recorder = self.macro.MacroRecorder()
+
+    def test_captures_only_while_recording(self):
+        self.recorder.capture(["key a"])
+        self.recorder.start()
+        self.recorder.capture(["key b", "click left"])
+        self.recorder.capture(["type hi"])
+        macro = self.recorder.stop()
+        self.recorder.capture(["key c"])
+
+        self.assertFalse(self.recorder.recording())
+        self.assertEqual(macro.lines, ("key b", "click left", "type hi"))
+        self.assertIs(self.recorder.macro, macro)
+
+    def test_stop_without_recording_keeps_previous_macro(self):
+        self.recorder.start()
+        self.recorder.capture(["key a"])
+        macro = self.recorder.stop()
+
+        self.assertIsNone(self.recorder.stop())
+        self.assertIs(self.recorder.macro, macro)
+
+    def test_compile_releases_keys_and_buttons_left_pressed(self):
+        macro = self.macro.compile_macro(
+            [
+                "keydown leftctrl",
+                "keydown leftshift",
+                "buttondown left",
+                "keyup leftshift",
+                "mouseto 0.5 0.5",
+            ]
+        )
+
+        self.assertEqual(macro.lines[-2:], ("buttonup left", "keyup leftctrl"))
+
+    def test_repeated_lines(self):
+        macro = self.macro.compile_macro(["key a"])
+
+        self.assertEqual(macro.repeated(3), ["key a", "key a", "key a"])
+        self.assertEqual(macro.repeated(0), [])
+
+    def test_payload_is_filtered_once_per_repeat_count(self):
+        macro = self.macro.compile_macro(["keydown leftctrl", "key a", "keyup leftctrl"])
+
+        payload = macro.payload(2)
+        self.assertEqual(payload, "keydown leftctrl\nkey a\nkey a\nkeyup leftctrl\n")
+        self.assertIs(macro.payload(2), payload)
+        self.assertEqual(macro.payload(1), "keydown leftctrl\nkey a\nkeyup leftctrl\n")
+
+
+class MacroRecorderPluginTests(StubPluginTestCase):
+    def test_macro_replays_key_insert_and_mouse_steps_as_one_write(self):
+        self.talon.actions.user.key_forwarder_macro_record()
+        self.talon.actions.key("ctrl-a")
+        self.talon.actions.insert("hi")
+        self.talon.actions.mouse_click(0)
+        self.assertEqual(self.talon.actions.user.key_forwarder_macro_stop(), 3)
+
+        self.talon.transport.clear()
+        self.assertTrue(self.talon.actions.user.key_forwarder_macro_replay(3))
+
+        self.assertEqual(self.talon.transport.writes, 1)
+        self.assertEqual(
+            self.talon.transport.lines(),
+            ["key ctrl+a", "type hi", "click left"] * 3,
+        )
+
+    def test_macro_records_unfiltered_keys_and_replays_through_the_tracker(self):
+        self.talon.actions.key("ctrl:down")
+        self.talon.actions.user.key_forwarder_macro_record()
+        # Already held, so not written now, but still part of the macro.
+        self.talon.actions.key("ctrl:down")
+        self.talon.actions.key("a")
+        self.talon.actions.key("ctrl:up")
+        self.assertEqual(self.talon.actions.user.key_forwarder_macro_stop(), 3)
+        self.assertEqual(
+            self.talon.transport.lines(("key ", "keydown ", "keyup ")),
+            ["keydown leftctrl", "key a", "keyup leftctrl"],
+        )
+
+        self.talon.transport.clear()
+        self.assertTrue(self.talon.actions.user.key_forwarder_macro_replay(2))
+
+        self.assertEqual(self.talon.transport.writes, 1)
+        # The tracker merges the keyup/keydown pair between the two repeats.
+        self.assertEqual(
+            self.talon.transport.lines(),
+            ["keydown leftctrl", "key a", "key a", "keyup leftctrl"],
+        )
+        tracker = self.talon.module("plugins.key_forwarder.modifier_state").MODIFIER_TRACKER
+        self.assertEqual(tracker.held(), ())
+
+    def test_macro_replays_against_keys_held_at_replay_time(self):
+        self.talon.actions.user.key_forwarder_macro_record()
+        self.talon.actions.key("shift:down")
+        self.talon.actions.key("a")
+        self.talon.actions.key("shift:up")
+        self.talon.actions.user.key_forwarder_macro_stop()
+        self.talon.actions.key("shift:down")
+
+        self.talon.transport.clear()
+        self.assertTrue(self.talon.actions.user.key_forwarder_macro_replay(1))
+
+        # shift stayed held from before the replay, so it is not pressed
+        # again, and the macro's release ends the hold.
+        self.assertEqual(self.talon.transport.lines(), ["key a", "keyup leftshift"])
+        tracker = self.talon.module("plugins.key_forwarder.modifier_state").MODIFIER_TRACKER
+        self.assertEqual(tracker.held(), ())
+
+
+if __name__ == "__main__":
+    unittest.main()
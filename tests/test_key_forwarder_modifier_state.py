@@ -0,0 +1,91 @@
+import sys
+import unittest
+from pathlib import Path
+
+
+class ModifierTrackerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from key_forwarder import dotool_translate, modifier_state
+
+            cls.translate = dotool_translate
+            cls.state = modifier_state
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def setUp(self):
+        self.tracker = self.state.ModifierTracker()
+
+    def _filter(self, key_spec):
+        return self.tracker.filter_actions(
+            self.translate.talon_key_to_dotool_actions(key_spec)
+        )
+
+    def test_plain_chords_pass_through(self):
+        self.assertEqual(self._filter("ctrl-a esc:2"), ["key ctrl+a", "key esc", "key esc"])
+        self.assertEqual(
+            self._filter("ctrl-shift"),
+            ["keydown leftctrl", "keydown leftshift", "keyup leftshift", "keyup leftctrl"],
+        )
+        self.assertEqual(self.tracker.held(), ())
+
+    def test_duplicate_presses_and_releases_dropped(self):
+        self.assertEqual(self._filter("ctrl:down"), ["keydown leftctrl"])
+        self.assertEqual(self._filter("ctrl:down"), [])
+        self.assertEqual(self.tracker.held(), ("leftctrl",))
+        self.assertEqual(self._filter("ctrl:up"), ["keyup leftctrl"])
+        self.assertEqual(self._filter("ctrl:up"), [])
+
+    def test_shared_state_survives_a_new_tracker(self):
+        state = {}
+        self._filter("ctrl:down")
+        self.tracker.use_state(state)
+        reloaded = self.state.ModifierTracker()
+        reloaded.use_state(state)
+        self.assertEqual(reloaded.held(), ("leftctrl",))
+        self.assertEqual(reloaded.release_all(), ["keyup leftctrl"])
+        self.assertEqual(self.tracker.held(), ())
+
+    def test_unknown_release_passes_through(self):
+        self.assertEqual(self._filter("shift:up"), ["keyup leftshift"])
+
+    def test_held_modifier_stripped_from_chords(self):
+        self._filter("ctrl:down")
+        self.assertEqual(self._filter("ctrl-a ctrl-shift-t"), ["key a", "key shift+t"])
+        self.assertEqual(self.tracker.held(), ("leftctrl",))
+
+    def test_release_press_pairs_merged_in_batch(self):
+        click = ["keydown leftctrl", "click left", "keyup leftctrl"]
+        self.assertEqual(
+            self.tracker.filter_actions(click + click),
+            ["keydown leftctrl", "click left", "click left", "keyup leftctrl"],
+        )
+        self.assertEqual(self.tracker.held(), ())
+
+    def test_bare_taps_are_never_merged(self):
+        self.assertEqual(
+            self._filter("shift shift"),
+            ["keydown leftshift", "keyup leftshift"] * 2,
+        )
+        self.assertEqual(self._filter("ctrl ctrl"), ["keydown leftctrl", "keyup leftctrl"] * 2)
+        self.assertEqual(self.tracker.held(), ())
+
+    def test_release_all(self):
+        self._filter("ctrl:down shift:down")
+        self.assertEqual(
+            self.tracker.release_all(),
+            ["keyup leftshift", "keyup leftctrl"],
+        )
+        self.assertEqual(self.tracker.release_all(), [])
+        self.assertEqual(self._filter("ctrl:up"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
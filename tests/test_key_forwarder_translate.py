@@ -45,6 +45,17 @@ class DotoolTranslateTests(unittest.TestCase):
             ["key esc", "key esc", "key esc"],
         )
 
+    def test_text_to_dotool_actions(self):
+        self.assertEqual(self.translate.text_to_dotool_actions(""), [])
+        self.assertEqual(
+            self.translate.text_to_dotool_actions("hi there"),
+            ["type hi there"],
+        )
+        self.assertEqual(
+            self.translate.text_to_dotool_actions("a\r\n\nb\n"),
+            ["type a", "key enter", "key enter", "type b", "key enter"],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
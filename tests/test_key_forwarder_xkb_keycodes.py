@@ -0,0 +1,139 @@
+import sys
+import unittest
+from pathlib import Path
+
+# Trimmed de(nodeadkeys)-style keymap in xkbcli compile-keymap format.
+KEYMAP = """
+xkb_keymap {
+xkb_keycodes "evdev+aliases(qwertz)" {
+    minimum = 8;
+    maximum = 255;
+    <TLDE> = 49;
+    <AE01> = 10;
+    <AE07> = 16;
+    <AE08> = 17;
+    <AD06> = 29;
+    <AB01> = 52;
+    <AB08> = 59;
+    <AC12> = 51;
+    <KPDL> = 91;
+    alias <BKSL> = <AC12>;
+};
+xkb_types "complete" {
+    type "ONE_LEVEL" {
+        modifiers= none;
+    };
+};
+xkb_symbols "pc+de(nodeadkeys)" {
+    name[Group1]="German (no dead keys)";
+    key <TLDE> {
+        type= "FOUR_LEVEL",
+        symbols[1]= [ asciicircum, degree, notsign, notsign ]
+    };
+    key <AE01> {	[ 1, exclam, onesuperior, exclamdown ] };
+    key <AE07> {
+        type= "FOUR_LEVEL",
+        symbols[Group1]= [ 7, slash, braceleft, seveneighths ]
+    };
+    key <AE08> { type= "FOUR_LEVEL", symbols[1]= [ 8, parenleft, bracketleft, trademark ] };
+    key <AD06> {
+        type= "FOUR_LEVEL_SEMIALPHABETIC",
+        symbols[1]= [ z, Z, leftarrow, yen ]
+    };
+    key <AB01> { type= "FOUR_LEVEL_SEMIALPHABETIC", symbols[1]= [ y, Y, guillemotright ] };
+    key <AB08> { [ comma, semicolon, periodcentered, multiply ] };
+    key <BKSL> { [ numbersign, apostrophe, NoSymbol, dead_breve ] };
+    key <KPDL> { type= "KEYPAD", symbols[1]= [ KP_Delete, comma ] };
+};
+};
+"""
+
+
+class XkbKeycodeTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from key_forwarder import dotool_translate, xkb_keycodes
+
+            cls.translate = dotool_translate
+            cls.xkb = xkb_keycodes
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def tearDown(self):
+        self.translate.set_keycode_table(None)
+
+    def test_parses_keycodes_and_levels(self):
+        table = self.xkb.parse_xkb_keymap(KEYMAP)
+        self.assertEqual(table["1"], (2, 0))
+        self.assertEqual(table["exclam"], (2, 1))
+        self.assertEqual(table["slash"], (8, 1))
+        self.assertEqual(table["braceleft"], (8, 2))
+        self.assertEqual(table["z"], (21, 0))
+        self.assertEqual(table["y"], (44, 0))
+        self.assertEqual(table["asciicircum"], (41, 0))
+        # Alias keys resolve through the keycodes section.
+        self.assertEqual(table["numbersign"], (43, 0))
+        self.assertNotIn("NoSymbol", table)
+        with self.assertRaises(TypeError):
+            table["x"] = (1, 0)
+
+    def test_lowest_level_wins_and_keypad_is_skipped(self):
+        table = self.xkb.parse_xkb_keymap(KEYMAP)
+        self.assertEqual(table["comma"], (51, 0))
+        self.assertNotIn("KP_Delete", table)
+
+    def test_empty_or_unrelated_text(self):
+        self.assertEqual(dict(self.xkb.parse_xkb_keymap("")), {})
+        self.assertEqual(dict(self.xkb.parse_xkb_keymap("not a keymap")), {})
+
+    def test_translator_emits_keycodes_with_level_modifiers(self):
+        self.translate.set_keycode_table(self.xkb.parse_xkb_keymap(KEYMAP))
+        talon = self.translate.talon_key_to_dotool_actions
+        self.assertEqual(talon("/"), ["key shift+k:8"])
+        self.assertEqual(talon("{"), ["key altgr+k:8"])
+        self.assertEqual(talon("ctrl-z"), ["key ctrl+k:21"])
+        self.assertEqual(talon("Z"), ["key shift+k:21"])
+        self.assertEqual(talon("shift-!"), ["key shift+k:2"])
+        self.assertEqual(talon("x:numbersign:down"), ["keydown k:43"])
+        # Unknown keysyms and named keys keep their dotool names.
+        self.assertEqual(talon("q esc"), ["key q", "key esc"])
+        self.assertEqual(talon("%"), ["key x:percent"])
+
+    def test_translator_without_table_uses_keysym_names(self):
+        self.translate.set_keycode_table(self.xkb.parse_xkb_keymap(KEYMAP))
+        self.translate.set_keycode_table(None)
+        self.assertEqual(self.translate.talon_key_to_dotool_actions("/"), ["key x:slash"])
+
+    def test_lazy_table_reads_once(self):
+        reads = []
+
+        def read():
+            reads.append(1)
+            return KEYMAP
+
+        keycodes = self.xkb.LazyKeycodeTable(read)
+        self.assertFalse(keycodes.loaded())
+        self.assertIs(keycodes.get(), keycodes.get())
+        self.assertTrue(keycodes.loaded())
+        self.assertEqual(len(reads), 1)
+        self.assertIsNone(keycodes.error)
+
+    def test_lazy_table_failure_is_empty(self):
+        def read():
+            raise OSError("xkbcli missing")
+
+        keycodes = self.xkb.LazyKeycodeTable(read)
+        self.assertEqual(dict(keycodes.get()), {})
+        self.assertIsInstance(keycodes.error, OSError)
+        self.assertTrue(keycodes.loaded())
+
+
+if __name__ == "__main__":
+    unittest.main()
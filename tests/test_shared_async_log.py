@@ -0,0 +1,112 @@
+import io
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+
+class AsyncLogTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from shared import async_log
+
+            cls.log_module = async_log
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def setUp(self):
+        self.now = 0.0
+        self.stream = io.StringIO()
+        self.log = self.log_module.AsyncLog(
+            stream=lambda: self.stream, clock=lambda: self.now
+        )
+
+    def _lines(self):
+        self.assertTrue(self.log.flush())
+        return self.stream.getvalue().splitlines()
+
+    def test_records_are_formatted_on_the_writer_thread(self):
+        caller = threading.get_ident()
+        self.log.info("key_forwarder", "macro recorded", lines=3)
+        self.log.error("dotool", "spawn failed", error=OSError("no such file"))
+        self.assertEqual(
+            self._lines(),
+            [
+                "INFO key_forwarder macro recorded lines=3",
+                "ERROR dotool spawn failed error='no such file'",
+            ],
+        )
+        self.assertNotEqual(self.log._thread.ident, caller)
+        self.assertEqual(self.log.written, 2)
+
+    def test_levels_filter_globally_and_per_subsystem(self):
+        DEBUG = self.log_module.DEBUG
+        self.assertFalse(self.log.debug("key_forwarder", "key", spec="a"))
+        self.log.configure("key_forwarder", level=DEBUG)
+        self.assertTrue(self.log.debug("key_forwarder", "key", spec="a"))
+        self.assertFalse(self.log.debug("mouse_forwarder", "move"))
+        self.log.level = self.log_module.ERROR
+        self.assertFalse(self.log.warning("mouse_forwarder", "slow"))
+        self.assertEqual(self._lines(), ["DEBUG key_forwarder key spec='a'"])
+
+    def test_rate_limit_reports_suppressed_records(self):
+        self.log.configure("gaze", rate=2.0, burst=2)
+        accepted = [self.log.info("gaze", "sample", n=n) for n in range(5)]
+        self.assertEqual(accepted, [True, True, False, False, False])
+        self.assertEqual(self.log.rate_limited, 3)
+        self.now = 0.5
+        self.assertTrue(self.log.info("gaze", "sample", n=5))
+        self.assertEqual(self._lines()[-1], "INFO gaze sample n=5 suppressed=3")
+
+    def test_sampling_keeps_every_nth_record(self):
+        self.log.configure("gaze", sample_every=3)
+        for n in range(7):
+            self.log.info("gaze", "sample", n=n)
+        self.assertEqual(
+            self._lines(),
+            ["INFO gaze sample n=0", "INFO gaze sample n=3", "INFO gaze sample n=6"],
+        )
+        self.assertEqual(self.log.sampled_out, 4)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        blocked = threading.Event()
+        release = threading.Event()
+
+        def stream():
+            blocked.set()
+            release.wait(2.0)
+            return self.stream
+
+        log = self.log_module.AsyncLog(stream=stream, max_queue=2)
+        log.info("a", "first")
+        self.assertTrue(blocked.wait(2.0))
+        results = [log.info("a", "queued", n=n) for n in range(4)]
+        release.set()
+        self.assertEqual(results, [True, True, False, False])
+        self.assertEqual(log.overflowed, 2)
+        self.assertTrue(log.flush())
+
+    def test_parse_subsystem_config(self):
+        parse = self.log_module.parse_subsystem_config
+        self.assertEqual(
+            parse("key_forwarder:debug:rate=20, control1_gaze_logger:sample=10,"),
+            {
+                "key_forwarder": {"level": self.log_module.DEBUG, "rate": 20.0},
+                "control1_gaze_logger": {"sample_every": 10},
+            },
+        )
+        self.assertEqual(parse(""), {})
+        for spec in ("key_forwarder:loud", "key_forwarder:speed=2"):
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse(spec)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import math
+import sys
+import unittest
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class BatchUtilsTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from shared import batch_utils, pure_utils
+
+            cls.batch = batch_utils
+            cls.core = pure_utils
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    EDGE_VALUES = [-1.0, -0.0, 0.0, 0.5, 1.0, 1.5, math.inf, -math.inf, math.nan]
+
+    def _assert_same_floats(self, batch_values, scalar_values):
+        self.assertEqual(len(batch_values), len(scalar_values))
+        for got, expected in zip(batch_values.tolist(), scalar_values):
+            if math.isnan(expected):
+                self.assertTrue(math.isnan(got))
+                continue
+            self.assertEqual(got, expected)
+            self.assertEqual(math.copysign(1.0, got), math.copysign(1.0, expected))
+
+    def test_clamp01_matches_scalar(self):
+        self._assert_same_floats(
+            self.batch.clamp01_array(self.EDGE_VALUES),
+            [self.core.clamp01(value) for value in self.EDGE_VALUES],
+        )
+
+    def test_normalize_points_matches_scalar(self):
+        bounds = (-1200.0, 0.0, 4400.0, 1920.0)
+        xs = [-1200.0, -1300.0, 0.0, 3200.0, 5000.0, math.nan]
+        ys = [0.0, -5.0, 960.0, 1920.0, 2500.0, 10.0]
+        nx, ny = self.batch.normalize_points(bounds, xs, ys)
+        expected = [self.core.normalize_point(bounds, x, y) for x, y in zip(xs, ys)]
+        self._assert_same_floats(nx, [point[0] for point in expected])
+        self._assert_same_floats(ny, [point[1] for point in expected])
+
+    def test_rect_membership_and_local_points_match_scalar(self):
+        rect = (10.0, 20.0, 100.0, 60.0)
+        xs = [15.0, 110.0, 9.9, 10.0, 110.1, math.nan]
+        ys = [25.0, 80.0, 25.0, 20.0, 50.0, 30.0]
+        mask = self.batch.rect_contains_points(rect, xs, ys)
+        self.assertEqual(
+            mask.tolist(),
+            [self.core.rect_contains_point(rect, x, y) for x, y in zip(xs, ys)],
+        )
+        local_xs, local_ys, inside = self.batch.rect_local_points(rect, xs, ys)
+        self.assertEqual(inside.tolist(), mask.tolist())
+        for index, (x, y) in enumerate(zip(xs, ys)):
+            expected = self.core.rect_local_point(rect, x, y)
+            if expected is None:
+                self.assertTrue(math.isnan(local_xs[index]))
+                self.assertTrue(math.isnan(local_ys[index]))
+                continue
+            self.assertEqual((local_xs[index], local_ys[index]), expected)
+
+    def test_screen_indices(self):
+        rects = [(0.0, 0.0, 1920.0, 1080.0), (1920.0, 0.0, 1280.0, 1024.0)]
+        indices = self.batch.screen_indices(rects, [10.0, 1920.0, 2000.0, 5000.0], [10.0, 10.0, 10.0, 10.0])
+        self.assertEqual(indices.tolist(), [0, 0, 1, -1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import sys
+import unittest
+from pathlib import Path
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class CircuitBreakerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from shared import circuit_breaker
+
+            cls.cb = circuit_breaker
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = self.cb.CircuitBreaker(
+            failure_threshold=2, base_delay=1.0, max_delay=3.0, clock=self.clock
+        )
+
+    def test_opens_after_threshold(self):
+        self.assertFalse(self.breaker.record_failure())
+        self.assertTrue(self.breaker.allow())
+        self.assertTrue(self.breaker.record_failure())
+        self.assertEqual(self.breaker.state, self.cb.OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.retry_delay(), 1.0)
+
+    def test_half_open_trial_and_backoff(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now += 1.0
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, self.cb.HALF_OPEN)
+        self.assertFalse(self.breaker.allow())
+
+        self.assertTrue(self.breaker.record_failure())
+        self.assertEqual(self.breaker.retry_delay(), 2.0)
+        self.clock.now += 2.0
+        self.breaker.allow()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.retry_delay(), 3.0)
+
+    def test_success_closes_and_resets_backoff(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now += 1.0
+        self.breaker.allow()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, self.cb.CLOSED)
+        self.assertEqual(self.breaker.failures, 0)
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.retry_delay(), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
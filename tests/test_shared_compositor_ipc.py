@@ -0,0 +1,215 @@
+import contextlib
+import io
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fake_compositor import FakeNiri, FakeSway  # noqa: E402
+from talon_stub import TalonStub, wait_until  # noqa: E402
+
+SWAY_TREE = {
+    "type": "root",
+    "nodes": [
+        {
+            "type": "output",
+            "nodes": [
+                {
+                    "type": "workspace",
+                    "nodes": [
+                        {"type": "con", "id": 7, "app_id": "foot", "name": "vim", "pid": 70,
+                         "focused": False, "nodes": [], "floating_nodes": []},
+                    ],
+                    "floating_nodes": [
+                        {"type": "floating_con", "id": 8, "app_id": None,
+                         "window_properties": {"class": "Gimp"}, "name": "GIMP", "pid": 80,
+                         "focused": True, "nodes": [], "floating_nodes": []},
+                    ],
+                }
+            ],
+        }
+    ],
+}
+SWAY_OUTPUTS = [
+    {"name": "eDP-1", "active": True, "scale": 2.0,
+     "rect": {"x": 0, "y": 0, "width": 1280, "height": 800}},
+    {"name": "HDMI-A-1", "active": False, "scale": 1.0,
+     "rect": {"x": 0, "y": 0, "width": 0, "height": 0}},
+    {"name": "DP-1", "active": True, "scale": 1.0,
+     "rect": {"x": 1280, "y": 0, "width": 1920, "height": 1080}},
+]
+NIRI_WINDOWS = [
+    {"id": 1, "app_id": "firefox", "title": "Docs", "pid": 10, "is_focused": True},
+    {"id": 2, "app_id": "foot", "title": "shell", "pid": 20, "is_focused": False},
+]
+NIRI_OUTPUTS = {
+    "DP-1": {"name": "DP-1", "logical": {"x": 0, "y": 0, "width": 2560, "height": 1440,
+                                         "scale": 1.5, "transform": "Normal"}},
+    "DP-2": {"name": "DP-2", "logical": None},
+}
+
+
+class CompositorIpcTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from shared import compositor_ipc
+
+            cls.ipc = compositor_ipc
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def setUp(self):
+        self.state = self.ipc.CompositorState()
+        self.focus_changes = []
+        self.state.register(
+            self.ipc.FOCUS, lambda: self.focus_changes.append(self.state.focused)
+        )
+
+    def _start(self, client):
+        self.addCleanup(client.stop)
+        client.start()
+        return client
+
+    def _rects(self):
+        return [(output.x, output.y, output.width, output.height) for output in self.state.outputs]
+
+    def test_sway_client_follows_focus_and_outputs(self):
+        sway = FakeSway(SWAY_TREE, SWAY_OUTPUTS)
+        self.addCleanup(sway.close)
+        self._start(self.ipc.SwayClient(sway.path, self.state))
+
+        self.assertTrue(wait_until(lambda: self.state.focused is not None and self.state.outputs))
+        self.assertEqual(self.state.compositor, "sway")
+        self.assertEqual(self.state.focused, self.ipc.FocusedApp("Gimp", "GIMP", 80, 8))
+        self.assertEqual(
+            [(output.name, output.scale) for output in self.state.outputs],
+            [("eDP-1", 2.0), ("DP-1", 1.0)],
+        )
+        self.assertEqual(self._rects(), [(0, 0, 1280, 800), (1280, 0, 1920, 1080)])
+
+        self.assertTrue(wait_until(lambda: sway.subscribers() == 1))
+        foot = SWAY_TREE["nodes"][0]["nodes"][0]["nodes"][0]
+        sway.push(self.ipc.SWAY_WINDOW_EVENT, {"change": "focus", "container": foot})
+        self.assertTrue(wait_until(lambda: self.state.focused.app_id == "foot"))
+        sway.push(self.ipc.SWAY_WINDOW_EVENT, {"change": "close", "container": {"id": 7}})
+        self.assertTrue(wait_until(lambda: self.state.focused is None))
+
+        sway.outputs = SWAY_OUTPUTS[:1]
+        sway.push(self.ipc.SWAY_OUTPUT_EVENT, {"change": "unspecified"})
+        self.assertTrue(wait_until(lambda: len(self.state.outputs) == 1))
+        self.assertEqual(self.state.events, 3)
+        self.assertEqual([app and app.app_id for app in self.focus_changes], ["Gimp", "foot", None])
+
+    def test_niri_client_follows_focus_and_requeries_outputs(self):
+        niri = FakeNiri(NIRI_WINDOWS, NIRI_OUTPUTS)
+        self.addCleanup(niri.close)
+        self._start(self.ipc.NiriClient(niri.path, self.state))
+
+        self.assertTrue(wait_until(lambda: self.state.focused is not None))
+        self.assertEqual(self.state.focused, self.ipc.FocusedApp("firefox", "Docs", 10, 1))
+        self.assertEqual(
+            self.state.outputs, (self.ipc.Output("DP-1", 0, 0, 2560, 1440, 1.5),)
+        )
+
+        self.assertTrue(wait_until(lambda: niri.subscribers() == 1))
+        niri.push({"WindowFocusChanged": {"id": 2}})
+        self.assertTrue(wait_until(lambda: self.state.focused.app_id == "foot"))
+        niri.push({"WindowOpenedOrChanged": {"window": {
+            "id": 2, "app_id": "foot", "title": "make", "pid": 20, "is_focused": True}}})
+        self.assertTrue(wait_until(lambda: self.state.focused.title == "make"))
+        niri.push({"WindowClosed": {"id": 2}})
+        self.assertTrue(wait_until(lambda: self.state.focused is None))
+
+        niri.outputs = {**NIRI_OUTPUTS, "DP-2": {"name": "DP-2", "logical": {
+            "x": 2560, "y": 0, "width": 1920, "height": 1080, "scale": 1.0}}}
+        niri.push({"WorkspacesChanged": {"workspaces": []}})
+        self.assertTrue(wait_until(lambda: len(self.state.outputs) == 2))
+        self.assertEqual(self._rects()[-1], (2560, 0, 1920, 1080))
+        self.assertEqual(niri.output_requests, 2)
+
+    def test_client_reconnects_after_the_socket_drops(self):
+        niri = FakeNiri(NIRI_WINDOWS, NIRI_OUTPUTS)
+        self.addCleanup(niri.close)
+        client = self.ipc.NiriClient(niri.path, self.state, retry_delay=0.01)
+        self._start(client)
+        self.assertTrue(wait_until(lambda: niri.subscribers() == 1))
+
+        niri.drop_subscribers()
+        self.assertTrue(wait_until(lambda: niri.subscribers() == 1 and niri.connections >= 4))
+        self.assertTrue(wait_until(lambda: self.state.focused is not None))
+        self.assertIn(None, self.focus_changes)
+
+        client.stop()
+        self.assertTrue(wait_until(lambda: self.state.compositor == ""))
+
+    def test_client_for_environment_prefers_niri(self):
+        pick = self.ipc.client_for_environment
+        self.assertIsNone(pick({}, self.state))
+        self.assertIsInstance(pick({"SWAYSOCK": "/s"}, self.state), self.ipc.SwayClient)
+        client = pick({"SWAYSOCK": "/s", "NIRI_SOCKET": "/n"}, self.state)
+        self.assertIsInstance(client, self.ipc.NiriClient)
+        self.assertEqual(client.path, "/n")
+
+
+class CompositorIpcPluginTests(unittest.TestCase):
+    def _load(self, settings=None):
+        niri = FakeNiri(
+            [{"id": 1, "app_id": "firefox", "title": "Docs", "pid": 10, "is_focused": True}],
+            {"DP-1": {"name": "DP-1", "logical": {
+                "x": 0, "y": 0, "width": 1000, "height": 1000, "scale": 2.0}}},
+        )
+        self.addCleanup(niri.close)
+        talon = TalonStub(
+            screens=[(0, 0, 1000, 1000)],
+            environ={"NIRI_SOCKET": niri.path},
+            settings=settings,
+        )
+        self.addCleanup(talon.close)
+        with contextlib.redirect_stdout(io.StringIO()):
+            talon.load_plugins()
+            talon.fire_ready()
+        return niri, talon
+
+    def test_compositor_ipc_is_opt_in(self):
+        niri, talon = self._load()
+        self.assertEqual(niri.connections, 0)
+        self.assertEqual(talon.actions.user.compositor_app_id(), "")
+
+    def test_disabling_drops_the_client_and_the_focus_callback(self):
+        niri, talon = self._load({"user.compositor_ipc_enabled": True})
+        self.assertTrue(wait_until(lambda: niri.subscribers() == 1))
+        resources = talon.module("plugins.shared.resource_registry")
+        plugin = talon.module("plugins.compositor_ipc")
+        self.assertTrue(resources.subscribed(plugin._FOCUS_KEY, plugin._on_focus))
+
+        talon.set_setting("user.compositor_ipc_enabled", False)
+        plugin._on_ready()
+        self.assertFalse(resources.subscribed(plugin._FOCUS_KEY))
+        compositor = talon.module("plugins.shared.compositor_ipc").COMPOSITOR
+        self.assertTrue(wait_until(lambda: compositor.compositor == ""))
+
+    def test_compositor_focus_updates_the_context_scope(self):
+        niri, talon = self._load({"user.compositor_ipc_enabled": True})
+
+        self.assertTrue(wait_until(lambda: talon.actions.user.compositor_app_id() == "firefox"))
+        self.assertTrue(wait_until(lambda: niri.subscribers() == 1))
+        niri.push({"WindowOpenedOrChanged": {"window": {
+            "id": 2, "app_id": "foot", "title": "shell", "pid": 20, "is_focused": True}}})
+        self.assertTrue(wait_until(lambda: talon.actions.user.compositor_app_id() == "foot"))
+
+        talon.run_cron()
+        self.assertEqual(talon.scope_values["compositor"], "niri")
+        self.assertEqual(talon.scope_values["compositor_app_id"], "foot")
+        compositor = talon.module("plugins.shared.compositor_ipc").COMPOSITOR
+        self.assertEqual(compositor.outputs[0].scale, 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
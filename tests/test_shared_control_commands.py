@@ -0,0 +1,79 @@
+import contextlib
+import io
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from talon_stub import StubPluginTestCase  # noqa: E402
+
+
+class ControlCommandTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from shared import control_commands
+
+            cls.commands = control_commands
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def test_toggle_commands_take_an_optional_state(self):
+        parse = self.commands.parse_control_command
+        Command = self.commands.ControlCommand
+        self.assertEqual(parse("speech toggle\n"), Command("speech", None))
+        self.assertEqual(parse("speech"), Command("speech", None))
+        self.assertEqual(parse("Control1 ON"), Command("control1", True))
+        self.assertEqual(parse("  hiss off "), Command("hiss", False))
+        self.assertEqual(parse("overlay on"), Command("overlay", True))
+
+    def test_queries_take_no_argument(self):
+        parse = self.commands.parse_control_command
+        self.assertEqual(parse("stats").name, "stats")
+        self.assertEqual(parse("ping").name, "ping")
+        with self.assertRaises(ValueError):
+            parse("stats now")
+
+    def test_rejects_unknown_input(self):
+        parse = self.commands.parse_control_command
+        for line in ("", "reboot", "speech maybe", "hiss on off"):
+            with self.subTest(line=line), self.assertRaises(ValueError):
+                parse(line)
+
+
+class ControlSocketPluginTests(StubPluginTestCase):
+    def test_control_socket_queues_toggles_for_the_main_thread(self):
+        unix_server = self.talon.module("plugins.shared.unix_server")
+        path = str(self.talon_dir / "control.sock")
+        self.talon.set_setting("user.control_socket_path", path)
+        self.talon.module("plugins.control_socket")._on_ready()
+        self.addCleanup(unix_server.stop, path)
+
+        self.assertEqual(unix_server.request(path, "ping"), "pong\n")
+        self.assertEqual(unix_server.request(path, "speech toggle"), "ok\n")
+        self.assertEqual(unix_server.request(path, "control1 on"), "ok\n")
+        self.assertEqual(unix_server.request(path, "hiss on"), "ok\n")
+        self.assertTrue(unix_server.request(path, "jump").startswith("error unknown command"))
+        # Nothing runs until the main thread picks the commands up.
+        self.assertFalse(self.talon.control1_enabled)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(self.talon.run_cron(), 3)
+        self.assertTrue(self.talon.control1_enabled)
+        self.assertIn(("speech.toggle", ()), self.talon.registry.native_calls)
+        self.assertTrue(self.talon.actions.user.hiss_mouse_enabled())
+
+        self.talon.actions.key("a")
+        stats = unix_server.request(path, "stats")
+        self.assertIn("key_forwarder lane=discrete state=closed connected=True", stats)
+        self.assertIn('talon_events_forwarded_total{kind="key",plugin="key_forwarder"} 1', stats)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,255 @@
+import contextlib
+import io
+import os
+import shlex
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from talon_stub import TalonStub, wait_until  # noqa: E402
+
+
+class DotoolConnectionTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from shared import circuit_breaker, dotool_connection, dotool_timing
+
+            cls.breaker = circuit_breaker
+            cls.connection = dotool_connection
+            cls.timing = dotool_timing
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.output = Path(self._tmp.name) / "dotool.log"
+        command = ("sh", "-c", f"cat >> {shlex.quote(str(self.output))}")
+        self.conn = self.connection.DotoolConnection(
+            "test", command=command, health_check=None
+        )
+
+    def tearDown(self):
+        self.conn.close()
+        self.connection.set_session_lines([])
+        self._tmp.cleanup()
+
+    def _read_lines(self, count):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if self.output.exists():
+                lines = self.output.read_text().splitlines()
+                if len(lines) >= count:
+                    return lines
+            time.sleep(0.01)
+        return self.output.read_text().splitlines() if self.output.exists() else []
+
+    def test_timing_profile_lines(self):
+        self.assertEqual(
+            self.timing.timing_profile_lines("compatible"),
+            ["keydelay 2", "keyhold 8", "typedelay 2", "typehold 8"],
+        )
+        with self.assertRaises(KeyError):
+            self.timing.timing_profile_lines("missing")
+
+    def test_session_lines_sent_once_per_connection(self):
+        self.connection.set_session_lines(["keydelay 0"])
+        self.assertTrue(self.conn.send_line("key a"))
+        self.assertTrue(self.conn.send_lines(["key b", "key c"]))
+        self.assertEqual(
+            self._read_lines(4),
+            ["keydelay 0", "key a", "key b", "key c"],
+        )
+
+    def test_session_lines_resent_after_reconnect(self):
+        self.connection.set_session_lines(["keyhold 2"])
+        self.conn.send_line("key a")
+        self._read_lines(2)
+        self.conn.close()
+        self.conn.send_line("key b")
+        self.assertEqual(
+            self._read_lines(4),
+            ["keyhold 2", "key a", "keyhold 2", "key b"],
+        )
+
+    def test_switching_session_lines_updates_live_connection(self):
+        self.conn.send_line("key a")
+        self.connection.set_session_lines(["typedelay 1"])
+        self.assertEqual(self._read_lines(2), ["key a", "typedelay 1"])
+
+    def test_send_lines_async_preserves_order(self):
+        done = []
+        for index in range(5):
+            self.conn.send_lines_async([f"key {index}"], done.append)
+        self.assertEqual(self._read_lines(5), [f"key {index}" for index in range(5)])
+        deadline = time.monotonic() + 5
+        while len(done) < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(done, [True] * 5)
+
+    def test_spawn_failure_returns_false(self):
+        conn = self.connection.DotoolConnection(
+            "missing", command=("/nonexistent/dotoolc",), health_check=None
+        )
+        with contextlib.redirect_stderr(io.StringIO()) as errors:
+            self.assertFalse(conn.send_line("key a"))
+            self.connection.LOG.flush()
+        self.assertFalse(conn.connected())
+        self.assertFalse(conn.available())
+        self.assertIn("spawn failed", errors.getvalue())
+
+    def test_unhealthy_backend_fails_fast_then_reconnects(self):
+        healthy = []
+        conn = self.connection.DotoolConnection(
+            "flaky",
+            command=("sh", "-c", f"cat >> {shlex.quote(str(self.output))}"),
+            health_check=lambda: bool(healthy),
+            breaker=self.breaker.CircuitBreaker(base_delay=0.01),
+        )
+        self.addCleanup(conn.close)
+        self.assertFalse(conn.send_line("key a"))
+        self.assertEqual(conn.breaker.state, self.breaker.OPEN)
+        healthy.append(True)
+        deadline = time.monotonic() + 5
+        while not conn.connected() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(conn.connected())
+        self.assertEqual(conn.breaker.state, self.breaker.CLOSED)
+        self.assertTrue(conn.send_line("key b"))
+        self.assertEqual(self._read_lines(1), ["key b"])
+
+    def test_close_stops_background_reconnect(self):
+        checks = []
+        conn = self.connection.DotoolConnection(
+            "closing",
+            command=("sh", "-c", f"cat >> {shlex.quote(str(self.output))}"),
+            health_check=lambda: checks.append(True) and False,
+            breaker=self.breaker.CircuitBreaker(base_delay=0.05),
+        )
+        self.assertFalse(conn.send_line("key a"))
+        self.assertTrue(conn.reconnecting())
+        conn.close()
+        self.assertTrue(wait_until(lambda: not conn.reconnecting()))
+        attempts = len(checks)
+        time.sleep(0.2)
+        self.assertEqual(len(checks), attempts)
+        self.assertFalse(conn.connected())
+
+    def test_idle_timeout_closes_connection(self):
+        self.conn.idle_timeout = 0.05
+        self.conn.send_line("key a")
+        deadline = time.monotonic() + 5
+        while self.conn.connected() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(self.conn.connected())
+        self.assertTrue(self.conn.send_line("key b"))
+        self.assertEqual(self._read_lines(2), ["key a", "key b"])
+
+    def test_dotoold_listening_probe(self):
+        pipe = Path(self._tmp.name) / "pipe"
+        self.assertFalse(self.connection.dotoold_listening(str(pipe)))
+        os.mkfifo(pipe)
+        self.assertFalse(self.connection.dotoold_listening(str(pipe)))
+        reader = os.open(pipe, os.O_RDONLY | os.O_NONBLOCK)
+        self.addCleanup(os.close, reader)
+        self.assertTrue(self.connection.dotoold_listening(str(pipe)))
+
+    def test_pipe_path_targets_another_dotoold(self):
+        out = shlex.quote(str(self.output))
+        command = ("sh", "-c", f'echo "pipe=$DOTOOL_PIPE" >> {out}; cat >> {out}')
+        conn = self.connection.DotoolConnection(
+            "motion", command=command, health_check=None, pipe_path="/tmp/motion-pipe"
+        )
+        self.addCleanup(conn.close)
+        self.assertTrue(conn.send_line("mouseto 0.5 0.5"))
+        self.assertEqual(self._read_lines(2), ["pipe=/tmp/motion-pipe", "mouseto 0.5 0.5"])
+
+        conn.set_pipe(None)
+        self.assertFalse(conn.connected())
+        self.assertIn("lane=discrete", conn.status())
+
+
+class DotooldOutagePluginTests(unittest.TestCase):
+    def setUp(self):
+        self.talon = TalonStub(screens=[(0, 0, 1000, 1000)])
+        self.addCleanup(self.talon.close)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.talon.load_plugins()
+            self.talon.fire_ready()
+            self.talon.set_control1(True)
+            self.talon.actions.user.control1_pointer_forwarder_start()
+
+    def _drained(self):
+        motion = self.talon.module(
+            "plugins.tracking_forwarder.control1_pointer_forwarder"
+        )._motion
+        return wait_until(
+            lambda: motion.idle()
+            and motion.written + motion.superseded + motion.merged + motion.failed
+            >= motion.submitted
+        )
+
+    def test_writes_fail_fast_while_dotoold_is_down_and_resume_after(self):
+        connection = self.talon.module(
+            "plugins.tracking_forwarder.control1_pointer_forwarder"
+        )._connection
+        self.talon.drive_gaze(250, duration=0.1)
+        self.assertTrue(self._drained())
+        self.assertTrue(connection.connected())
+
+        self.talon.stop_dotoold()
+        self.talon.transport.clear()
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.talon.drive_gaze(250, duration=0.2, realtime=True)
+            self.assertTrue(self._drained())
+        self.assertEqual(self.talon.transport.lines("mouseto"), [])
+        self.assertFalse(connection.available())
+
+        # The first key opens the key forwarder's circuit; Talon's own key()
+        # takes over from then on.
+        self.talon.set_setting("user.key_forwarder_enabled", True)
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.talon.actions.key("a")
+            self.talon.actions.key("b")
+        self.assertIn(("key", ("b",)), self.talon.registry.native_calls)
+
+        self.talon.start_dotoold()
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertTrue(wait_until(connection.connected, timeout=3.0))
+        emitted = self.talon.drive_gaze(250, duration=0.1)
+        self.assertTrue(self._drained())
+
+        _emit, x, y = emitted[-1]
+        self.assertEqual(
+            self.talon.transport.lines("mouseto")[-1],
+            f"mouseto {x / 1000.0:.6f} {y / 1000.0:.6f}",
+        )
+        self.assertIn("keyhold 8", self.talon.transport.lines())
+
+    def test_mouse_write_failure_forgets_held_keys_and_buttons(self):
+        self.talon.set_setting("user.key_forwarder_enabled", True)
+        self.talon.actions.key("shift:down")
+        self.talon.actions.mouse_drag(0)
+        tracker = self.talon.module("plugins.key_forwarder.modifier_state").MODIFIER_TRACKER
+        mouse = self.talon.module("plugins.mouse_forwarder")
+        self.assertEqual(tracker.held(), ("leftshift",))
+        self.assertEqual(mouse._pressed_buttons, {0})
+
+        self.talon.stop_dotoold()
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.talon.actions.mouse_click(1)
+        self.assertEqual(tracker.held(), ())
+        self.assertEqual(mouse._pressed_buttons, set())
+
+
+if __name__ == "__main__":
+    unittest.main()
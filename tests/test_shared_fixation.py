@@ -0,0 +1,119 @@
+import contextlib
+import io
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from talon_stub import StubPluginTestCase, wait_until  # noqa: E402
+
+RATE_HZ = 250.0
+
+
+class FixationTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from shared import fixation
+
+            cls.fixation = fixation
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def _feed(self, detector, start_ts, points):
+        kinds = []
+        for index, (x, y) in enumerate(points):
+            kinds.append(detector.update(start_ts + index / RATE_HZ, x, y))
+        return kinds
+
+    def test_fixation_after_window(self):
+        detector = self.fixation.FixationDetector(window=0.1)
+        jitter = [(500.0 + (i % 3), 300.0 - (i % 2)) for i in range(50)]
+        kinds = self._feed(detector, 0.0, jitter)
+        self.assertEqual(kinds[0], self.fixation.TRANSITION)
+        self.assertEqual(kinds[-1], self.fixation.FIXATION)
+        self.assertEqual(detector.fixation_id, 1)
+        self.assertEqual(detector.fixation_start, 0.0)
+        cx, cy = detector.centroid()
+        self.assertAlmostEqual(cx, 501.0, delta=0.5)
+        self.assertAlmostEqual(cy, 299.5, delta=0.5)
+        self.assertLessEqual(detector.dispersion(), 3.0)
+
+    def test_saccade_breaks_fixation(self):
+        detector = self.fixation.FixationDetector(window=0.1)
+        self._feed(detector, 0.0, [(100.0, 100.0)] * 40)
+        self.assertEqual(detector.kind, self.fixation.FIXATION)
+        kind = detector.update(40 / RATE_HZ, 900.0, 100.0)
+        self.assertEqual(kind, self.fixation.SACCADE)
+        self.assertIsNone(detector.fixation_start)
+        self.assertEqual(detector.update(40 / RATE_HZ, 900.0, 100.0), kind)
+
+        kinds = self._feed(detector, 41 / RATE_HZ, [(900.0, 100.0)] * 40)
+        self.assertEqual(kinds[-1], self.fixation.FIXATION)
+        self.assertEqual(detector.fixation_id, 2)
+        self.assertEqual(detector.centroid(), (900.0, 100.0))
+
+    def test_dispersion_window_slides(self):
+        detector = self.fixation.FixationDetector(
+            velocity_threshold=1e9, dispersion_threshold=20.0, window=0.1
+        )
+        drift = [(100.0 + i * 2.0, 100.0) for i in range(60)]
+        kinds = self._feed(detector, 0.0, drift)
+        self.assertNotIn(self.fixation.FIXATION, kinds)
+        self.assertLessEqual(detector.dispersion(), 2.0 * 0.1 * RATE_HZ + 2.0)
+
+    def test_dwell_timer_fires_once(self):
+        dwell = self.fixation.DwellTimer(dwell_time=0.5, radius=10.0)
+        FIX = self.fixation.FIXATION
+        self.assertFalse(dwell.update(0.0, FIX, (10.0, 10.0)))
+        self.assertFalse(dwell.update(0.25, FIX, (12.0, 10.0)))
+        self.assertAlmostEqual(dwell.progress, 0.5)
+        self.assertTrue(dwell.update(0.5, FIX, (11.0, 10.0)))
+        self.assertFalse(dwell.update(0.9, FIX, (11.0, 10.0)))
+        self.assertFalse(dwell.update(1.0, FIX, (40.0, 10.0)))
+        self.assertEqual(dwell.progress, 0.0)
+        self.assertTrue(dwell.update(1.5, FIX, (40.0, 10.0)))
+        self.assertFalse(dwell.update(1.6, self.fixation.SACCADE, (40.0, 10.0)))
+        self.assertIsNone(dwell.anchor)
+
+    def test_detector_window_stays_bounded_over_a_long_stream(self):
+        detector = self.fixation.FixationDetector()
+        kinds = set()
+        for index in range(int(RATE_HZ * 60)):
+            kinds.add(detector.update(index / RATE_HZ, 500.0 + (index % 400), 300.0))
+            # Each update only touches one window of samples, so it stays O(1).
+            self.assertLessEqual(detector._size(), RATE_HZ * detector.window + 2)
+        self.assertEqual(
+            kinds,
+            {self.fixation.FIXATION, self.fixation.SACCADE, self.fixation.TRANSITION},
+        )
+
+
+class SaccadeSuppressionPluginTests(StubPluginTestCase):
+    def test_saccade_suppression_uses_its_own_detector_and_the_fixation_settings(self):
+        self.talon.set_setting("user.control1_pointer_forwarder_suppress_saccades", True)
+        self.talon.set_setting("user.control1_fixation_velocity_threshold", 100.0)
+        self.start_pointer_forwarder()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.talon.actions.user.control1_dwell_click_start()
+        # 500 px/s: a saccade at 100 px/s, not at the 1000 px/s default.
+        for ts, x in ((1.0, 100.0), (1.1, 100.0), (1.2, 150.0)):
+            self.talon.emit_gaze(x, 100.0, ts=ts)
+
+        self.assertTrue(wait_until(self.motion_idle))
+        self.assertEqual(self.talon.transport.lines("mouseto"), ["mouseto 0.100000 0.100000"])
+        forwarder = self.talon.module("plugins.tracking_forwarder.control1_pointer_forwarder")
+        dwell = self.talon.module("plugins.tracking_forwarder.control1_dwell_click")
+        self.assertIsNot(forwarder._detector, dwell._detector)
+        self.assertEqual(forwarder._detector.kind, "saccade")
+        self.assertEqual(dwell._detector.kind, "saccade")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import math
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class GazeLogTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from shared import gaze_analytics, gaze_log, pure_utils
+
+            cls.analytics = gaze_analytics
+            cls.gaze_log = gaze_log
+            cls.core = pure_utils
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+
+    def _samples(self):
+        """Two seconds at 100 Hz: fixation, one saccade, a 100 ms gap."""
+        samples = []
+        ts = 10.0
+        for index in range(200):
+            if index == 150:
+                ts += 0.1
+            x = 100.0 + (index % 2) if index < 100 else 900.0 + (index % 2)
+            samples.append((round(ts, 3), (x, 200.0), (0.1, 0.2), None, round(ts, 3) + 0.004))
+            ts += 0.01
+        return samples
+
+    def _write_text_log(self, samples):
+        path = Path(self._tmp.name) / "gaze.txt"
+        lines = ["control1_gaze_logger started mode=gaze enabled=True"]
+        for ts, xy, gaze, delta, write_ts in samples:
+            lines.append(self.core.format_control1_sample(ts, xy, gaze, delta))
+            lines.append(self.core.format_control1_write(ts, write_ts))
+        path.write_text("\n".join(lines) + "\n")
+        return path
+
+    def _write_binary_log(self, samples):
+        path = Path(self._tmp.name) / "gaze.bin"
+        with open(path, "wb") as log:
+            log.write(self.gaze_log.BINARY_MAGIC)
+            for ts, xy, gaze, delta, write_ts in samples:
+                log.write(self.gaze_log.encode_gaze_record(ts, xy, gaze, delta))
+                log.write(self.gaze_log.encode_write_record(ts, write_ts))
+        return path
+
+    def test_parse_control1_line(self):
+        line = self.core.format_control1_sample(1.5, (10.0, 20.0), (0.25, 0.5), (1.0, -2.0))
+        record = self.gaze_log.parse_control1_line(line)
+        self.assertEqual(record[0], 1.5)
+        self.assertTrue(math.isnan(record[1]))
+        self.assertEqual(record[2:], (10.0, 20.0, 1.0, -2.0, 0.25, 0.5))
+        line = self.core.format_control1_write(2.0, 2.0125)
+        record = self.gaze_log.parse_control1_line(line)
+        self.assertEqual(record[:2], (2.0, 2.0125))
+        self.assertTrue(all(math.isnan(value) for value in record[2:]))
+        self.assertIsNone(self.gaze_log.parse_control1_line("control1 no samples"))
+        line = self.core.format_control1_sample(3.0004, (1.0, 2.0), (0.1, 0.2), None)
+        self.assertEqual(self.gaze_log.parse_control1_line(line)[0], 3.0004)
+
+    def test_binary_record_roundtrip(self):
+        data = self.gaze_log.encode_gaze_record(1.0, (2.0, 3.0), (0.4, 0.5), (6.0, 7.0))
+        self.assertEqual(len(data), self.gaze_log.GAZE_RECORD.size)
+        record = self.gaze_log.GAZE_RECORD.unpack(data)
+        self.assertTrue(math.isnan(record[1]))
+        self.assertEqual(record[:1] + record[2:], (1.0, 2.0, 3.0, 6.0, 7.0, 0.4, 0.5))
+        record = self.gaze_log.GAZE_RECORD.unpack(self.gaze_log.encode_write_record(1.0, 1.25))
+        self.assertEqual(record[:2], (1.0, 1.25))
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_text_and_binary_logs_agree(self):
+        samples = self._samples()
+        reports = []
+        for path in (self._write_text_log(samples), self._write_binary_log(samples)):
+            analyzer = self.analytics.analyze_gaze_log(str(path), chunk_samples=37)
+            self.assertEqual(analyzer.samples, 200)
+            self.assertEqual(analyzer.gaps, 1)
+            self.assertEqual(analyzer.dropped_samples, 10)
+            self.assertAlmostEqual(analyzer.longest_gap, 0.11, places=3)
+            self.assertAlmostEqual(analyzer.nominal_interval, 0.01, places=3)
+            self.assertEqual(analyzer.saccade_velocities.total, 1)
+            self.assertAlmostEqual(analyzer.fixation_jitter_rms(), 1.0, places=3)
+            self.assertEqual(analyzer.write_latency_ms.total, 200)
+            self.assertAlmostEqual(analyzer.write_latency_ms.quantile(0.5), 4.0, places=3)
+            reports.append(analyzer.report_lines())
+        self.assertEqual(reports[0][1], reports[1][1])
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_streaming_histogram_quantiles(self):
+        histogram = self.analytics.StreamingHistogram([1.0, 2.0, 3.0])
+        histogram.add([0.5, 1.5, 1.5, 2.5, 10.0, math.nan])
+        self.assertEqual(histogram.total, 5)
+        self.assertEqual(histogram.counts.tolist(), [1, 2, 1, 1])
+        self.assertEqual(histogram.quantile(0.5), 2.0)
+        self.assertEqual(histogram.quantile(1.0), 10.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import contextlib
+import io
+import math
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from talon_stub import StubPluginTestCase  # noqa: E402
+
+
+class GazeRingTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from shared import gaze_log, gaze_ring
+
+            cls.gaze_log = gaze_log
+            cls.ring = gaze_ring
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = str(Path(self._tmp.name) / "gaze")
+
+    def _writer(self, capacity=8):
+        writer = self.ring.GazeRingWriter(self.path, capacity=capacity)
+        self.addCleanup(writer.close)
+        return writer
+
+    def _reader(self, **kwargs):
+        reader = self.ring.GazeRingReader(self.path, **kwargs)
+        self.addCleanup(reader.close)
+        return reader
+
+    def _record(self, index):
+        return self.gaze_log.encode_gaze_record(
+            ts=float(index), xy_px=(index * 10.0, 5.0), gaze_norm=(0.5, 0.25)
+        )
+
+    def test_reader_sees_new_samples_in_order(self):
+        writer = self._writer()
+        writer.publish(self._record(1))
+        reader = self._reader()
+        self.assertEqual(reader.read(), [])
+        for index in (2, 3):
+            writer.publish(self._record(index))
+        records = reader.read()
+        self.assertEqual([record[0] for record in records], [2.0, 3.0])
+        self.assertEqual(records[0][2:4], (20.0, 5.0))
+        self.assertTrue(math.isnan(records[0][4]))
+        self.assertEqual(reader.read(), [])
+        self.assertEqual(reader.latest()[0], 3.0)
+
+    def test_from_start_and_empty_ring(self):
+        writer = self._writer()
+        reader = self._reader(from_start=True)
+        self.assertIsNone(reader.latest())
+        writer.publish(self._record(1))
+        self.assertEqual([record[0] for record in reader.read()], [1.0])
+
+    def test_lapped_reader_skips_to_oldest_held_sample(self):
+        writer = self._writer(capacity=4)
+        reader = self._reader()
+        for index in range(1, 11):
+            writer.publish(self._record(index))
+        records = reader.read()
+        self.assertEqual([record[0] for record in records], [7.0, 8.0, 9.0, 10.0])
+        self.assertEqual(reader.dropped, 6)
+        self.assertEqual(reader.cursor, 10)
+
+    def test_torn_slot_is_dropped(self):
+        writer = self._writer(capacity=4)
+        reader = self._reader()
+        writer.publish(self._record(1))
+        writer.publish(self._record(2))
+        # Simulate the writer mid-way through overwriting slot 1.
+        self.ring._SEQUENCE.pack_into(writer._map, self.ring.HEADER_SIZE, 0)
+        self.assertEqual([record[0] for record in reader.read()], [2.0])
+        self.assertEqual(reader.dropped, 1)
+
+    def test_new_writer_replaces_ring_and_marks_readers_stale(self):
+        writer = self._writer()
+        writer.publish(self._record(1))
+        reader = self._reader()
+        self.assertFalse(reader.stale())
+        writer.close()
+        replacement = self._writer()
+        self.assertTrue(reader.stale())
+        # The old mapping stays readable after the replacement.
+        self.assertEqual(reader.latest()[0], 1.0)
+        replacement.publish(self._record(5))
+        self.assertEqual([record[0] for record in self._reader(from_start=True).read()], [5.0])
+
+    def test_rejects_other_files(self):
+        Path(self.path).write_bytes(b"not a ring" * 10)
+        with self.assertRaises(ValueError):
+            self.ring.GazeRingReader(self.path)
+        with self.assertRaises(ValueError):
+            self.ring.GazeRingWriter(self.path, capacity=0)
+
+
+class GazeRingPluginTests(StubPluginTestCase):
+    def test_ring_streams_samples_next_to_the_text_log(self):
+        path = str(self.talon_dir / "gaze-ring")
+        self.talon.set_setting("user.control1_gaze_logger_ring_path", path)
+        log = self.talon.module("plugins.shared.async_log").LOG
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.talon.set_control1(True)
+            self.talon.actions.user.control1_gaze_logger_start()
+        ring = self.talon.module("plugins.shared.gaze_ring")
+        reader = ring.GazeRingReader(path, from_start=True)
+        self.addCleanup(reader.close)
+
+        with contextlib.redirect_stderr(io.StringIO()) as errors:
+            self.talon.emit_gaze(100, 200, ts=5.0)
+            log.flush()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.talon.actions.user.control1_gaze_logger_stop()
+
+        self.assertEqual([record[0] for record in reader.read()], [5.0])
+        self.assertIn("control1_gaze_logger", errors.getvalue())
+        self.assertIn("ts=5.000000", errors.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from talon_stub import StubPluginTestCase, wait_until  # noqa: E402
+
+
+class HiresScrollTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from shared import hires_scroll
+
+            cls.scroll = hires_scroll
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def test_sub_notch_deltas_become_hires_units(self):
+        accumulate = self.scroll.accumulate_hires_scroll
+        units, remainder = accumulate(0.1, 0.0)
+        self.assertEqual(units, 12)
+        self.assertAlmostEqual(remainder, 0.0)
+
+        units, remainder = accumulate(0.005, remainder)
+        self.assertEqual(units, 0)
+        self.assertAlmostEqual(remainder, 0.005)
+
+        units, remainder = accumulate(0.005, remainder)
+        self.assertEqual(units, 1)
+        self.assertAlmostEqual(remainder, 0.01 - 1 / 120)
+
+        units, remainder = accumulate(-1.0, 0.0)
+        self.assertEqual(units, -120)
+        self.assertAlmostEqual(remainder, 0.0)
+
+    def test_wheel_lines_round_trip_and_merge_per_axis(self):
+        line = self.scroll.wheel_line("wheel", -30)
+        self.assertEqual(line, "wheel -0.250000")
+        self.assertEqual(self.scroll.wheel_units(line), -30)
+        self.assertEqual(
+            self.scroll.merge_wheel(line, self.scroll.wheel_line("wheel", -1)),
+            "wheel -0.258333",
+        )
+        self.assertEqual(
+            self.scroll.wheel_units(
+                self.scroll.merge_wheel("wheel -0.258333", "wheel 0.008333")
+            ),
+            -30,
+        )
+        self.assertEqual(
+            self.scroll.merge_wheel("hwheel 1.000000", line), line
+        )
+
+
+class ScrollPluginTests(StubPluginTestCase):
+    def test_scroll_uses_whole_notches_unless_hires_is_enabled(self):
+        for _ in range(5):
+            self.talon.actions.user.mouse_forwarder_scroll_down(0.2)
+        self.talon.actions.mouse_scroll(y=1.5, by_lines=True)
+        self.assertEqual(self.talon.transport.lines("wheel "), ["wheel -1"])
+
+        self.talon.set_setting("user.mouse_forwarder_hires_scroll", True)
+        for _ in range(5):
+            self.talon.actions.user.mouse_forwarder_scroll_down(0.2)
+        self.talon.actions.mouse_scroll(x=0.5, by_lines=True)
+
+        def hires_units():
+            wheel = self.talon.transport.lines("wheel ")[1:]
+            return sum(round(float(line.split()[1]) * 120) for line in wheel)
+
+        # The earlier by_lines scroll left half a notch to carry.
+        self.assertTrue(wait_until(lambda: hires_units() == -180))
+        self.assertLessEqual(len(self.talon.transport.lines("wheel ")), 6)
+        self.assertEqual(
+            self.talon.transport.wait_for_lines("hwheel ", 1), ["hwheel 0.166667"]
+        )
+
+    def test_clicks_and_keys_never_overtake_a_hires_scroll(self):
+        self.talon.set_setting("user.mouse_forwarder_hires_scroll", True)
+        for _ in range(20):
+            self.talon.actions.user.mouse_forwarder_scroll_down(0.5)
+            self.talon.actions.mouse_click(0)
+            self.talon.actions.key("a")
+
+        kinds = [line.split()[0] for line in self.talon.transport.lines()]
+        kinds = [kind for kind in kinds if kind in ("wheel", "click", "key")]
+        self.assertEqual(kinds, ["wheel", "click", "key"] * 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import importlib
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from talon_stub import StubPluginTestCase  # noqa: E402
+
+
+class InstrumentationTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from shared import instrumentation
+
+            cls.instrumentation = instrumentation
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def test_startup_profiler_records_import_and_ready(self):
+        profiler = self.instrumentation.StartupProfiler("user.talon_lite.plugins.")
+        profiler.record_import("user.talon_lite.plugins.fast", time.perf_counter())
+        profiler.record_import("user.talon_lite.plugins.slow", time.perf_counter() - 0.5)
+
+        calls = []
+        ready = profiler.profile_ready("user.talon_lite.plugins.fast", lambda: calls.append(1))
+        ready()
+        self.assertEqual(calls, [1])
+
+        timings = profiler.timings()
+        self.assertEqual(set(timings), {"fast", "slow"})
+        self.assertGreaterEqual(timings["slow"][0], 500.0)
+        self.assertIsNone(timings["slow"][1])
+        self.assertIsNotNone(timings["fast"][1])
+
+        lines = profiler.report_lines()
+        self.assertTrue(lines[0].startswith("slow import="))
+        self.assertTrue(lines[0].endswith("ready=-"))
+
+    def test_profile_ready_records_on_error(self):
+        profiler = self.instrumentation.StartupProfiler()
+
+        def _fail():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            profiler.profile_ready("broken", _fail)()
+        self.assertIsNotNone(profiler.timings()["broken"][1])
+
+    def test_watch_imports_times_plugin_modules_but_not_shared_ones(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        package = Path(tmp.name) / "lite_plugins"
+        (package / "shared").mkdir(parents=True)
+        (package / "__init__.py").write_text("")
+        (package / "shared" / "__init__.py").write_text("")
+        (package / "shared" / "helper.py").write_text("")
+        (package / "slow.py").write_text(
+            "import time\nfrom .shared import helper\ntime.sleep(0.05)\n"
+        )
+        for directory in ("keys", "mouse"):
+            (package / directory).mkdir()
+            (package / directory / "__init__.py").write_text("")
+            (package / directory / "forwarder.py").write_text("")
+        sys.path.insert(0, tmp.name)
+        meta_path = list(sys.meta_path)
+
+        def restore():
+            sys.path.remove(tmp.name)
+            sys.meta_path[:] = meta_path
+            for name in [name for name in sys.modules if name.startswith("lite_plugins")]:
+                del sys.modules[name]
+
+        self.addCleanup(restore)
+        importlib.import_module("lite_plugins.keys.forwarder")
+        profiler = self.instrumentation.StartupProfiler()
+        profiler.watch_imports("lite_plugins.")
+        profiler.watch_imports("lite_plugins.")
+        importlib.import_module("lite_plugins.slow")
+        importlib.import_module("lite_plugins.mouse.forwarder")
+
+        def timers():
+            return [finder for finder in sys.meta_path if getattr(finder, "is_import_timer", False)]
+
+        self.assertEqual(len(timers()), 1)
+        profiler.stop_watching()
+        self.assertEqual(timers(), [])
+        importlib.reload(sys.modules["lite_plugins.slow"])
+
+        timings = profiler.timings()
+        self.assertEqual(
+            set(timings),
+            {"slow", "keys", "keys.forwarder", "mouse", "mouse.forwarder"},
+        )
+        self.assertGreaterEqual(timings["slow"][0], 50.0)
+        self.assertIsNone(timings["keys.forwarder"][0])
+        self.assertIsNotNone(timings["mouse.forwarder"][0])
+        self.assertIn("keys.forwarder import=untimed ready=-", profiler.report_lines())
+
+    def test_callback_profiler_is_pass_through_while_disabled(self):
+        profiler = self.instrumentation.CallbackProfiler()
+        wrapped = profiler.wrap("user.talon_lite.plugins.mouse", lambda x: x * 2)
+
+        self.assertEqual(wrapped(3), 6)
+        self.assertEqual(profiler.stats(), {})
+
+    def test_callback_profiler_records_sorted_by_total(self):
+        profiler = self.instrumentation.CallbackProfiler()
+        profiler.enabled = True
+
+        @profiler.profile("user.talon_lite.plugins.gaze")
+        def _on_gaze():
+            time.sleep(0.01)
+
+        @profiler.profile_actions("user.talon_lite.plugins.keys")
+        class Actions:
+            @staticmethod
+            def key(spec: str) -> str:
+                """Press a key."""
+                return spec
+
+        _on_gaze()
+        self.assertEqual(Actions.key("a"), "a")
+        self.assertEqual(Actions.key("b"), "b")
+        self.assertEqual(Actions.key.__doc__, "Press a key.")
+
+        stats = profiler.stats()
+        self.assertEqual(stats["keys.key"].count, 2)
+        self.assertGreaterEqual(stats["gaze._on_gaze"].max_ms, 10.0)
+        self.assertTrue(profiler.report_lines()[0].startswith("gaze._on_gaze total="))
+
+        profiler.reset()
+        self.assertEqual(profiler.report_lines(), [])
+
+
+class CallbackProfilerPluginTests(StubPluginTestCase):
+    def test_callback_profiler_reports_gaze_and_action_costs(self):
+        self.talon.actions.user.callback_profiler_enable(True)
+        self.start_pointer_forwarder()
+        self.talon.drive_gaze(120, duration=0.25)
+        self.talon.actions.key("a")
+
+        report = self.talon.actions.user.callback_profiler_report()
+        self.assertIn("control1_pointer_forwarder._on_gaze total=", report)
+        self.assertIn("forwarder.key total=", report)
+        self.assertIn("count=30 ", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from talon_stub import StubPluginTestCase  # noqa: E402
+
+
+class MetricsTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from shared import instrumentation, metrics, unix_server
+
+            cls.instrumentation = instrumentation
+            cls.metrics = metrics
+            cls.unix_server = unix_server
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def setUp(self):
+        self.registry = self.metrics.MetricsRegistry()
+
+    def test_counters_are_created_once_per_label_set(self):
+        first = self.registry.counter("talon_keys_total", "Keys.", plugin="a")
+        first.inc()
+        again = self.registry.counter("talon_keys_total", "Keys.", plugin="a")
+        again.inc(2)
+        self.registry.counter("talon_keys_total", "Keys.", plugin="b")
+
+        self.assertIs(first, again)
+        self.assertEqual(
+            self.registry.render(),
+            "# HELP talon_keys_total Keys.\n"
+            "# TYPE talon_keys_total counter\n"
+            'talon_keys_total{plugin="a"} 3\n'
+            'talon_keys_total{plugin="b"} 0\n',
+        )
+
+    def test_gauges_are_read_at_render_time_and_replaced(self):
+        depth = [1]
+        self.registry.gauge("talon_depth", "Depth.", lambda: depth[0])
+        depth[0] = 4
+        self.assertIn("talon_depth 4\n", self.registry.render())
+        self.registry.gauge("talon_depth", "Depth.", lambda: 0.25)
+        self.assertIn("talon_depth 0.25\n", self.registry.render())
+
+    def test_failing_gauges_are_skipped(self):
+        self.registry.gauge("talon_broken", "Broken.", lambda: 1 / 0)
+        self.assertEqual(
+            self.registry.render(), "# HELP talon_broken Broken.\n# TYPE talon_broken gauge\n"
+        )
+
+    def test_histograms_are_cumulative_and_in_seconds(self):
+        stats = self.instrumentation.LatencyStats((1.0, 10.0))
+        for latency_ms in (0.5, 2.0, 3.0, 50.0):
+            stats.record(latency_ms)
+        self.registry.histogram("talon_write_seconds", "Writes.", stats, plugin="k")
+
+        lines = self.registry.render().splitlines()
+        self.assertEqual(
+            lines[2:],
+            [
+                'talon_write_seconds_bucket{plugin="k",le="0.001"} 1',
+                'talon_write_seconds_bucket{plugin="k",le="0.01"} 3',
+                'talon_write_seconds_bucket{plugin="k",le="+Inf"} 4',
+                'talon_write_seconds_sum{plugin="k"} 0.0555',
+                'talon_write_seconds_count{plugin="k"} 4',
+            ],
+        )
+
+    def test_label_values_are_escaped_and_kinds_checked(self):
+        self.registry.counter("talon_x_total", "X.", path='a"b\\c\nd').inc()
+        self.assertIn('talon_x_total{path="a\\"b\\\\c\\nd"} 1', self.registry.render())
+        with self.assertRaises(ValueError):
+            self.registry.gauge("talon_x_total", "X.", lambda: 1)
+
+    def test_unix_server_answers_lines_and_http(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "test.sock")
+        requests = []
+
+        def handler(line):
+            requests.append(line)
+            return f"reply {line}\n"
+
+        server = self.unix_server.serve(path, handler, "test")
+        self.addCleanup(self.unix_server.stop, path)
+        self.assertTrue(server.running())
+        self.assertEqual(os.stat(path).st_mode & 0o077, 0)
+
+        self.assertEqual(self.unix_server.request(path, "stats"), "reply stats\n")
+        reply = self.unix_server.request(path, "GET /metrics HTTP/1.1\r\nHost: x\r\n\r\n")
+        self.assertTrue(reply.startswith("HTTP/1.0 200 OK\r\n"))
+        self.assertIn("Content-Length: 15\r\n", reply)
+        self.assertTrue(reply.endswith("\r\n\r\nreply /metrics\n"))
+        self.assertEqual(requests, ["stats", "/metrics"])
+
+        replacement = self.unix_server.serve(path, lambda line: "new\n", "test")
+        self.assertFalse(server.running())
+        self.assertTrue(replacement.running())
+        self.assertEqual(self.unix_server.request(path, "stats"), "new\n")
+
+        self.unix_server.stop(path)
+        self.assertFalse(os.path.exists(path))
+
+
+class MetricsEndpointPluginTests(StubPluginTestCase):
+    def test_metrics_socket_serves_pipeline_counters(self):
+        unix_server = self.talon.module("plugins.shared.unix_server")
+        path = str(self.talon_dir / "metrics.sock")
+        self.talon.set_setting("user.metrics_socket_path", path)
+        self.talon.module("plugins.metrics_endpoint")._on_ready()
+        self.addCleanup(unix_server.stop, path)
+
+        self.talon.actions.key("a")
+        self.talon.actions.key("b")
+        self.start_pointer_forwarder()
+        self.talon.emit_gaze(100, 200)
+        self.talon.emit_gaze(100, 200)
+        self.talon.transport.wait_for_lines("mouseto", 1)
+
+        reply = unix_server.request(path, "GET /metrics HTTP/1.1\r\nHost: talon\r\n\r\n")
+        self.assertTrue(reply.startswith("HTTP/1.0 200 OK\r\n"))
+        self.assertIn("Content-Type: text/plain; version=0.0.4", reply)
+        body = reply.split("\r\n\r\n", 1)[1]
+        self.assertIn('talon_events_forwarded_total{kind="key",plugin="key_forwarder"} 2', body)
+        self.assertIn(
+            'talon_gaze_samples_received_total{plugin="control1_pointer_forwarder"} 2', body
+        )
+        self.assertIn(
+            'talon_gaze_samples_dropped_total{plugin="control1_pointer_forwarder",'
+            'reason="unchanged"} 1',
+            body,
+        )
+        self.assertIn('talon_dotool_connected{plugin="key_forwarder"} 1', body)
+        self.assertIn('talon_dotool_write_seconds_count{plugin="key_forwarder"}', body)
+        self.assertEqual(unix_server.request(path, "metrics"), body)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import contextlib
+import io
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from talon_stub import StubPluginTestCase, wait_until  # noqa: E402
+
+
+class PopClickTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from shared import instrumentation, pop_click
+
+            cls.pop_click = pop_click
+            cls.instrumentation = instrumentation
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def test_debounce_without_double_click_window(self):
+        pops = self.pop_click.PopClickCoalescer(debounce=0.05, double_click_window=0.0)
+        self.assertEqual(pops.pop(1.0), self.pop_click.SINGLE)
+        self.assertEqual(pops.pop(1.02), self.pop_click.IGNORED)
+        self.assertEqual(pops.pop(1.04), self.pop_click.IGNORED)
+        self.assertEqual(pops.pop(1.1), self.pop_click.SINGLE)
+
+    def test_double_click_coalescing(self):
+        pops = self.pop_click.PopClickCoalescer(debounce=0.05, double_click_window=0.3)
+        self.assertEqual(pops.pop(1.0), self.pop_click.PENDING)
+        self.assertEqual(pops.pop(1.01), self.pop_click.IGNORED)
+        self.assertEqual(pops.pop(1.2), self.pop_click.DOUBLE)
+        self.assertFalse(pops.take_pending(1.0))
+        self.assertEqual(pops.pop(2.0), self.pop_click.PENDING)
+        self.assertTrue(pops.take_pending(2.0))
+        self.assertFalse(pops.take_pending(2.0))
+
+    def test_flush_expired_pending(self):
+        pops = self.pop_click.PopClickCoalescer(debounce=0.05, double_click_window=0.3)
+        pops.pop(1.0)
+        self.assertIsNone(pops.flush_expired(1.2))
+        self.assertEqual(pops.flush_expired(1.5), 1.0)
+        self.assertIsNone(pops.flush_expired(1.6))
+        self.assertEqual(pops.pop(1.6), self.pop_click.PENDING)
+
+    def test_latency_stats(self):
+        stats = self.instrumentation.LatencyStats(buckets_ms=(1.0, 10.0))
+        for latency in (0.5, 1.0, 4.0, 20.0):
+            stats.record(latency)
+        self.assertEqual(stats.count, 4)
+        self.assertEqual(stats.bucket_counts, [2, 1, 1])
+        self.assertEqual(stats.max_ms, 20.0)
+        self.assertAlmostEqual(stats.mean_ms(), 6.375)
+        self.assertEqual(
+            stats.summary(),
+            "count=4 mean=6.38ms max=20.00ms <=1ms:2 <=10ms:1 >10ms:1",
+        )
+
+
+class HissMousePluginTests(StubPluginTestCase):
+    def setUp(self):
+        super().setUp()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.talon.actions.user.hiss_mouse_enable()
+        self.talon.transport.clear()
+
+    def _clicks(self):
+        return self.talon.transport.lines("click ")
+
+    def test_a_pop_clicks_at_once_by_default(self):
+        self.talon.actions.user.noise_trigger_pop()
+        self.assertTrue(wait_until(lambda: self._clicks() == ["click left"]))
+        self.talon.transport.clear()
+
+        time.sleep(0.1)
+        self.talon.actions.user.noise_trigger_pop()
+        self.assertTrue(wait_until(lambda: self._clicks() == ["click left"]))
+
+    def test_two_pops_double_click_within_the_window(self):
+        self.talon.set_setting("user.hiss_mouse_double_click_window", 0.3)
+        self.talon.actions.user.noise_trigger_pop()
+        time.sleep(0.1)
+        self.talon.actions.user.noise_trigger_pop()
+
+        self.assertTrue(wait_until(lambda: len(self._clicks()) == 2))
+        # The pending single click was cancelled, not sent after the window.
+        time.sleep(0.4)
+        self.assertEqual(self._clicks(), ["click left", "click left"])
+
+    def test_a_single_pop_clicks_once_the_window_passes(self):
+        self.talon.set_setting("user.hiss_mouse_double_click_window", 0.3)
+        self.talon.actions.user.noise_trigger_pop()
+        self.assertEqual(self._clicks(), [])
+
+        self.assertTrue(wait_until(lambda: self._clicks() == ["click left"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+
+class _BlockingWriter:
+    def __init__(self):
+        self.lines = []
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def send_line(self, line):
+        self.started.set()
+        self.release.wait(2.0)
+        self.lines.append((time.perf_counter(), line))
+        return True
+
+
+def _wait(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.002)
+    return predicate()
+
+
+class PriorityLanesTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from shared import priority_lanes
+
+            cls.lanes = priority_lanes
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def setUp(self):
+        self.gate = self.lanes.LaneGate()
+        self.writer = _BlockingWriter()
+        self.lane = self.lanes.MotionLane(self.writer, "test", gate=self.gate, max_defer=1.0)
+
+    def tearDown(self):
+        self.writer.release.set()
+
+    def test_motion_is_latest_wins_while_a_write_is_in_flight(self):
+        self.lane.submit("mouseto 0.1 0.1")
+        self.assertTrue(self.writer.started.wait(1.0))
+        for step in range(2, 10):
+            self.lane.submit(f"mouseto 0.{step} 0.{step}")
+        self.writer.release.set()
+
+        self.assertTrue(_wait(lambda: self.lane.idle() and len(self.writer.lines) == 2))
+        self.assertEqual(
+            [line for _ts, line in self.writer.lines],
+            ["mouseto 0.1 0.1", "mouseto 0.9 0.9"],
+        )
+        self.assertEqual(self.lane.superseded, 7)
+        self.assertEqual(self.lane.submitted, 9)
+
+    def test_merge_combines_unwritten_lines(self):
+        def merge(pending, line):
+            return f"{pending};{line}"
+
+        self.lane.submit("mousemove 1 1", merge)
+        self.assertTrue(self.writer.started.wait(1.0))
+        for step in range(2, 5):
+            self.lane.submit(f"mousemove {step} 0", merge)
+        self.writer.release.set()
+
+        self.assertTrue(_wait(lambda: self.lane.idle() and len(self.writer.lines) == 2))
+        self.assertEqual(
+            self.writer.lines[1][1], "mousemove 2 0;mousemove 3 0;mousemove 4 0"
+        )
+        self.assertEqual((self.lane.merged, self.lane.superseded), (2, 0))
+
+    def test_write_listeners_get_the_source_ts_of_written_lines(self):
+        written = []
+
+        def listener(source_ts, written_at):
+            written.append((source_ts, written_at))
+
+        self.lanes.MOTION_WRITES.register("test", listener)
+        self.addCleanup(self.lanes.MOTION_WRITES.unregister, "test", listener)
+        self.lane.submit("mousemove 1 0", lambda a, b: b, source_ts=1.0)
+        self.assertTrue(self.writer.started.wait(1.0))
+        self.lane.submit("mousemove 2 0", lambda a, b: b, source_ts=2.0)
+        self.lane.submit("mousemove 3 0", lambda a, b: b, source_ts=3.0)
+        self.writer.release.set()
+
+        self.assertTrue(_wait(lambda: len(written) == 2))
+        # A merged line reports its oldest input.
+        self.assertEqual([source_ts for source_ts, _at in written], [1.0, 2.0])
+        self.assertGreaterEqual(written[0][1], self.writer.lines[0][0])
+
+    def test_motion_waits_for_discrete_writes(self):
+        self.writer.release.set()
+        with self.gate.discrete():
+            self.lane.submit("mouseto 0.5 0.5")
+            time.sleep(0.05)
+            self.assertEqual(self.writer.lines, [])
+            left_discrete = time.perf_counter()
+
+        self.assertTrue(_wait(lambda: len(self.writer.lines) == 1))
+        self.assertGreaterEqual(self.writer.lines[0][0], left_discrete)
+
+    def test_motion_is_only_deferred_up_to_max_defer(self):
+        self.writer.release.set()
+        lane = self.lanes.MotionLane(self.writer, "test", gate=self.gate, max_defer=0.02)
+        with self.gate.discrete():
+            lane.submit("mouseto 0.5 0.5")
+            self.assertTrue(_wait(lambda: len(self.writer.lines) == 1, timeout=1.0))
+
+    def test_discard_drops_the_pending_line(self):
+        self.lane.submit("mouseto 0.1 0.1")
+        self.assertTrue(self.writer.started.wait(1.0))
+        self.lane.submit("mouseto 0.2 0.2")
+        self.lane.discard()
+        self.writer.release.set()
+
+        self.assertTrue(_wait(lambda: len(self.writer.lines) == 1))
+        time.sleep(0.02)
+        self.assertEqual(len(self.writer.lines), 1)
+        self.assertIn("superseded=1", self.lane.status())
+
+    def test_discrete_writes_flush_ordered_lanes_first(self):
+        lane = self.lanes.MotionLane(
+            self.writer, "wheel", gate=self.gate, max_defer=1.0, ordered=True
+        )
+        self.addCleanup(lane.close)
+        lane.submit("wheel 1")
+        self.assertTrue(self.writer.started.wait(1.0))
+        lane.submit("wheel 2")
+        threading.Timer(0.05, self.writer.release.set).start()
+        with self.gate.discrete():
+            self.writer.lines.append((time.perf_counter(), "click left"))
+
+        self.assertEqual(
+            [line for _ts, line in self.writer.lines], ["wheel 1", "wheel 2", "click left"]
+        )
+        lane.close()
+        lane.submit("wheel 3")
+        with self.gate.discrete():
+            pass
+        self.assertEqual(len(self.writer.lines), 3)
+
+if __name__ == "__main__":
+    unittest.main()
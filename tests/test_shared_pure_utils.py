@@ -85,7 +85,7 @@ class SharedPureUtilsTests(unittest.TestCase):
             gaze_norm=(0.25, 0.75),
             delta=None,
         )
-        self.assertIn("control1 ts=1.234", line_no_delta)
+        self.assertIn("control1 ts=1.234500 ", line_no_delta)
         self.assertIn("xy_px=(100.0,200.0)", line_no_delta)
         self.assertIn("gaze_norm=(0.250,0.750)", line_no_delta)
         self.assertNotIn("delta=", line_no_delta)
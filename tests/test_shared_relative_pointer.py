@@ -0,0 +1,83 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from talon_stub import StubPluginTestCase, wait_until  # noqa: E402
+
+
+class RelativePointerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from shared import relative_pointer
+
+            cls.relative = relative_pointer
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def test_sub_pixel_deltas_accumulate(self):
+        pointer = self.relative.RelativePointer(gain=1.0)
+        moves = [pointer.step(0.4, -0.4) for _ in range(5)]
+        self.assertEqual(moves, [(0, 0), (0, 0), (1, -1), (0, 0), (1, -1)])
+        pointer.reset()
+        self.assertEqual(pointer.step(0.4, 0.0), (0, 0))
+
+    def test_gain_scales_moves(self):
+        pointer = self.relative.RelativePointer(gain=2.5)
+        self.assertEqual(pointer.step(2.0, -4.0), (5, -10))
+
+    def test_acceleration_damps_slow_and_boosts_fast_motion(self):
+        accelerated = self.relative.accelerated_delta
+        self.assertEqual(accelerated(0.0, 0.0, 2.0, 1.0), (0.0, 0.0))
+        self.assertEqual(accelerated(3.0, 4.0, 1.0, 0.0), (3.0, 4.0))
+        slow_x, _ = accelerated(0.5, 0.0, 1.0, 1.0)
+        fast_x, fast_y = accelerated(3.0, 4.0, 1.0, 1.0)
+        self.assertAlmostEqual(slow_x, 0.25)
+        self.assertAlmostEqual(fast_x, 15.0)
+        self.assertAlmostEqual(fast_y, 20.0)
+
+    def test_mousemove_lines_merge_by_summing(self):
+        line = self.relative.mousemove_line
+        merge = self.relative.merge_mousemove
+        self.assertEqual(line(3, -2), "mousemove 3 -2")
+        self.assertEqual(merge(line(3, -2), line(-1, 5)), "mousemove 2 3")
+        self.assertEqual(merge("mouseto 0.1 0.1", line(1, 1)), "mousemove 1 1")
+
+
+class RelativePointerPluginTests(StubPluginTestCase):
+    def test_relative_mode_writes_accumulated_mousemove_deltas(self):
+        self.talon.set_setting("user.control1_pointer_forwarder_mode", "relative")
+        self.talon.set_setting("user.control1_pointer_forwarder_relative_gain", 0.5)
+        self.talon.actions.mouse_move(500, 500)
+        self.start_pointer_forwarder()
+        for x in (100.0, 101.0, 102.0, 103.0, 113.0):
+            self.talon.emit_gaze(x, 100.0)
+
+        self.assertTrue(
+            wait_until(lambda: self.talon.transport.lines("mousemove") and self.motion_idle())
+        )
+        moved = [
+            int(line.split()[1]) for line in self.talon.transport.lines("mousemove")
+        ]
+        self.assertEqual(sum(moved), 6)
+        self.assertEqual(self.talon.actions.mouse_x(), 506.0)
+
+        # A gaze event with no new delta sample does not move again.
+        forwarder = self.talon.module(
+            "plugins.tracking_forwarder.control1_pointer_forwarder"
+        )
+        submitted = forwarder._motion.submitted
+        forwarder._on_gaze()
+        self.assertEqual(forwarder._motion.submitted, submitted)
+        self.assertEqual(self.talon.actions.mouse_x(), 506.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
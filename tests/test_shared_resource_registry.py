@@ -0,0 +1,100 @@
+import subprocess
+import sys
+import textwrap
+import unittest
+from pathlib import Path
+
+
+class _Registrar:
+    def __init__(self):
+        self.callbacks = []
+
+    def register(self, topic, callback):
+        self.callbacks.append((topic, callback))
+
+    def unregister(self, topic, callback):
+        self.callbacks.remove((topic, callback))
+
+
+class ResourceRegistryTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from shared import resource_registry
+
+            cls.registry = resource_registry
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def setUp(self):
+        self.addCleanup(self.registry.release_all)
+
+    def test_keep_reuses_live_resources_until_released(self):
+        closed = []
+        first = self.registry.keep("test:conn", object, closed.append)
+        self.assertIs(self.registry.keep("test:conn", object, closed.append), first)
+
+        replaced = self.registry.keep("test:conn", object, closed.append, reuse=lambda _r: False)
+        self.assertIsNot(replaced, first)
+        self.assertEqual(closed, [first])
+
+        self.assertTrue(self.registry.release("test:conn"))
+        self.assertFalse(self.registry.release("test:conn"))
+        self.assertEqual(closed, [first, replaced])
+
+    def test_state_survives_reloading_the_registry_module(self):
+        import importlib
+
+        kept = self.registry.keep("test:conn", object)
+        reloaded = importlib.reload(self.registry)
+        self.assertIs(reloaded.keep("test:conn", object), kept)
+
+    def test_subscribe_replaces_the_previous_callback(self):
+        registrar = _Registrar()
+
+        def old(*_args):
+            pass
+
+        def new(*_args):
+            pass
+
+        self.registry.subscribe("test.gaze", registrar, "gaze", old)
+        self.registry.subscribe("test.gaze", registrar, "gaze", new)
+        self.assertEqual(registrar.callbacks, [("gaze", new)])
+        self.assertTrue(self.registry.subscribed("test.gaze", new))
+        self.assertFalse(self.registry.subscribed("test.gaze", old))
+
+        self.registry.release_all()
+        self.assertEqual(registrar.callbacks, [])
+        self.assertFalse(self.registry.subscribed("test.gaze"))
+
+    def test_atexit_subscription_runs_only_the_latest_handler(self):
+        script = textwrap.dedent(
+            """
+            from shared import resource_registry
+
+            for load in ("old", "new"):
+                resource_registry.subscribe(
+                    "test.exit", resource_registry.ATEXIT, "exit",
+                    lambda load=load: print(load),
+                )
+            """
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=Path(__file__).resolve().parents[1] / "plugins",
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.split(), ["new"])
+
+
+if __name__ == "__main__":
+    unittest.main()
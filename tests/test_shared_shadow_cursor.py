@@ -0,0 +1,92 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from talon_stub import StubPluginTestCase  # noqa: E402
+
+BOUNDS = (0.0, 0.0, 2000.0, 1000.0)
+
+
+class ShadowCursorTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from shared import shadow_cursor
+
+            cls.shadow = shadow_cursor
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def setUp(self):
+        self.cursor = self.shadow.ShadowCursor()
+
+    def test_unknown_until_first_absolute_move(self):
+        self.assertIsNone(self.cursor.position())
+        self.assertIsNone(self.cursor.nudge(BOUNDS, 5, 5))
+
+        self.assertEqual(
+            self.cursor.move_to(BOUNDS, 500, 250), "mouseto 0.250000 0.250000"
+        )
+        self.assertEqual(self.cursor.position(), (500.0, 250.0))
+
+    def test_position_is_clamped_to_the_desktop(self):
+        self.cursor.move_to(BOUNDS, -10, 5000)
+        self.assertEqual(self.cursor.position(), (0.0, 1000.0))
+
+    def test_nudge_moves_relative_to_last_write(self):
+        self.cursor.move_to(BOUNDS, 1000, 500)
+        line = self.cursor.nudge(BOUNDS, 20, -100)
+
+        self.assertEqual(line, "mouseto 0.510000 0.400000")
+        self.assertEqual(self.cursor.position(), (1020.0, 400.0))
+
+    def test_skip_unchanged_drops_repeated_lines_only(self):
+        self.assertIsNotNone(self.cursor.move_to(BOUNDS, 10, 10, skip_unchanged=True))
+        self.assertIsNone(self.cursor.move_to(BOUNDS, 10.0000001, 10, skip_unchanged=True))
+        self.assertIsNotNone(self.cursor.move_to(BOUNDS, 10, 10))
+        self.assertIsNotNone(self.cursor.move_to(BOUNDS, 11, 10, skip_unchanged=True))
+
+    def test_relative_moves_and_forget(self):
+        self.cursor.move_to(BOUNDS, 100, 100)
+        self.cursor.moved_by(5, -5)
+        self.assertEqual(self.cursor.position(), (105.0, 95.0))
+        self.assertIsNotNone(self.cursor.move_to(BOUNDS, 100, 100, skip_unchanged=True))
+
+        self.cursor.forget()
+        self.assertIsNone(self.cursor.position())
+
+
+class ShadowCursorPluginTests(StubPluginTestCase):
+    def test_shadow_cursor_answers_position_queries_and_nudges(self):
+        self.talon.actions.mouse_move(500, 250)
+        self.assertEqual(
+            (self.talon.actions.mouse_x(), self.talon.actions.mouse_y()), (500.0, 250.0)
+        )
+
+        self.talon.actions.user.mouse_forwarder_nudge(10, -50)
+        self.start_pointer_forwarder()
+        self.talon.emit_gaze(100, 200)
+        self.talon.transport.wait_for_lines("mouseto", 3)
+        self.talon.emit_gaze(100, 200)
+
+        self.assertEqual(
+            self.talon.transport.lines("mouseto"),
+            [
+                "mouseto 0.500000 0.250000",
+                "mouseto 0.510000 0.200000",
+                "mouseto 0.100000 0.200000",
+            ],
+        )
+        self.assertEqual(self.talon.actions.mouse_x(), 100.0)
+        self.assertNotIn("mouse_x", [name for name, _args in self.talon.registry.native_calls])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import os
+import stat
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from talon_stub import wait_until  # noqa: E402
+
+WL_COPY = """#!/bin/sh
+if [ "$1" = "--clear" ]; then
+    rm -f "$FAKE_CLIPBOARD"
+    exit 0
+fi
+cat > "$FAKE_CLIPBOARD"
+"""
+
+WL_PASTE = """#!/bin/sh
+if [ "$1" = "--watch" ]; then
+    last=""
+    while :; do
+        now=$(cksum "$FAKE_CLIPBOARD" 2>/dev/null)
+        [ "$now" = "$last" ] || { last=$now; echo; }
+        sleep 0.01
+    done
+fi
+[ -f "$FAKE_CLIPBOARD" ] || exit 1
+cat "$FAKE_CLIPBOARD"
+"""
+
+
+class WaylandClipboardTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from shared import wayland_clipboard
+
+            cls.clipboard = wayland_clipboard
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        bin_dir = Path(self._tmp.name)
+        for name, script in (("wl-copy", WL_COPY), ("wl-paste", WL_PASTE)):
+            path = bin_dir / name
+            path.write_text(script)
+            path.chmod(path.stat().st_mode | stat.S_IXUSR)
+        self.clipboard_file = bin_dir / "clipboard"
+        self._env = {
+            "PATH": os.environ.get("PATH", ""),
+            "FAKE_CLIPBOARD": os.environ.get("FAKE_CLIPBOARD"),
+        }
+        os.environ["PATH"] = f"{bin_dir}{os.pathsep}{self._env['PATH']}"
+        os.environ["FAKE_CLIPBOARD"] = str(self.clipboard_file)
+
+    def tearDown(self):
+        for key, value in self._env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        self._tmp.cleanup()
+
+    def test_read_write_roundtrip(self):
+        self.assertIsNone(self.clipboard.read_clipboard())
+        self.assertTrue(self.clipboard.write_clipboard(b"hello\nworld"))
+        self.assertEqual(self.clipboard.read_clipboard(), b"hello\nworld")
+        self.assertTrue(self.clipboard.write_clipboard(None))
+        self.assertIsNone(self.clipboard.read_clipboard())
+
+    def test_restore_clipboard(self):
+        self.clipboard.write_clipboard(b"pasted")
+        self.assertTrue(self.clipboard.restore_clipboard(b"previous", b"pasted"))
+        self.assertEqual(self.clipboard.read_clipboard(), b"previous")
+
+    def test_restore_skips_when_clipboard_changed(self):
+        self.clipboard.write_clipboard(b"copied by user")
+        self.assertFalse(self.clipboard.restore_clipboard(b"previous", b"pasted"))
+        self.assertEqual(self.clipboard.read_clipboard(), b"copied by user")
+
+    def test_schedule_clipboard_restore(self):
+        self.clipboard.write_clipboard(b"pasted")
+        timer = self.clipboard.schedule_clipboard_restore(None, b"pasted", 0.0)
+        timer.join(timeout=5)
+        self.assertIsNone(self.clipboard.read_clipboard())
+
+    def test_snapshot_follows_the_clipboard_so_a_paste_does_not_read_it(self):
+        reads = []
+
+        def reader():
+            reads.append(threading.current_thread())
+            return self.clipboard.read_clipboard()
+
+        self.clipboard.write_clipboard(b"first")
+        snapshot = self.clipboard.ClipboardSnapshot(reader=reader)
+        self.addCleanup(snapshot.stop)
+        self.assertTrue(snapshot.start())
+        self.assertEqual(snapshot.contents, b"first")
+        self.clipboard.write_clipboard(b"copied")
+        self.assertTrue(wait_until(lambda: snapshot.contents == b"copied"))
+
+        read_count = len(reads)
+        self.assertEqual(snapshot.previous(b"pasted"), b"copied")
+        # Only the watch thread reads; a late watch event may still do so.
+        self.assertNotIn(threading.current_thread(), reads[read_count:])
+        # The paste's own contents are not taken as the user's clipboard.
+        self.clipboard.write_clipboard(b"pasted")
+        self.assertTrue(wait_until(lambda: len(reads) > read_count))
+        self.assertEqual(snapshot.contents, b"copied")
+
+    def test_snapshot_reads_directly_while_a_change_is_unread(self):
+        main = threading.current_thread()
+        watcher_may_read = threading.Event()
+        watcher_may_read.set()
+
+        def reader():
+            if threading.current_thread() is not main:
+                watcher_may_read.wait(5)
+            return self.clipboard.read_clipboard()
+
+        self.clipboard.write_clipboard(b"first")
+        snapshot = self.clipboard.ClipboardSnapshot(reader=reader)
+        self.addCleanup(watcher_may_read.set)
+        self.addCleanup(snapshot.stop)
+        self.assertTrue(snapshot.start())
+        self.assertTrue(wait_until(snapshot.current))
+        watcher_may_read.clear()
+        self.clipboard.write_clipboard(b"copied")
+        # The watcher reported the copy but has not read it yet.
+        self.assertTrue(wait_until(lambda: not snapshot.current()))
+
+        self.assertEqual(snapshot.previous(b"pasted"), b"copied")
+        self.assertTrue(snapshot.current())
+
+    def test_snapshot_reads_directly_until_it_watches(self):
+        snapshot = self.clipboard.ClipboardSnapshot(watch_command=("/nonexistent/wl-paste",))
+        self.assertFalse(snapshot.start())
+        self.clipboard.write_clipboard(b"copied")
+        self.assertEqual(snapshot.previous(b"pasted"), b"copied")
+        self.clipboard.write_clipboard(b"pasted")
+        # A second paste before the restore still saves the user's contents.
+        self.assertEqual(snapshot.previous(b"again"), b"copied")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from talon_stub import StubPluginTestCase  # noqa: E402
+
+
+class _Writer:
+    def __init__(self, ok=True):
+        self.ok = ok
+        self.writes = []
+
+    def send_lines(self, lines):
+        self.writes.append(list(lines))
+        return self.ok
+
+
+class PhraseBatcherTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
+        added = False
+        if str(plugins_dir) not in sys.path:
+            sys.path.insert(0, str(plugins_dir))
+            added = True
+        try:
+            from shared import write_batch
+
+            cls.batch = write_batch
+        finally:
+            if added:
+                sys.path.remove(str(plugins_dir))
+
+    def setUp(self):
+        self.batcher = self.batch.PhraseBatcher()
+        self.addCleanup(self.batcher.end)
+
+    def test_writes_pass_through_outside_a_phrase(self):
+        writer = _Writer()
+        self.assertTrue(self.batcher.send_lines(writer, ["key tab"]))
+        self.assertEqual(writer.writes, [["key tab"]])
+
+    def test_phrase_lines_from_all_writers_flush_once_in_order(self):
+        keys, mouse = _Writer(), _Writer()
+        self.batcher.begin()
+        self.batcher.send_lines(keys, ["key tab"])
+        self.batcher.send_lines(mouse, ["click left"])
+        self.batcher.send_lines(keys, ["key ctrl+d"])
+        self.assertEqual(keys.writes, [])
+
+        self.assertTrue(self.batcher.end())
+        self.assertEqual(keys.writes, [["key tab", "click left", "key ctrl+d"]])
+        self.assertEqual(mouse.writes, [])
+
+    def test_flush_writes_early_and_keeps_batching(self):
+        writer = _Writer()
+        self.batcher.begin()
+        self.batcher.send_lines(writer, ["key a"])
+        self.batcher.flush()
+        self.batcher.send_lines(writer, ["key b"])
+        self.batcher.end()
+
+        self.assertEqual(writer.writes, [["key a"], ["key b"]])
+
+    def test_other_threads_are_not_batched(self):
+        writer = _Writer()
+        self.batcher.begin()
+        thread = threading.Thread(
+            target=self.batcher.send_lines, args=(writer, ["mouseto 0.5 0.5"])
+        )
+        thread.start()
+        thread.join()
+
+        self.assertEqual(writer.writes, [["mouseto 0.5 0.5"]])
+
+    def test_failed_flush_runs_failure_callbacks(self):
+        calls = []
+        self.batcher.begin()
+        self.batcher.send_lines(_Writer(ok=False), ["keydown leftctrl"], lambda: calls.append(1))
+
+        self.assertFalse(self.batcher.end())
+        self.assertEqual(calls, [1])
+
+    def test_safety_timer_ends_an_unfinished_phrase(self):
+        batcher = self.batch.PhraseBatcher(safety_timeout=0.05)
+        writer = _Writer()
+        batcher.begin()
+        batcher.send_lines(writer, ["key a"])
+        time.sleep(0.2)
+
+        self.assertEqual(writer.writes, [["key a"]])
+        self.assertFalse(batcher.batching())
+
+
+class PhraseBatchingPluginTests(StubPluginTestCase):
+    def test_phrase_writes_go_out_at_once_by_default(self):
+        def command():
+            self.talon.actions.key("ctrl-c")
+            # e.g. a clipboard read must see the copy's effect already.
+            self.assertEqual(self.talon.transport.lines(), ["key ctrl+c"])
+            self.talon.actions.key("ctrl-v")
+
+        self.talon.transport.clear()
+        self.talon.speak(command)
+
+        self.assertEqual(self.talon.transport.writes, 2)
+
+    def test_one_spoken_phrase_is_one_write(self):
+        self.talon.set_setting("user.dotool_phrase_batching", True)
+        self.talon.transport.clear()
+        self.talon.speak(
+            lambda: (self.talon.actions.key("tab"), self.talon.actions.key("ctrl-d")),
+            "tab duplicate",
+        )
+
+        self.assertEqual(self.talon.transport.writes, 1)
+        self.assertEqual(self.talon.transport.lines(), ["key tab", "key ctrl+d"])
+
+    def test_sleep_and_dotool_flush_split_a_phrase(self):
+        def command():
+            self.talon.actions.key("a")
+            self.talon.actions.sleep("10ms")
+            self.talon.actions.mouse_click(0)
+            self.talon.actions.user.dotool_flush()
+            self.talon.actions.key("b")
+
+        self.talon.set_setting("user.dotool_phrase_batching", True)
+        self.talon.transport.clear()
+        self.talon.speak(command)
+
+        self.assertEqual(self.talon.transport.writes, 3)
+        self.assertEqual(self.talon.transport.lines(), ["key a", "click left", "key b"])
+        self.assertIn(("sleep", ("10ms",)), self.talon.registry.native_calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
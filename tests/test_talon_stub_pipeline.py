@@ -0,0 +1,324 @@
+import contextlib
+import importlib
+import io
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from talon_stub import FakeDotoold, StubPluginTestCase, TalonStub, wait_until  # noqa: E402
+
+SCREEN = (0, 0, 1000, 1000)
+
+
+class TalonStubPipelineTests(StubPluginTestCase):
+    def test_ready_runs_every_plugin_and_applies_timing_profile(self):
+        profiler = self.talon.module("plugins.shared.instrumentation").STARTUP_PROFILER
+        timings = profiler.timings()
+        self.assertIsNotNone(timings["tracking_forwarder.control1_pointer_forwarder"][1])
+        self.assertIsNotNone(timings["dotool_session"][1])
+        # Import times are taken centrally, also for plugins without a ready callback.
+        self.assertIsNotNone(timings["tracking_forwarder.control1_debug_overlay"][0])
+        self.assertNotIn("shared.dotool_connection", timings)
+        # Only startup imports are timed.
+        self.assertFalse(
+            any(getattr(finder, "is_import_timer", False) for finder in sys.meta_path)
+        )
+
+        self.talon.actions.key("ctrl-a")
+
+        lines = self.talon.transport.lines()
+        self.assertIn("keyhold 2", lines)
+        self.assertLess(lines.index("keyhold 2"), lines.index("key ctrl+a"))
+        self.assertEqual(self.talon.registry.native_calls, [])
+
+    def test_double_tapped_modifiers_reach_dotool_as_two_taps(self):
+        self.talon.actions.key("shift shift")
+
+        self.assertEqual(
+            self.talon.transport.lines(("keydown ", "keyup ")),
+            ["keydown leftshift", "keyup leftshift"] * 2,
+        )
+
+    def test_insert_types_through_the_key_forwarder(self):
+        self.talon.actions.insert("hi\nthere")
+
+        self.assertEqual(
+            self.talon.transport.lines(("type ", "key ")),
+            ["type hi", "key enter", "type there"],
+        )
+
+    def test_screen_change_rescales_pointer_writes(self):
+        self.start_pointer_forwarder()
+        self.talon.emit_gaze(500, 500)
+        self.talon.transport.wait_for_lines("mouseto", 1)
+        self.talon.set_screens([SCREEN, (1000, 0, 1000, 1000)])
+        self.talon.emit_gaze(500, 500)
+
+        self.assertEqual(
+            self.talon.transport.wait_for_lines("mouseto", 2),
+            ["mouseto 0.500000 0.500000", "mouseto 0.250000 0.500000"],
+        )
+
+    def test_control1_toggles_gate_pointer_writes(self):
+        self.start_pointer_forwarder()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.talon.set_control1(False)
+        self.talon.emit_gaze(100, 100)
+        self.assertEqual(self.pointer_forwarder()._motion.submitted, 0)
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.talon.click_control1_menu()
+        self.assertIn("control1 enabled=True", output.getvalue())
+        self.talon.emit_gaze(100, 100)
+        self.assertEqual(
+            self.talon.transport.wait_for_lines("mouseto", 1),
+            ["mouseto 0.100000 0.100000"],
+        )
+
+    def test_gaze_logger_records_when_pointer_motion_reaches_dotool(self):
+        self.start_pointer_forwarder()
+        log = self.talon.module("plugins.shared.async_log").LOG
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.talon.actions.user.control1_gaze_logger_start()
+        with contextlib.redirect_stderr(io.StringIO()) as errors:
+            self.talon.emit_gaze(500, 500, ts=time.perf_counter())
+            self.talon.transport.wait_for_lines("mouseto", 1)
+            self.assertTrue(
+                wait_until(lambda: log.flush() and "control1 write" in errors.getvalue())
+            )
+        gaze_log = self.talon.module("plugins.shared.gaze_log")
+        record = gaze_log.parse_control1_line(
+            next(line for line in errors.getvalue().splitlines() if "control1 write" in line)
+        )
+        self.assertGreaterEqual(record[1] - record[0], 0.0)
+        self.assertLess(record[1] - record[0], 1.0)
+
+    def _reload(self, name):
+        with contextlib.redirect_stdout(io.StringIO()):
+            reloaded = importlib.reload(self.talon.module(name))
+            self.talon.run_cron()
+        return reloaded
+
+    def test_reloaded_forwarder_reuses_its_connection_and_replaces_its_callback(self):
+        name = "plugins.tracking_forwarder.control1_pointer_forwarder"
+        self.start_pointer_forwarder()
+        self.talon.emit_gaze(100, 100)
+        self.talon.transport.wait_for_lines("mouseto", 1)
+        before = self.talon.module(name)
+        process = before._connection._proc
+
+        reloaded = self._reload(name)
+        self.talon.emit_gaze(200, 200)
+
+        self.assertIs(reloaded._connection, before._connection)
+        self.assertIs(reloaded._motion, before._motion)
+        self.assertEqual(
+            self.talon.callbacks[("tracking", "gaze")], [reloaded._on_gaze]
+        )
+        self.assertEqual(
+            self.talon.transport.wait_for_lines("mouseto", 2),
+            ["mouseto 0.100000 0.100000", "mouseto 0.200000 0.200000"],
+        )
+        self.assertIs(reloaded._connection._proc, process)
+
+    def test_pointer_connection_uses_the_idle_timeout_setting(self):
+        self.talon.set_setting("user.control1_pointer_forwarder_idle_timeout", 0.05)
+        self.start_pointer_forwarder()
+        connection = self.pointer_forwarder()._connection
+        self.assertEqual(connection.idle_timeout, 0.05)
+
+        self.talon.emit_gaze(100, 100)
+        self.talon.transport.wait_for_lines("mouseto", 1)
+        self.assertTrue(wait_until(lambda: not connection.connected()))
+
+    def test_pointer_motion_goes_to_the_motion_pipe_setting(self):
+        motion_dotoold = FakeDotoold(str(self.talon_dir / "motion-pipe"))
+        motion_dotoold.start()
+        self.addCleanup(motion_dotoold.stop)
+        self.talon.set_setting("user.dotool_motion_pipe", motion_dotoold.pipe_path)
+        self.start_pointer_forwarder()
+
+        self.talon.emit_gaze(100, 100)
+        self.talon.transport.wait_for_lines("mouseto", 1)
+        self.talon.actions.key("a")
+        processes = {
+            line: process.command for _ts, process, line in self.talon.transport.records
+        }
+        self.assertEqual(
+            processes["mouseto 0.100000 0.100000"][:2],
+            ["env", f"DOTOOL_PIPE={motion_dotoold.pipe_path}"],
+        )
+        self.assertNotEqual(processes["key a"][0], "env")
+
+    def test_reloaded_plugins_replace_their_event_callbacks(self):
+        def registered():
+            return {
+                key: len(callbacks)
+                for key, callbacks in self.talon.callbacks.items()
+                if key[0] != "app"
+            }
+
+        before = registered()
+        for name in (
+            "plugins.dotool_session",
+            "plugins.mouse_forwarder",
+            "plugins.key_forwarder.forwarder",
+        ):
+            with self.subTest(name):
+                reloaded = self._reload(name)
+                self.assertEqual(registered(), before)
+
+        # atexit offers no way to list handlers; check the registry swapped it.
+        resources = self.talon.module("plugins.shared.resource_registry")
+        self.assertTrue(
+            resources.subscribed(
+                "key_forwarder.release_held_keys", reloaded._release_held_keys
+            )
+        )
+        self.assertEqual(
+            self.talon.callbacks[("speech", "pre:phrase")],
+            [self.talon.module("plugins.dotool_session")._on_pre_phrase],
+        )
+        self.assertIn(
+            self.talon.module("plugins.mouse_forwarder")._on_screen_change,
+            self.talon.callbacks[("ui", "screen_change")],
+        )
+
+    def test_reloading_the_modifier_tracker_still_releases_held_keys(self):
+        self.talon.actions.key("ctrl:down")
+        self.talon.transport.wait_for_lines("keydown", 1)
+
+        self._reload("plugins.key_forwarder.modifier_state")
+        self._reload("plugins.key_forwarder.forwarder")
+
+        self.assertEqual(self.talon.transport.wait_for_lines("keyup", 1), ["keyup leftctrl"])
+
+    def test_reloaded_gaze_consumers_restart_with_the_new_code(self):
+        names = [
+            "plugins.tracking_forwarder.control1_pointer_forwarder",
+            "plugins.tracking_forwarder.control1_debug_overlay",
+            "plugins.tracking_forwarder.control1_dwell_click",
+            "plugins.tracking_forwarder.control1_gaze_logger",
+        ]
+        self.start_pointer_forwarder()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.talon.actions.user.control1_debug_overlay_start()
+            self.talon.actions.user.control1_dwell_click_start()
+            self.talon.actions.user.control1_gaze_logger_start()
+        screen_callbacks = len(self.talon.callbacks[("ui", "screen_change")])
+
+        reloaded = [self._reload(name) for name in names]
+
+        self.assertCountEqual(
+            self.talon.callbacks[("tracking", "gaze")],
+            [module._on_gaze for module in reloaded],
+        )
+        self.assertEqual(
+            len(self.talon.callbacks[("ui", "screen_change")]), screen_callbacks
+        )
+        self.assertEqual(len([c for c in self.talon.canvases if not c.closed]), 2)
+
+    def test_mouse_actions_forward_through_the_action_stack(self):
+        self.talon.actions.mouse_click(0)
+        self.talon.actions.user.mouse_forwarder_modified_click("shift", 1)
+
+        self.assertEqual(
+            self.talon.transport.lines("click "),
+            ["click left", "click right"],
+        )
+        self.assertIn("keydown leftshift", self.talon.transport.lines())
+        self.assertIn("keyup leftshift", self.talon.transport.lines())
+
+class TalonStubLoadTests(unittest.TestCase):
+    def setUp(self):
+        self.talon = TalonStub(screens=[SCREEN])
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.talon.load_plugins()
+            self.talon.fire_ready()
+            self.talon.set_control1(True)
+            self.talon.actions.user.control1_pointer_forwarder_start()
+
+    def tearDown(self):
+        self.talon.close()
+
+    def _motion(self):
+        return self.talon.module("plugins.tracking_forwarder.control1_pointer_forwarder")._motion
+
+    def _drained(self):
+        motion = self._motion()
+        return wait_until(
+            lambda: motion.idle()
+            and motion.written + motion.superseded + motion.merged + motion.failed
+            >= motion.submitted
+        )
+
+    def _counts(self):
+        motion = self._motion()
+        return motion.submitted, motion.written, motion.superseded, motion.failed
+
+    def _assert_latest_wins(self, emitted, before=(0, 0, 0, 0)):
+        """Every sample was submitted; writes kept emission order and the last one."""
+        submitted, written_count, superseded, failed = (
+            now - then for now, then in zip(self._counts(), before)
+        )
+        expected = [f"mouseto {x / 1000.0:.6f} {y / 1000.0:.6f}" for _emit, x, y in emitted]
+        written = self.talon.transport.lines("mouseto")
+        self.assertEqual(submitted, len(emitted))
+        self.assertEqual(failed, 0)
+        self.assertEqual(written_count + superseded, submitted)
+        self.assertTrue(written)
+        self.assertEqual(written[-1], expected[-1])
+        remaining = iter(expected)
+        self.assertTrue(all(line in remaining for line in written), "writes out of order")
+
+    def test_realtime_gaze_from_30_to_500_hz_keeps_order_and_the_latest_sample(self):
+        for rate in (30, 120, 250, 500):
+            with self.subTest(rate=rate):
+                before = self._counts()
+                self.talon.transport.clear()
+                emitted = self.talon.drive_gaze(rate, duration=0.2, realtime=True)
+                self.assertTrue(self._drained())
+                self._assert_latest_wins(emitted, before)
+
+    def test_motion_bursts_are_latest_wins(self):
+        emitted = self.talon.drive_gaze(500, duration=2.0)
+        self.assertTrue(self._drained())
+        self._assert_latest_wins(emitted)
+
+    def test_keys_are_not_queued_behind_a_motion_burst(self):
+        self.talon.set_setting("user.key_forwarder_enabled", True)
+        burst = threading.Thread(
+            target=self.talon.drive_gaze, args=(500, 0.5), kwargs={"realtime": True}
+        )
+        burst.start()
+        try:
+            for _ in range(20):
+                self.talon.actions.key("a")
+        finally:
+            burst.join()
+        self.assertTrue(self._drained())
+
+        lines = self.talon.transport.lines(("key ", "mouseto"))
+        self.assertEqual([line for line in lines if line.startswith("key ")], ["key a"] * 20)
+        # The keys went out while the burst was still being written.
+        after_first_key = lines[lines.index("key a"):]
+        self.assertTrue(any(line.startswith("mouseto") for line in after_first_key))
+
+    def test_realtime_500_hz_with_every_gaze_consumer_registered(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.talon.actions.user.control1_dwell_click_start()
+            self.talon.actions.user.control1_debug_overlay_start()
+        self.assertGreaterEqual(self.talon.gaze_callback_count(), 3)
+
+        emitted = self.talon.drive_gaze(500, duration=0.5, realtime=True)
+        self.assertTrue(self._drained())
+
+        self._assert_latest_wins(emitted)
+        self.assertTrue(any(canvas.freezes for canvas in self.talon.canvases))
+
+
+if __name__ == "__main__":
+    unittest.main()
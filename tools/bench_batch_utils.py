@@ -0,0 +1,63 @@
+"""Compare scalar pure_utils helpers with their NumPy batch_utils versions.
+
+Usage:
+    python tools/bench_batch_utils.py [--samples N] [--seed SEED]
+
+Requires NumPy. Prints wall-clock times only; nothing is asserted.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+
+def _time(func) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "plugins"))
+    import numpy as np
+    from shared import batch_utils, pure_utils
+
+    rng = random.Random(args.seed)
+    xs = [rng.uniform(-500.0, 5000.0) for _ in range(args.samples)]
+    ys = [rng.uniform(-500.0, 2500.0) for _ in range(args.samples)]
+    xs_array = np.asarray(xs)
+    ys_array = np.asarray(ys)
+    bounds = (-1200.0, 0.0, 4400.0, 1920.0)
+    rect = (0.0, 0.0, 1920.0, 1080.0)
+
+    cases = [
+        (
+            "normalize_points",
+            lambda: [pure_utils.normalize_point(bounds, x, y) for x, y in zip(xs, ys)],
+            lambda: batch_utils.normalize_points(bounds, xs_array, ys_array),
+        ),
+        (
+            "rect_contains_points",
+            lambda: [pure_utils.rect_contains_point(rect, x, y) for x, y in zip(xs, ys)],
+            lambda: batch_utils.rect_contains_points(rect, xs_array, ys_array),
+        ),
+    ]
+    for name, scalar, batch in cases:
+        scalar_s = _time(scalar)
+        batch_s = _time(batch)
+        print(
+            f"{name}: scalar={scalar_s * 1000:.1f}ms batch={batch_s * 1000:.1f}ms "
+            f"speedup={scalar_s / max(batch_s, 1e-9):.1f}x ({args.samples} samples)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
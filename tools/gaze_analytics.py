@@ -0,0 +1,51 @@
+"""Headless analytics for recorded control1 gaze logs.
+
+Usage:
+    python tools/gaze_analytics.py [options] LOG [LOG ...]
+
+Accepts control1_gaze_logger text output and binary logs.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("logs", nargs="+", help="text or binary control1 gaze logs")
+    parser.add_argument("--chunk-samples", type=int, default=65536)
+    parser.add_argument(
+        "--saccade-velocity",
+        type=float,
+        default=1000.0,
+        help="px/s above which a sample step counts as a saccade",
+    )
+    parser.add_argument(
+        "--expected-rate",
+        type=float,
+        default=None,
+        help="tracker rate in Hz (default: estimated from the log)",
+    )
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "plugins"))
+    from shared.gaze_analytics import analyze_gaze_log
+
+    for path in args.logs:
+        started = time.perf_counter()
+        analyzer = analyze_gaze_log(
+            path,
+            chunk_samples=args.chunk_samples,
+            saccade_velocity=args.saccade_velocity,
+            expected_rate=args.expected_rate,
+        )
+        print(f"== {path} ({time.perf_counter() - started:.2f}s)")
+        for line in analyzer.report_lines():
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
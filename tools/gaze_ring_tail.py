@@ -0,0 +1,45 @@
+"""Print control1 gaze samples published to a shared-memory ring.
+
+Usage:
+    python tools/gaze_ring_tail.py [--path PATH] [--interval SECONDS]
+
+Start the logger with user.control1_gaze_logger_ring_path set first.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "plugins"))
+    from shared.gaze_log import GAZE_FIELDS
+    from shared.gaze_ring import DEFAULT_RING_PATH, GazeRingReader
+
+    parser.add_argument("--path", default=DEFAULT_RING_PATH)
+    parser.add_argument("--interval", type=float, default=0.005, help="poll interval")
+    args = parser.parse_args(argv)
+
+    reader = GazeRingReader(args.path)
+    print(" ".join(GAZE_FIELDS), flush=True)
+    try:
+        while True:
+            if reader.stale():
+                reader.close()
+                reader = GazeRingReader(args.path, from_start=True)
+            for record in reader.read():
+                print(" ".join(f"{value:.6f}" for value in record), flush=True)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+        if reader.dropped:
+            print(f"dropped={reader.dropped}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())